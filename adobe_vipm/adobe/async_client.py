@@ -0,0 +1,542 @@
+import asyncio
+import json
+import logging
+from hashlib import sha256
+from http import HTTPStatus
+from typing import List, MutableMapping, Tuple
+from urllib.parse import urlencode
+
+import httpx
+from requests.adapters import Retry
+
+from adobe_vipm.adobe.client import AdobeClient, get_adobe_client
+from adobe_vipm.adobe.coalescing import AsyncSingleFlight
+from adobe_vipm.adobe.constants import (
+    ORDER_TYPE_NEW,
+    ORDER_TYPE_PREVIEW_RENEWAL,
+    ORDER_TYPE_RETURN,
+    STATUS_PENDING,
+    STATUS_PROCESSED,
+)
+from adobe_vipm.adobe.dataclasses import Authorization, Reseller
+from adobe_vipm.adobe.errors import wrap_async_http_error
+from adobe_vipm.adobe.orders import CustomerOrdersIndex
+from adobe_vipm.adobe.payloads import (
+    get_3yc_request_payload,
+    get_customer_payload,
+    get_new_order_payload,
+    get_preview_order_payload,
+    get_reseller_payload,
+    get_return_order_payload,
+    get_update_subscription_payload,
+)
+from adobe_vipm.adobe.sessions import RETRY_STATUS_FORCELIST, get_adobe_endpoint_family
+from adobe_vipm.circuit_breaker import get_circuit_breaker
+
+logger = logging.getLogger(__name__)
+
+RETRY_BACKOFF_FACTOR = 0.1
+
+
+class AsyncAdobeClient:
+    """
+    Asyncio twin of the `AdobeClient`: it exposes the same methods as coroutines
+    built on top of `httpx`, so a single process can keep many requests in flight.
+
+    It shares the configuration, the IMS tokens, the request headers, the rate
+    limiters and the cache of customers and subscriptions of the `AdobeClient`
+    it is bound to, while it holds its own connection pool and concurrency
+    cap for each Authorization. Identical GET requests in flight are coalesced
+    and requests go through the circuit breakers used by the synchronous
+    sessions too. Like the synchronous sessions, idempotent requests are
+    retried up to `ADOBE_HTTP_MAX_RETRIES` times on 502, 503 and 504 errors.
+    Connections are bound to the event loop they are opened from, so an
+    instance must be used from a single loop and closed through `aclose`
+    before such loop ends.
+    """
+
+    def __init__(
+        self,
+        adobe_client: AdobeClient,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self._adobe_client = adobe_client
+        self._config = adobe_client._config
+        self._token_manager = adobe_client._token_manager
+        self._cache = adobe_client._cache
+        self._single_flight = AsyncSingleFlight(stats=adobe_client._single_flight.stats)
+        self._transport = transport
+        self._clients: MutableMapping[Authorization, httpx.AsyncClient] = {}
+        self._semaphores: MutableMapping[Authorization, asyncio.Semaphore] = {}
+
+    @wrap_async_http_error
+    async def create_reseller_account(
+        self,
+        authorization_id: str,
+        reseller_id: str,
+        reseller_data: dict,
+    ) -> str:
+        authorization = self._config.get_authorization(authorization_id)
+        payload = get_reseller_payload(
+            self._config, authorization, reseller_id, reseller_data,
+        )
+        created_reseller = await self._request(
+            authorization,
+            "POST",
+            "/v3/resellers",
+            correlation_id=sha256(json.dumps(payload).encode()).hexdigest(),
+            json=payload,
+        )
+        adobe_reseller_id = created_reseller["resellerId"]
+        logger.info(
+            f"Reseller {reseller_id} - {reseller_data['companyName']} "
+            "created successfully under authorization "
+            f"{authorization.name} ({authorization.authorization_uk}): {adobe_reseller_id}",
+        )
+        return adobe_reseller_id
+
+    @wrap_async_http_error
+    async def create_customer_account(
+        self,
+        authorization_id: str,
+        seller_id: str,
+        agreement_id: str,
+        customer_data: dict,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        reseller: Reseller = self._config.get_reseller(authorization, seller_id)
+        payload = get_customer_payload(self._config, reseller, agreement_id, customer_data)
+        created_customer = await self._request(
+            authorization,
+            "POST",
+            "/v3/customers",
+            correlation_id=sha256(json.dumps(payload).encode()).hexdigest(),
+            json=payload,
+        )
+        logger.info(
+            f"Customer {payload['companyProfile']['companyName']} "
+            f"created successfully for reseller {reseller.id}: {created_customer['customerId']}",
+        )
+        return created_customer
+
+    @wrap_async_http_error
+    async def get_customer_orders_index(
+        self,
+        authorization_id: str,
+        customer_id: str,
+    ) -> CustomerOrdersIndex:
+        authorization = self._config.get_authorization(authorization_id)
+        new_orders, return_orders = await asyncio.gather(
+            self._get_orders(
+                authorization,
+                customer_id,
+                {"order-type": ORDER_TYPE_NEW},
+            ),
+            self._get_orders(
+                authorization,
+                customer_id,
+                {
+                    "order-type": ORDER_TYPE_RETURN,
+                    "status": [STATUS_PROCESSED, STATUS_PENDING],
+                },
+            ),
+        )
+        return CustomerOrdersIndex(new_orders, return_orders)
+
+    async def search_new_and_returned_orders_by_sku_line_number(
+        self,
+        authorization_id: str,
+        customer_id: str,
+        sku: str,
+        mpt_line_id: str,
+    ) -> List[Tuple[dict, dict, dict | None]]:
+        orders_index = await self.get_customer_orders_index(authorization_id, customer_id)
+        return orders_index.search_new_and_returned_orders_by_sku_line_number(
+            sku, mpt_line_id,
+        )
+
+    @wrap_async_http_error
+    async def create_return_order(
+        self,
+        authorization_id: str,
+        customer_id: str,
+        returning_order: dict,
+        returning_item: dict,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        payload = get_return_order_payload(authorization, returning_order, returning_item)
+        try:
+            return await self._request(
+                authorization,
+                "POST",
+                f"/v3/customers/{customer_id}/orders",
+                correlation_id=payload["externalReferenceId"],
+                json=payload,
+            )
+        finally:
+            self._cache.invalidate(authorization.authorization_uk, customer_id)
+
+    @wrap_async_http_error
+    async def create_preview_order(
+        self,
+        authorization_id: str,
+        customer_id: str,
+        order_id: str,
+        lines: list,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        payload = get_preview_order_payload(self._config, authorization, order_id, lines)
+        return await self._request(
+            authorization,
+            "POST",
+            f"/v3/customers/{customer_id}/orders",
+            json=payload,
+        )
+
+    @wrap_async_http_error
+    async def create_new_order(
+        self,
+        authorization_id: str,
+        customer_id: str,
+        adobe_preview_order: dict,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        payload = get_new_order_payload(authorization, adobe_preview_order)
+        try:
+            return await self._request(
+                authorization,
+                "POST",
+                f"/v3/customers/{customer_id}/orders",
+                correlation_id=adobe_preview_order["externalReferenceId"],
+                json=payload,
+            )
+        finally:
+            self._cache.invalidate(authorization.authorization_uk, customer_id)
+
+    @wrap_async_http_error
+    async def create_preview_renewal(
+        self,
+        authorization_id: str,
+        customer_id: str,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        return await self._request(
+            authorization,
+            "POST",
+            f"/v3/customers/{customer_id}/orders",
+            json={"orderType": ORDER_TYPE_PREVIEW_RENEWAL},
+        )
+
+    @wrap_async_http_error
+    async def get_order(
+        self,
+        authorization_id: str,
+        customer_id: str,
+        order_id: str,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        return await self._get(
+            authorization,
+            f"/v3/customers/{customer_id}/orders/{order_id}",
+        )
+
+    @wrap_async_http_error
+    async def get_subscription(
+        self,
+        authorization_id: str,
+        customer_id: str,
+        subscription_id: str,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        return await self._get_or_load(
+            (authorization.authorization_uk, customer_id, subscription_id),
+            lambda: self._get(
+                authorization,
+                f"/v3/customers/{customer_id}/subscriptions/{subscription_id}",
+            ),
+        )
+
+    @wrap_async_http_error
+    async def get_subscriptions(
+        self,
+        authorization_id: str,
+        customer_id: str,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        return await self._get(authorization, f"/v3/customers/{customer_id}/subscriptions")
+
+    @wrap_async_http_error
+    async def update_subscription(
+        self,
+        authorization_id: str,
+        customer_id: str,
+        subscription_id: str,
+        auto_renewal: bool = True,
+        quantity: int | None = None,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        try:
+            return await self._request(
+                authorization,
+                "PATCH",
+                f"/v3/customers/{customer_id}/subscriptions/{subscription_id}",
+                json=get_update_subscription_payload(auto_renewal, quantity),
+            )
+        finally:
+            self._cache.invalidate(authorization.authorization_uk, customer_id)
+
+    @wrap_async_http_error
+    async def preview_transfer(
+        self,
+        authorization_id: str,
+        membership_id: str,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        return await self._get(
+            authorization,
+            f"/v3/memberships/{membership_id}/offers",
+            params={
+                "ignore-order-return": "true",
+                "expire-open-pas": "true",
+            },
+        )
+
+    @wrap_async_http_error
+    async def create_transfer(
+        self,
+        authorization_id: str,
+        seller_id: str,
+        order_id: str,
+        membership_id: str,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        reseller: Reseller = self._config.get_reseller(authorization, seller_id)
+        return await self._request(
+            authorization,
+            "POST",
+            f"/v3/memberships/{membership_id}/transfers",
+            correlation_id=order_id,
+            params={
+                "ignore-order-return": "true",
+                "expire-open-pas": "true",
+            },
+            json={
+                "resellerId": reseller.id,
+            },
+        )
+
+    @wrap_async_http_error
+    async def get_transfer(
+        self,
+        authorization_id: str,
+        membership_id: str,
+        transfer_id: str,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        return await self._get(
+            authorization,
+            f"/v3/memberships/{membership_id}/transfers/{transfer_id}",
+        )
+
+    @wrap_async_http_error
+    async def get_customer(
+        self,
+        authorization_id: str,
+        customer_id: str,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        return await self._get_or_load(
+            (authorization.authorization_uk, customer_id),
+            lambda: self._get(authorization, f"/v3/customers/{customer_id}"),
+        )
+
+    @wrap_async_http_error
+    async def create_3yc_request(
+        self,
+        authorization_id: str,
+        customer_id: str,
+        commitment_request: dict,
+        is_recommitment: bool = False,
+    ) -> dict:
+        authorization = self._config.get_authorization(authorization_id)
+        customer = await self.get_customer(authorization_id, customer_id)
+        payload = get_3yc_request_payload(customer, commitment_request, is_recommitment)
+        try:
+            return await self._request(
+                authorization,
+                "PATCH",
+                f"/v3/customers/{customer_id}",
+                correlation_id=sha256(json.dumps(payload).encode()).hexdigest(),
+                json=payload,
+            )
+        finally:
+            self._cache.invalidate(authorization.authorization_uk, customer_id)
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        # semaphores are bound to the loop they are first awaited from too
+        self._semaphores.clear()
+        for client in clients:
+            await client.aclose()
+
+    async def _request(
+        self,
+        authorization: Authorization,
+        method: str,
+        path: str,
+        correlation_id: str | None = None,
+        **kwargs,
+    ) -> dict:
+        headers = await self._get_headers(authorization, correlation_id=correlation_id)
+        client = self._get_client(authorization)
+        rate_limiter = self._adobe_client._sessions.get_rate_limiter(authorization)
+        circuit_breaker = get_circuit_breaker(get_adobe_endpoint_family(path))
+        attempt = 0
+        while True:
+            wait_secs = rate_limiter.reserve()
+            if wait_secs > 0:
+                await asyncio.sleep(wait_secs)
+            async with self._get_semaphore(authorization):
+                circuit_breaker.before_call()
+                try:
+                    response = await self._send(client, method, path, headers, **kwargs)
+                except httpx.TransportError:
+                    circuit_breaker.record_failure()
+                    raise
+                except BaseException:
+                    circuit_breaker.release_probe()
+                    raise
+            circuit_breaker.record_status(response.status_code)
+            if (
+                response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+                or attempt >= self._config.throttling_max_retries
+            ):
+                break
+            delay = rate_limiter.backoff(response.headers.get("Retry-After"), attempt)
+            logger.warning(
+                f"Request {method} {path} has been throttled, retry in {delay:.2f} seconds",
+            )
+            attempt += 1
+
+        response.raise_for_status()
+        return response.json()
+
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        path: str,
+        headers: dict,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Sends a request retrying it on server errors with the same policy as
+        the `Retry` of the synchronous sessions.
+        """
+        attempt = 0
+        while True:
+            response = await client.request(method, path, headers=headers, **kwargs)
+            if (
+                method not in Retry.DEFAULT_ALLOWED_METHODS
+                or response.status_code not in RETRY_STATUS_FORCELIST
+                or attempt >= self._config.http_max_retries
+            ):
+                return response
+            await response.aclose()
+            await asyncio.sleep(RETRY_BACKOFF_FACTOR * (2**attempt))
+            attempt += 1
+
+    async def _get_orders(
+        self,
+        authorization: Authorization,
+        customer_id: str,
+        params: dict,
+    ) -> List[dict]:
+        orders = []
+        next_url = f"/v3/customers/{customer_id}/orders?" + urlencode(
+            {**params, "limit": 100, "offset": 0},
+            doseq=True,
+        )
+        while next_url:
+            page = await self._get(authorization, next_url)
+            orders.extend(page["items"])
+            next_url = page.get("links", {}).get("next", {}).get("uri")
+        return orders
+
+    async def _get(
+        self,
+        authorization: Authorization,
+        path: str,
+        params: dict | None = None,
+    ) -> dict:
+        """
+        Performs a GET request to the Adobe VIP Marketplace API, concurrent
+        identical requests share a single network request like in the `AdobeClient`.
+        """
+        return await self._single_flight.do(
+            (
+                authorization.authorization_uk,
+                path,
+                tuple(sorted((params or {}).items())),
+            ),
+            lambda: self._request(authorization, "GET", path, params=params),
+        )
+
+    async def _get_or_load(self, key: tuple, load) -> dict:
+        value = self._cache.get(key)
+        if value is None:
+            value = await load()
+            self._cache.set(key, value)
+        return value
+
+    async def _get_headers(
+        self, authorization: Authorization, correlation_id: str | None = None,
+    ) -> dict:
+        token = self._token_manager.tokens.get(authorization)
+        if not token or token.is_expired():
+            # Requesting a new token to IMS is blocking, so it is done
+            # in a worker thread not to stall the event loop.
+            await asyncio.to_thread(self._token_manager.get_token, authorization)
+        return self._adobe_client._get_headers(authorization, correlation_id=correlation_id)
+
+    def _get_client(self, authorization: Authorization) -> httpx.AsyncClient:
+        if authorization not in self._clients:
+            self._clients[authorization] = httpx.AsyncClient(
+                base_url=self._config.api_base_url,
+                timeout=httpx.Timeout(
+                    self._config.http_timeout[1],
+                    connect=self._config.http_timeout[0],
+                ),
+                limits=httpx.Limits(
+                    max_connections=self._config.max_concurrent_requests,
+                    max_keepalive_connections=self._config.http_pool_size,
+                ),
+                transport=self._transport
+                or httpx.AsyncHTTPTransport(retries=self._config.http_max_retries),
+            )
+        return self._clients[authorization]
+
+    def _get_semaphore(self, authorization: Authorization) -> asyncio.Semaphore:
+        if authorization not in self._semaphores:
+            self._semaphores[authorization] = asyncio.Semaphore(
+                self._config.max_concurrent_requests,
+            )
+        return self._semaphores[authorization]
+
+
+_ASYNC_ADOBE_CLIENT = None
+
+
+def get_async_adobe_client() -> AsyncAdobeClient:
+    """
+    Returns an instance of the `AsyncAdobeClient` bound to the
+    `AdobeClient` of the process.
+
+    Returns:
+        AsyncAdobeClient: An instance of the `AsyncAdobeClient`.
+    """
+    global _ASYNC_ADOBE_CLIENT
+    if not _ASYNC_ADOBE_CLIENT:
+        _ASYNC_ADOBE_CLIENT = AsyncAdobeClient(get_adobe_client())
+    return _ASYNC_ADOBE_CLIENT
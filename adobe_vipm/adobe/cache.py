@@ -0,0 +1,159 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Tuple
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def record_evictions(self, count: int) -> None:
+        with self._lock:
+            self.evictions += count
+
+    def record_invalidations(self, count: int) -> None:
+        with self._lock:
+            self.invalidations += count
+
+    def to_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class TTLCache:
+    """
+    A thread-safe LRU cache which entries expire `ttl` seconds after
+    they have been stored.
+
+    Keys are tuples which leading items identify the owner of the entry
+    (i.e. authorization and customer), so all the entries of an owner can
+    be invalidated at once through `invalidate`.
+    Values are deep copied both when stored and when returned so callers
+    can freely modify the objects they get.
+    A value loaded by `get_or_load` is not stored if its key has been
+    invalidated while it was being loaded, since it may be stale.
+    A `ttl` of zero disables the cache.
+    """
+
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stats = CacheStats()
+        self._entries: OrderedDict[Tuple[Hashable, ...], Tuple[float, Any]] = OrderedDict()
+        self._loading: dict[Tuple[Hashable, ...], int] = {}
+        self._generations: dict[Tuple[Hashable, ...], int] = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: Tuple[Hashable, ...], load: Callable[[], Any]) -> Any:
+        """
+        Returns the value stored for the given key or, if it is missing
+        or expired, invokes `load` to get it and stores it.
+
+        Args:
+            key (tuple): The key of the entry.
+            load (callable): A callable that returns the value to cache.
+
+        Returns:
+            Any: A copy of the cached value.
+        """
+        if self.ttl <= 0:
+            return load()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats.record(hit=True)
+                return copy.deepcopy(entry[1])
+            generation = self._generations.get(key, 0)
+            self._loading[key] = self._loading.get(key, 0) + 1
+        self.stats.record(hit=False)
+        evicted = 0
+        try:
+            value = load()
+            with self._lock:
+                if self._generations.get(key, 0) == generation:
+                    evicted = self._store(key, value)
+        finally:
+            with self._lock:
+                self._loading[key] -= 1
+                if not self._loading[key]:
+                    del self._loading[key]
+                    self._generations.pop(key, None)
+        if evicted:
+            self.stats.record_evictions(evicted)
+        return value
+
+    def get(self, key: Tuple[Hashable, ...]) -> Any:
+        """
+        Returns the value stored for the given key or None if it is
+        missing or expired.
+
+        Args:
+            key (tuple): The key of the entry.
+
+        Returns:
+            Any: A copy of the cached value or None.
+        """
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats.record(hit=True)
+                return copy.deepcopy(entry[1])
+        self.stats.record(hit=False)
+        return None
+
+    def set(self, key: Tuple[Hashable, ...], value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            evicted = self._store(key, value)
+        if evicted:
+            self.stats.record_evictions(evicted)
+
+    def _store(self, key: Tuple[Hashable, ...], value: Any) -> int:
+        self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def invalidate(self, *prefix: Hashable) -> None:
+        """
+        Removes all the entries which key starts with the given items and
+        prevents the values being loaded for such keys from being stored.
+
+        Args:
+            prefix: The leading items of the keys to remove.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key[: len(prefix)] == prefix]
+            for key in keys:
+                del self._entries[key]
+            for key in self._loading:
+                if key[: len(prefix)] == prefix:
+                    self._generations[key] = self._generations.get(key, 0) + 1
+        if keys:
+            self.stats.record_invalidations(len(keys))
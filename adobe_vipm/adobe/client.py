@@ -6,33 +6,37 @@ from typing import List, MutableMapping, Tuple
 from urllib.parse import urlencode, urljoin
 from uuid import uuid4
 
-import requests
+from requests import Session
 
+from adobe_vipm.adobe.cache import TTLCache
+from adobe_vipm.adobe.coalescing import SingleFlight
 from adobe_vipm.adobe.config import Config, get_config
 from adobe_vipm.adobe.constants import (
-    OFFER_TYPE_CONSUMABLES,
-    OFFER_TYPE_LICENSE,
     ORDER_TYPE_NEW,
-    ORDER_TYPE_PREVIEW,
     ORDER_TYPE_PREVIEW_RENEWAL,
     ORDER_TYPE_RETURN,
-    STATUS_ORDER_CANCELLED,
     STATUS_PENDING,
     STATUS_PROCESSED,
 )
 from adobe_vipm.adobe.dataclasses import (
-    AdobeProduct,
     APIToken,
     Authorization,
     Reseller,
 )
 from adobe_vipm.adobe.errors import wrap_http_error
-from adobe_vipm.adobe.utils import (
-    get_actual_sku,
-    get_item_to_return,
-    join_phone_number,
-    to_adobe_line_id,
+from adobe_vipm.adobe.orders import CustomerOrdersIndex
+from adobe_vipm.adobe.payloads import (
+    get_3yc_request_payload,
+    get_customer_payload,
+    get_new_order_payload,
+    get_preview_order_payload,
+    get_reseller_payload,
+    get_return_order_payload,
+    get_update_subscription_payload,
 )
+from adobe_vipm.adobe.sessions import SessionManager
+from adobe_vipm.adobe.tokens import TokenManager
+from adobe_vipm.token_store import get_token_store
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +44,18 @@ logger = logging.getLogger(__name__)
 class AdobeClient:
     def __init__(self) -> None:
         self._config: Config = get_config()
-        self._token_cache: MutableMapping[Authorization, APIToken] = {}
+        self._sessions: SessionManager = SessionManager(self._config)
+        self._cache: TTLCache = TTLCache(
+            self._config.cache_ttl_secs,
+            self._config.cache_max_size,
+        )
+        self._single_flight: SingleFlight = SingleFlight()
+        self._token_manager: TokenManager = TokenManager(
+            self._refresh_auth_token,
+            renew_ahead_secs=self._config.token_renew_ahead_secs,
+            renew_interval_secs=self._config.token_renew_interval_secs,
+            store=get_token_store(),
+        )
 
     @wrap_http_error
     def create_reseller_account(
@@ -62,38 +77,12 @@ class AdobeClient:
             str: The identifier of the reseller in the Adobe VIP Markerplace.
         """
         authorization = self._config.get_authorization(authorization_id)
-        payload = {
-            "externalReferenceId": reseller_id,
-            "distributorId": authorization.distributor_id,
-            "companyProfile": {
-                "companyName": reseller_data["companyName"],
-                "preferredLanguage": self._config.get_preferred_language(
-                    reseller_data["address"]["country"]
-                ),
-                "address": {
-                    "country": reseller_data["address"]["country"],
-                    "region": reseller_data["address"]["state"],
-                    "city": reseller_data["address"]["city"],
-                    "addressLine1": reseller_data["address"]["addressLine1"],
-                    "addressLine2": reseller_data["address"]["addressLine2"],
-                    "postalCode": reseller_data["address"]["postCode"],
-                    "phoneNumber": join_phone_number(reseller_data["contact"]["phone"]),
-                },
-                "contacts": [
-                    {
-                        "firstName": reseller_data["contact"]["firstName"],
-                        "lastName": reseller_data["contact"]["lastName"],
-                        "email": reseller_data["contact"]["email"],
-                        "phoneNumber": join_phone_number(
-                            reseller_data["contact"]["phone"]
-                        ),
-                    }
-                ],
-            },
-        }
+        payload = get_reseller_payload(
+            self._config, authorization, reseller_id, reseller_data,
+        )
         correlation_id = sha256(json.dumps(payload).encode()).hexdigest()
         headers = self._get_headers(authorization, correlation_id=correlation_id)
-        response = requests.post(
+        response = self._get_session(authorization).post(
             urljoin(self._config.api_base_url, "/v3/resellers"),
             headers=headers,
             json=payload,
@@ -132,71 +121,10 @@ class AdobeClient:
         """
         authorization = self._config.get_authorization(authorization_id)
         reseller: Reseller = self._config.get_reseller(authorization, seller_id)
-        company_name: str = f"{customer_data['companyName']} ({agreement_id})"
-        country = self._config.get_country(customer_data["address"]["country"])
-        state_or_province = customer_data["address"]["state"]
-        state_code = (
-            state_or_province
-            if not country.provinces_to_code
-            else country.provinces_to_code.get(state_or_province, state_or_province)
-        )
-        payload = {
-            "resellerId": reseller.id,
-            "externalReferenceId": agreement_id,
-            "companyProfile": {
-                "companyName": company_name,
-                "preferredLanguage": self._config.get_preferred_language(
-                    customer_data["address"]["country"],
-                ),
-                "address": {
-                    "country": customer_data["address"]["country"],
-                    "region": state_code,
-                    "city": customer_data["address"]["city"],
-                    "addressLine1": customer_data["address"]["addressLine1"],
-                    "addressLine2": customer_data["address"]["addressLine2"],
-                    "postalCode": customer_data["address"]["postCode"],
-                    "phoneNumber": join_phone_number(customer_data["contact"]["phone"]),
-                },
-                "contacts": [
-                    {
-                        "firstName": customer_data["contact"]["firstName"],
-                        "lastName": customer_data["contact"]["lastName"],
-                        "email": customer_data["contact"]["email"],
-                        "phoneNumber": join_phone_number(
-                            customer_data["contact"]["phone"]
-                        ),
-                    },
-                ],
-            },
-        }
-        if customer_data["3YC"] == ["Yes"]:
-            quantities = []
-            if customer_data["3YCLicenses"]:
-                quantities.append(
-                    {
-                        "offerType": OFFER_TYPE_LICENSE,
-                        "quantity": int(customer_data["3YCLicenses"]),
-                    },
-                )
-            if customer_data["3YCConsumables"]:
-                quantities.append(
-                    {
-                        "offerType": OFFER_TYPE_CONSUMABLES,
-                        "quantity": int(customer_data["3YCConsumables"]),
-                    },
-                )
-            payload["benefits"] = [
-                {
-                    "type": "THREE_YEAR_COMMIT",
-                    "commitmentRequest": {
-                        "minimumQuantities": quantities,
-                    },
-                },
-            ]
-
+        payload = get_customer_payload(self._config, reseller, agreement_id, customer_data)
         correlation_id = sha256(json.dumps(payload).encode()).hexdigest()
         headers = self._get_headers(authorization, correlation_id=correlation_id)
-        response = requests.post(
+        response = self._get_session(authorization).post(
             urljoin(self._config.api_base_url, "/v3/customers"),
             headers=headers,
             json=payload,
@@ -207,12 +135,44 @@ class AdobeClient:
         created_customer = response.json()
         adobe_customer_id = created_customer["customerId"]
         logger.info(
-            f"Customer {company_name} "
+            f"Customer {payload['companyProfile']['companyName']} "
             f"created successfully for reseller {reseller.id}: {adobe_customer_id}",
         )
         return created_customer
 
     @wrap_http_error
+    def get_customer_orders_index(
+        self,
+        authorization_id: str,
+        customer_id: str,
+    ) -> CustomerOrdersIndex:
+        """
+        Retrieves in bulk all the NEW and RETURN orders placed by the customer
+        identified by `customer_id` and returns an index to look them up.
+
+        Args:
+            authorization_id (str): Id of the authorization to use.
+            customer_id (str): Identifier of the customer that placed the orders.
+
+        Returns:
+            CustomerOrdersIndex: The index of the orders of the customer.
+        """
+        authorization = self._config.get_authorization(authorization_id)
+        new_orders = self._get_orders(
+            authorization,
+            customer_id,
+            {"order-type": ORDER_TYPE_NEW},
+        )
+        return_orders = self._get_orders(
+            authorization,
+            customer_id,
+            {
+                "order-type": ORDER_TYPE_RETURN,
+                "status": [STATUS_PROCESSED, STATUS_PENDING],
+            },
+        )
+        return CustomerOrdersIndex(new_orders, return_orders)
+
     def search_new_and_returned_orders_by_sku_line_number(
         self,
         authorization_id: str,
@@ -224,97 +184,23 @@ class AdobeClient:
         Search all the NEW orders placed by the customer identified by `customer_id`
         for a a given `sku` and `line_number` and the corresponding RETURN order
         if it exists.
+        To look up several lines of the same customer, retrieve the index once
+        through `get_customer_orders_index` and search it instead.
 
         Args:
             authorization_id (str): Id of the authorization to use.
-            seller_id (str): Id of the seller to use.
             customer_id (str): Identifier of the customer that placed the order.
             sku (str): The SKU to search for.
-            line_number (int): the line number to search for.
+            mpt_line_id (str): the id of the Marketplace line to search for.
 
         Returns:
             list: Return a list of three values tuple with the NEW order the item identified
             by the pair sku, line_number and the RETURN order if it exists or None.
         """
-        authorization = self._config.get_authorization(authorization_id)
-        headers = self._get_headers(authorization)
-
-        line_number = to_adobe_line_id(mpt_line_id)
-
-        orders = []
-        orders_base_url = f"/v3/customers/{customer_id}/orders"
-
-        new_orders_params = {
-            "order-type": ORDER_TYPE_NEW,
-            "limit": 100,
-            "offset": 0,
-        }
-
-        new_orders_next_url = f"{orders_base_url}?{urlencode(new_orders_params)}"
-
-        while new_orders_next_url:
-            new_orders_response = requests.get(
-                urljoin(self._config.api_base_url, new_orders_next_url),
-                headers=headers,
-            )
-            new_orders_response.raise_for_status()
-            new_orders_page = new_orders_response.json()
-            for order in new_orders_page["items"]:
-                if order["status"] not in [STATUS_PROCESSED, STATUS_ORDER_CANCELLED]:
-                    continue
-                actual_sku = get_actual_sku(order["lineItems"], sku)
-                if not actual_sku:
-                    continue
-
-                logger.debug(
-                    f"Found order to return for sku {actual_sku}: {order['orderId']}"
-                )
-
-                item_to_return = get_item_to_return(order["lineItems"], line_number)
-                external_id = f"{order['externalReferenceId']}-{line_number}"
-
-                returned_orders_response = requests.get(
-                    urljoin(self._config.api_base_url, orders_base_url),
-                    headers=headers,
-                    params={
-                        "reference-order-id": order["orderId"],
-                        "offer-id": actual_sku,
-                        "order-type": ORDER_TYPE_RETURN,
-                        "status": [STATUS_PROCESSED, STATUS_PENDING],
-                        "limit": 1,
-                        "offset": 0,
-                    },
-                )
-                returned_orders_response.raise_for_status()
-                returned_orders_page = returned_orders_response.json()
-                if returned_orders_page["totalCount"] == 0:
-                    logger.debug(
-                        f"No return order found for order {order['orderId']} "
-                        f"and external_id {external_id}",
-                    )
-                    orders.append((order, item_to_return, None))
-                    continue
-
-                return_order = returned_orders_page["items"][0]
-
-                if return_order["externalReferenceId"] != external_id:
-                    logger.debug(
-                        f"No return order found for order {order['orderId']} "
-                        f"and external_id {external_id}",
-                    )
-                    orders.append((order, item_to_return, None))
-                    continue
-
-                logger.debug(
-                    f"Return order found for order {order['orderId']} "
-                    f"and external_id {external_id}",
-                )
-
-                orders.append((order, item_to_return, return_order))
-
-            new_orders_next_url = new_orders_page["links"].get("next", {}).get("uri")
-
-        return orders
+        return self.get_customer_orders_index(
+            authorization_id,
+            customer_id,
+        ).search_new_and_returned_orders_by_sku_line_number(sku, mpt_line_id)
 
     @wrap_http_error
     def create_return_order(
@@ -338,35 +224,17 @@ class AdobeClient:
             dict: The RETURN order.
         """
         authorization = self._config.get_authorization(authorization_id)
-        line_number = returning_item["extLineItemNumber"]
-        quantity = returning_item["quantity"]
-        sku = returning_item["offerId"]
-        external_id = f"{returning_order['externalReferenceId']}-{line_number}"
-        payload = {
-            "externalReferenceId": external_id,
-            "referenceOrderId": returning_order["orderId"],
-            "currencyCode": authorization.currency,
-            "orderType": ORDER_TYPE_RETURN,
-            "lineItems": [],
-        }
-
-        payload["lineItems"].append(
-            {
-                "extLineItemNumber": line_number,
-                "offerId": sku,
-                "quantity": quantity,
-            },
-        )
-
+        payload = get_return_order_payload(authorization, returning_order, returning_item)
         headers = self._get_headers(
             authorization,
-            correlation_id=external_id,
+            correlation_id=payload["externalReferenceId"],
         )
-        response = requests.post(
+        response = self._get_session(authorization).post(
             urljoin(self._config.api_base_url, f"/v3/customers/{customer_id}/orders"),
             headers=headers,
             json=payload,
         )
+        self._cache.invalidate(authorization.authorization_uk, customer_id)
         response.raise_for_status()
         return response.json()
 
@@ -395,38 +263,9 @@ class AdobeClient:
             dict: The PREVIEW order.
         """
         authorization = self._config.get_authorization(authorization_id)
-        payload = {
-            "externalReferenceId": order_id,
-            "currencyCode": authorization.currency,
-            "orderType": ORDER_TYPE_PREVIEW,
-            "lineItems": [],
-        }
-
-        for line in lines:
-            product: AdobeProduct = self._config.get_adobe_product(
-                line["item"]["externalIds"]["vendor"]
-            )
-            quantity = line["quantity"]
-            old_quantity = line["oldQuantity"]
-
-            if quantity > old_quantity:
-                # For purchasing new lines (oldQuantity = 0) or upsizing lines
-                # quantity it must send the delta (quantity - oldQuantity) since
-                # it is placing a new order.
-                # For downsizing lines quantity it must send the actual quantity
-                # since the previous purchased quantity has been returned back
-                # through one or more RETURN orders.
-                quantity = quantity - old_quantity
-            payload["lineItems"].append(
-                {
-                    "extLineItemNumber": to_adobe_line_id(line["id"]),
-                    "offerId": product.sku,
-                    "quantity": quantity,
-                }
-            )
-
+        payload = get_preview_order_payload(self._config, authorization, order_id, lines)
         headers = self._get_headers(authorization)
-        response = requests.post(
+        response = self._get_session(authorization).post(
             urljoin(self._config.api_base_url, f"/v3/customers/{customer_id}/orders"),
             headers=headers,
             json=payload,
@@ -453,22 +292,17 @@ class AdobeClient:
             dict: The NEW order.
         """
         authorization = self._config.get_authorization(authorization_id)
-        payload = {
-            "externalReferenceId": adobe_preview_order["externalReferenceId"],
-            "currencyCode": authorization.currency,
-            "orderType": ORDER_TYPE_NEW,
-            "lineItems": adobe_preview_order["lineItems"],
-        }
-
+        payload = get_new_order_payload(authorization, adobe_preview_order)
         headers = self._get_headers(
             authorization,
             correlation_id=adobe_preview_order["externalReferenceId"],
         )
-        response = requests.post(
+        response = self._get_session(authorization).post(
             urljoin(self._config.api_base_url, f"/v3/customers/{customer_id}/orders"),
             headers=headers,
             json=payload,
         )
+        self._cache.invalidate(authorization.authorization_uk, customer_id)
         response.raise_for_status()
         return response.json()
 
@@ -491,7 +325,7 @@ class AdobeClient:
         authorization = self._config.get_authorization(authorization_id)
         payload = {"orderType": ORDER_TYPE_PREVIEW_RENEWAL}
         headers = self._get_headers(authorization)
-        response = requests.post(
+        response = self._get_session(authorization).post(
             urljoin(self._config.api_base_url, f"/v3/customers/{customer_id}/orders"),
             headers=headers,
             json=payload,
@@ -518,16 +352,7 @@ class AdobeClient:
             dict: The retrieved order.
         """
         authorization = self._config.get_authorization(authorization_id)
-        headers = self._get_headers(authorization)
-        response = requests.get(
-            urljoin(
-                self._config.api_base_url,
-                f"/v3/customers/{customer_id}/orders/{order_id}",
-            ),
-            headers=headers,
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get(authorization, f"/v3/customers/{customer_id}/orders/{order_id}")
 
     @wrap_http_error
     def get_subscription(
@@ -548,18 +373,14 @@ class AdobeClient:
             str: The retrieved subscription.
         """
         authorization = self._config.get_authorization(authorization_id)
-        headers = self._get_headers(authorization)
-        response = requests.get(
-            urljoin(
-                self._config.api_base_url,
+        return self._cache.get_or_load(
+            (authorization.authorization_uk, customer_id, subscription_id),
+            lambda: self._get(
+                authorization,
                 f"/v3/customers/{customer_id}/subscriptions/{subscription_id}",
             ),
-            headers=headers,
         )
 
-        response.raise_for_status()
-        return response.json()
-
     @wrap_http_error
     def get_subscriptions(
         self,
@@ -577,17 +398,7 @@ class AdobeClient:
             dict: The retrieved subscriptions.
         """
         authorization = self._config.get_authorization(authorization_id)
-        headers = self._get_headers(authorization)
-        response = requests.get(
-            urljoin(
-                self._config.api_base_url,
-                f"/v3/customers/{customer_id}/subscriptions",
-            ),
-            headers=headers,
-        )
-
-        response.raise_for_status()
-        return response.json()
+        return self._get(authorization, f"/v3/customers/{customer_id}/subscriptions")
 
     @wrap_http_error
     def update_subscription(
@@ -616,15 +427,8 @@ class AdobeClient:
         """
         authorization = self._config.get_authorization(authorization_id)
         headers = self._get_headers(authorization)
-        payload = {
-            "autoRenewal": {
-                "enabled": auto_renewal,
-            },
-        }
-        if quantity:
-            payload["autoRenewal"]["renewalQuantity"] = quantity
-
-        response = requests.patch(
+        payload = get_update_subscription_payload(auto_renewal, quantity)
+        response = self._get_session(authorization).patch(
             urljoin(
                 self._config.api_base_url,
                 f"/v3/customers/{customer_id}/subscriptions/{subscription_id}",
@@ -632,6 +436,7 @@ class AdobeClient:
             headers=headers,
             json=payload,
         )
+        self._cache.invalidate(authorization.authorization_uk, customer_id)
 
         response.raise_for_status()
         return response.json()
@@ -654,22 +459,15 @@ class AdobeClient:
             dict: a transfer preview object.
         """
         authorization = self._config.get_authorization(authorization_id)
-        headers = self._get_headers(authorization)
-        response = requests.get(
-            urljoin(
-                self._config.api_base_url,
-                f"/v3/memberships/{membership_id}/offers",
-            ),
-            headers=headers,
+        return self._get(
+            authorization,
+            f"/v3/memberships/{membership_id}/offers",
             params={
                 "ignore-order-return": "true",
                 "expire-open-pas": "true",
             },
         )
 
-        response.raise_for_status()
-        return response.json()
-
     @wrap_http_error
     def create_transfer(
         self,
@@ -695,7 +493,7 @@ class AdobeClient:
         authorization = self._config.get_authorization(authorization_id)
         reseller: Reseller = self._config.get_reseller(authorization, seller_id)
         headers = self._get_headers(authorization, correlation_id=order_id)
-        response = requests.post(
+        response = self._get_session(authorization).post(
             urljoin(
                 self._config.api_base_url,
                 f"/v3/memberships/{membership_id}/transfers",
@@ -732,18 +530,11 @@ class AdobeClient:
             dict: A transfer object.
         """
         authorization = self._config.get_authorization(authorization_id)
-        headers = self._get_headers(authorization)
-        response = requests.get(
-            urljoin(
-                self._config.api_base_url,
-                f"/v3/memberships/{membership_id}/transfers/{transfer_id}",
-            ),
-            headers=headers,
+        return self._get(
+            authorization,
+            f"/v3/memberships/{membership_id}/transfers/{transfer_id}",
         )
 
-        response.raise_for_status()
-        return response.json()
-
     @wrap_http_error
     def get_customer(
         self,
@@ -761,18 +552,11 @@ class AdobeClient:
             dict: A customer object.
         """
         authorization = self._config.get_authorization(authorization_id)
-        headers = self._get_headers(authorization)
-        response = requests.get(
-            urljoin(
-                self._config.api_base_url,
-                f"/v3/customers/{customer_id}",
-            ),
-            headers=headers,
+        return self._cache.get_or_load(
+            (authorization.authorization_uk, customer_id),
+            lambda: self._get(authorization, f"/v3/customers/{customer_id}"),
         )
 
-        response.raise_for_status()
-        return response.json()
-
     @wrap_http_error
     def create_3yc_request(
         self,
@@ -785,48 +569,114 @@ class AdobeClient:
 
         customer = self.get_customer(authorization_id, customer_id)
 
-        request_type = "commitmentRequest" if not is_recommitment else "recommitmentRequest"
-
-        quantities = []
-        if commitment_request["3YCLicenses"]:
-            quantities.append(
-                {
-                    "offerType": "LICENSE",
-                    "quantity": int(commitment_request["3YCLicenses"]),
-                },
-            )
-        if commitment_request["3YCConsumables"]:
-            quantities.append(
-                {
-                    "offerType": "CONSUMABLES",
-                    "quantity": int(commitment_request["3YCConsumables"]),
-                },
-            )
-        payload = {
-            "companyProfile": customer["companyProfile"],
-            "benefits": [
-                {
-                    "type": "THREE_YEAR_COMMIT",
-                    request_type: {
-                        "minimumQuantities": quantities,
-                    },
-                },
-            ]
-        }
+        payload = get_3yc_request_payload(customer, commitment_request, is_recommitment)
 
         correlation_id = sha256(json.dumps(payload).encode()).hexdigest()
         headers = self._get_headers(authorization, correlation_id=correlation_id)
-        response = requests.patch(
+        response = self._get_session(authorization).patch(
             urljoin(self._config.api_base_url, f"/v3/customers/{customer_id}"),
             headers=headers,
             json=payload,
         )
+        self._cache.invalidate(authorization.authorization_uk, customer_id)
 
         response.raise_for_status()
 
         updated_customer = response.json()
         return updated_customer
 
+    def get_pool_stats(self) -> MutableMapping[str, dict]:
+        """
+        Returns the counters of the HTTP connection pools used to
+        consume the Adobe VIP Marketplace API.
+
+        Returns:
+            dict: A dictionary keyed by authorization_uk with the number of connections
+            created, reused and waited on.
+        """
+        return self._sessions.get_stats()
+
+    def get_throttling_stats(self) -> MutableMapping[str, dict]:
+        """
+        Returns the counters of the rate limiters that pace the calls
+        to the Adobe VIP Marketplace API.
+
+        Returns:
+            dict: A dictionary keyed by authorization_uk with the number of requests,
+            the time they spent waiting in the queue and the throttled responses.
+        """
+        return self._sessions.get_throttling_stats()
+
+    def get_coalescing_stats(self) -> dict:
+        """
+        Returns the counters of the layer that coalesces identical
+        GET requests in flight.
+
+        Returns:
+            dict: The number of GET calls and how many of them joined
+            an identical request already in flight.
+        """
+        return self._single_flight.stats.to_dict()
+
+    def get_cache_stats(self) -> dict:
+        """
+        Returns the counters of the cache of customers and subscriptions.
+
+        Returns:
+            dict: The number of cache hits, misses, evictions and invalidations.
+        """
+        return self._cache.stats.to_dict()
+
+    def _get_session(self, authorization: Authorization) -> Session:
+        return self._sessions.get_session(authorization)
+
+    def _get_orders(
+        self,
+        authorization: Authorization,
+        customer_id: str,
+        params: dict,
+    ) -> List[dict]:
+        orders = []
+        next_url = f"/v3/customers/{customer_id}/orders?" + urlencode(
+            {**params, "limit": 100, "offset": 0},
+            doseq=True,
+        )
+        while next_url:
+            page = self._get(authorization, next_url)
+            orders.extend(page["items"])
+            next_url = page.get("links", {}).get("next", {}).get("uri")
+        return orders
+
+    def _get(
+        self,
+        authorization: Authorization,
+        path: str,
+        params: dict | None = None,
+    ) -> dict:
+        """
+        Performs a GET request to the Adobe VIP Marketplace API. Concurrent
+        identical requests (same authorization, path and params) share
+        a single network request and its parsed response.
+        """
+
+        def _request():
+            response = self._get_session(authorization).get(
+                urljoin(self._config.api_base_url, path),
+                headers=self._get_headers(authorization),
+                params=params,
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return self._single_flight.do(
+            (
+                authorization.authorization_uk,
+                path,
+                tuple(sorted((params or {}).items())),
+            ),
+            _request,
+        )
+
     def _get_headers(self, authorization: Authorization, correlation_id=None):
         return {
             "X-Api-Key": authorization.client_id,
@@ -837,7 +687,7 @@ class AdobeClient:
             "x-correlation-id": correlation_id or str(uuid4()),
         }
 
-    def _refresh_auth_token(self, authorization: Authorization):
+    def _refresh_auth_token(self, authorization: Authorization) -> APIToken:
         """
         Request an authentication token for the Adobe VIPM API
         using the credentials associated to a given the reseller.
@@ -849,27 +699,22 @@ class AdobeClient:
             "client_secret": authorization.client_secret,
             "scope": self._config.api_scopes,
         }
-        response = requests.post(
+        response = self._get_session(authorization).post(
             url=self._config.auth_endpoint_url,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
             data=data,
         )
-        if response.status_code == 200:
-            token_info = response.json()
-            self._token_cache[authorization] = APIToken(
-                token=token_info["access_token"],
-                expires=(
-                    datetime.now() + timedelta(seconds=token_info["expires_in"] - 180)
-                ),
-            )
         response.raise_for_status()
+        token_info = response.json()
+        return APIToken(
+            token=token_info["access_token"],
+            expires=(
+                datetime.now() + timedelta(seconds=token_info["expires_in"] - 180)
+            ),
+        )
 
-    def _get_auth_token(self, authorization: Authorization):
-        token: APIToken | None = self._token_cache.get(authorization)
-        if not token or token.is_expired():
-            self._refresh_auth_token(authorization)
-        token = self._token_cache[authorization]
-        return token
+    def _get_auth_token(self, authorization: Authorization) -> APIToken:
+        return self._token_manager.get_token(authorization)
 
 
 _ADOBE_CLIENT = None
@@ -0,0 +1,122 @@
+import asyncio
+import copy
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable, MutableMapping, Tuple
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int = 0
+    coalesced: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, coalesced: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            if coalesced:
+                self.coalesced += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call for a given key is
+    in flight, the other callers asking for the same key wait for its outcome
+    instead of performing their own.
+
+    It must only be used for idempotent operations. Every caller gets its
+    own deep copy of the result, so they can freely modify it, or the same
+    exception raised by the call.
+    """
+
+    def __init__(self) -> None:
+        self.stats = SingleFlightStats()
+        self._inflight: MutableMapping[Tuple[Hashable, ...], Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Tuple[Hashable, ...], call: Callable[[], Any]) -> Any:
+        """
+        Invokes `call` unless a call for the same key is already in flight,
+        in which case waits for it and returns its result.
+
+        Args:
+            key (tuple): The key that identifies the call.
+            call (callable): A callable that performs the call.
+
+        Returns:
+            Any: The result of the call.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+        self.stats.record(coalesced=not is_leader)
+
+        if not is_leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = call()
+            future.set_result(result)
+            return copy.deepcopy(result)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio twin of the `SingleFlight`: concurrent identical calls issued
+    from the same event loop share a single call. It can be given the
+    stats of a `SingleFlight` so the counters are shared with it.
+    """
+
+    def __init__(self, stats: SingleFlightStats | None = None) -> None:
+        self.stats = stats or SingleFlightStats()
+        self._inflight: MutableMapping[Tuple[Hashable, ...], asyncio.Future] = {}
+
+    async def do(self, key: Tuple[Hashable, ...], call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Awaits `call` unless a call for the same key is already in flight,
+        in which case waits for it and returns its result.
+
+        Args:
+            key (tuple): The key that identifies the call.
+            call (callable): A callable that returns the awaitable performing the call.
+
+        Returns:
+            Any: The result of the call.
+        """
+        future = self._inflight.get(key)
+        self.stats.record(coalesced=future is not None)
+        if future is not None:
+            return copy.deepcopy(await asyncio.shield(future))
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await call()
+            future.set_result(result)
+            return copy.deepcopy(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # mark the exception as retrieved in case no other caller awaits it
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
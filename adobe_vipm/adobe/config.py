@@ -16,6 +16,7 @@ from adobe_vipm.adobe.errors import (
     CountryNotFoundError,
     ResellerNotFoundError,
 )
+from adobe_vipm.circuit_breaker import get_timeout
 from adobe_vipm.utils import find_first
 
 
@@ -42,6 +43,66 @@ class Config:
     def api_scopes(self) -> str:
         return ",".join(self.REQUIRED_API_SCOPES)
 
+    @property
+    def http_pool_size(self) -> int:
+        return int(settings.EXTENSION_CONFIG.get("ADOBE_HTTP_POOL_SIZE", "10"))
+
+    @property
+    def http_pool_block(self) -> bool:
+        return self._get_flag("ADOBE_HTTP_POOL_BLOCK", "0")
+
+    @property
+    def http_max_retries(self) -> int:
+        return int(settings.EXTENSION_CONFIG.get("ADOBE_HTTP_MAX_RETRIES", "3"))
+
+    @property
+    def http_timeout(self) -> Tuple[float, float]:
+        return get_timeout("ADOBE")
+
+    @property
+    def http_keepalive(self) -> bool:
+        return self._get_flag("ADOBE_HTTP_KEEPALIVE", "1")
+
+    @property
+    def max_concurrent_requests(self) -> int:
+        return int(settings.EXTENSION_CONFIG.get("ADOBE_MAX_CONCURRENT_REQUESTS", "10"))
+
+    @property
+    def rate_limit(self) -> float:
+        return float(settings.EXTENSION_CONFIG.get("ADOBE_RATE_LIMIT", "10"))
+
+    @property
+    def rate_limit_burst(self) -> int:
+        return int(settings.EXTENSION_CONFIG.get("ADOBE_RATE_LIMIT_BURST", "10"))
+
+    @property
+    def throttling_max_retries(self) -> int:
+        return int(settings.EXTENSION_CONFIG.get("ADOBE_THROTTLING_MAX_RETRIES", "5"))
+
+    @property
+    def throttling_backoff_secs(self) -> float:
+        return float(settings.EXTENSION_CONFIG.get("ADOBE_THROTTLING_BACKOFF_SECS", "1"))
+
+    @property
+    def throttling_max_backoff_secs(self) -> float:
+        return float(settings.EXTENSION_CONFIG.get("ADOBE_THROTTLING_MAX_BACKOFF_SECS", "60"))
+
+    @property
+    def cache_ttl_secs(self) -> float:
+        return float(settings.EXTENSION_CONFIG.get("ADOBE_CACHE_TTL_SECS", "30"))
+
+    @property
+    def cache_max_size(self) -> int:
+        return int(settings.EXTENSION_CONFIG.get("ADOBE_CACHE_MAX_SIZE", "1024"))
+
+    @property
+    def token_renew_ahead_secs(self) -> int:
+        return int(settings.EXTENSION_CONFIG.get("ADOBE_TOKEN_RENEW_AHEAD_SECS", "120"))
+
+    @property
+    def token_renew_interval_secs(self) -> int:
+        return int(settings.EXTENSION_CONFIG.get("ADOBE_TOKEN_RENEW_INTERVAL_SECS", "30"))
+
     @property
     def country_codes(self) -> List[str]:
         return list(self.countries.keys())
@@ -160,6 +221,14 @@ class Config:
             "en-US",
         )
 
+    @classmethod
+    def _get_flag(cls, name: str, default: str) -> bool:
+        return str(settings.EXTENSION_CONFIG.get(name, default)).lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+
     @classmethod
     def _load_credentials(cls):
         with open(settings.EXTENSION_CONFIG["ADOBE_CREDENTIALS_FILE"]) as f:
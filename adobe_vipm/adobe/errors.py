@@ -1,8 +1,9 @@
 import json
 from functools import wraps
-from typing import Callable, ParamSpec, TypeVar
+from typing import Awaitable, Callable, ParamSpec, TypeVar
 
-from requests import HTTPError, JSONDecodeError
+import httpx
+from requests import HTTPError, Response
 
 Param = ParamSpec("Param")
 RetType = TypeVar("RetType")
@@ -52,15 +53,32 @@ class AdobeAPIError(AdobeHttpError):
         return str(self.payload)
 
 
+def _get_adobe_error(response: Response | httpx.Response) -> AdobeHttpError:
+    try:
+        return AdobeAPIError(response.status_code, response.json())
+    except (json.JSONDecodeError, KeyError):
+        return AdobeHttpError(response.status_code, response.content.decode())
+
+
 def wrap_http_error(func: Callable[Param, RetType]) -> Callable[Param, RetType]:
     @wraps(func)
     def _wrapper(*args: Param.args, **kwargs: Param.kwargs) -> RetType:
         try:
             return func(*args, **kwargs)
         except HTTPError as e:
-            try:
-                raise AdobeAPIError(e.response.status_code, e.response.json())
-            except JSONDecodeError:
-                raise AdobeHttpError(e.response.status_code, e.response.content.decode())
+            raise _get_adobe_error(e.response)
+
+    return _wrapper
+
+
+def wrap_async_http_error(
+    func: Callable[Param, Awaitable[RetType]],
+) -> Callable[Param, Awaitable[RetType]]:
+    @wraps(func)
+    async def _wrapper(*args: Param.args, **kwargs: Param.kwargs) -> RetType:
+        try:
+            return await func(*args, **kwargs)
+        except httpx.HTTPStatusError as e:
+            raise _get_adobe_error(e.response)
 
     return _wrapper
@@ -0,0 +1,118 @@
+import logging
+import threading
+from collections import defaultdict
+from typing import Iterable, List, MutableMapping, Tuple
+
+from adobe_vipm.adobe.constants import (
+    STATUS_ORDER_CANCELLED,
+    STATUS_PENDING,
+    STATUS_PROCESSED,
+)
+from adobe_vipm.adobe.utils import (
+    get_actual_sku,
+    get_item_to_return,
+    to_adobe_line_id,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CustomerOrdersIndex:
+    """
+    In-memory index of the NEW and RETURN orders of a customer.
+
+    It is built once from the orders retrieved in bulk from Adobe and
+    answers the lookups of the items to return for every order line
+    without further requests.
+    NEW orders are indexed by SKU the first time such SKU is looked up,
+    RETURN orders are indexed by the identifier of the order they return.
+    The index can be shared by the threads that handle the lines of an order,
+    i.e. to add the RETURN orders they create.
+    """
+
+    def __init__(self, new_orders: Iterable[dict], return_orders: Iterable[dict]) -> None:
+        self.new_orders: List[dict] = [
+            order
+            for order in new_orders
+            if order["status"] in [STATUS_PROCESSED, STATUS_ORDER_CANCELLED]
+        ]
+        self.return_orders: MutableMapping[str, List[dict]] = defaultdict(list)
+        self._new_orders_by_sku: MutableMapping[str, List[Tuple[dict, str]]] = {}
+        self._lock = threading.Lock()
+        for return_order in return_orders:
+            self.add_return_order(return_order)
+
+    def add_return_order(self, return_order: dict) -> None:
+        """
+        Adds a RETURN order to the index, i.e. one that has just been created.
+
+        Args:
+            return_order (dict): The RETURN order to add.
+        """
+        if return_order.get("status") not in [STATUS_PROCESSED, STATUS_PENDING]:
+            return
+        with self._lock:
+            self.return_orders[return_order["referenceOrderId"]].append(return_order)
+
+    def get_return_orders(self, reference_order_id: str) -> List[dict]:
+        with self._lock:
+            return list(self.return_orders.get(reference_order_id, []))
+
+    def search_new_and_returned_orders_by_sku_line_number(
+        self,
+        sku: str,
+        mpt_line_id: str,
+    ) -> List[Tuple[dict, dict, dict | None]]:
+        """
+        Search all the NEW orders of the customer for a a given `sku` and
+        `line_number` and the corresponding RETURN order if it exists.
+
+        Args:
+            sku (str): The SKU to search for.
+            mpt_line_id (str): the id of the Marketplace line to search for.
+
+        Returns:
+            list: Return a list of three values tuple with the NEW order the item identified
+            by the pair sku, line_number and the RETURN order if it exists or None.
+        """
+        line_number = to_adobe_line_id(mpt_line_id)
+        orders = []
+        for order, actual_sku in self._get_new_orders_by_sku(sku):
+            item_to_return = get_item_to_return(order["lineItems"], line_number)
+            external_id = f"{order['externalReferenceId']}-{line_number}"
+            return_order = self._find_return_order(order["orderId"], actual_sku, external_id)
+            if return_order:
+                logger.debug(
+                    f"Return order found for order {order['orderId']} "
+                    f"and external_id {external_id}",
+                )
+            else:
+                logger.debug(
+                    f"No return order found for order {order['orderId']} "
+                    f"and external_id {external_id}",
+                )
+            orders.append((order, item_to_return, return_order))
+        return orders
+
+    def _get_new_orders_by_sku(self, sku: str) -> List[Tuple[dict, str]]:
+        with self._lock:
+            if sku not in self._new_orders_by_sku:
+                orders = []
+                for order in self.new_orders:
+                    actual_sku = get_actual_sku(order["lineItems"], sku)
+                    if actual_sku:
+                        logger.debug(
+                            f"Found order to return for sku {actual_sku}: {order['orderId']}"
+                        )
+                        orders.append((order, actual_sku))
+                self._new_orders_by_sku[sku] = orders
+            return self._new_orders_by_sku[sku]
+
+    def _find_return_order(
+        self, reference_order_id: str, actual_sku: str, external_id: str,
+    ) -> dict | None:
+        for return_order in self.get_return_orders(reference_order_id):
+            if return_order["externalReferenceId"] != external_id:
+                continue
+            if get_actual_sku(return_order["lineItems"], actual_sku):
+                return return_order
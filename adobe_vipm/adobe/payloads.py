@@ -0,0 +1,237 @@
+"""
+This module contains the functions that build the payloads of the requests
+to the Adobe VIP Marketplace API, shared by the synchronous and the asyncio
+clients.
+"""
+
+from adobe_vipm.adobe.config import Config
+from adobe_vipm.adobe.constants import (
+    OFFER_TYPE_CONSUMABLES,
+    OFFER_TYPE_LICENSE,
+    ORDER_TYPE_NEW,
+    ORDER_TYPE_PREVIEW,
+    ORDER_TYPE_RETURN,
+)
+from adobe_vipm.adobe.dataclasses import AdobeProduct, Authorization, Reseller
+from adobe_vipm.adobe.utils import join_phone_number, to_adobe_line_id
+
+
+def get_reseller_payload(
+    config: Config,
+    authorization: Authorization,
+    reseller_id: str,
+    reseller_data: dict,
+) -> dict:
+    return {
+        "externalReferenceId": reseller_id,
+        "distributorId": authorization.distributor_id,
+        "companyProfile": {
+            "companyName": reseller_data["companyName"],
+            "preferredLanguage": config.get_preferred_language(
+                reseller_data["address"]["country"]
+            ),
+            "address": {
+                "country": reseller_data["address"]["country"],
+                "region": reseller_data["address"]["state"],
+                "city": reseller_data["address"]["city"],
+                "addressLine1": reseller_data["address"]["addressLine1"],
+                "addressLine2": reseller_data["address"]["addressLine2"],
+                "postalCode": reseller_data["address"]["postCode"],
+                "phoneNumber": join_phone_number(reseller_data["contact"]["phone"]),
+            },
+            "contacts": [
+                {
+                    "firstName": reseller_data["contact"]["firstName"],
+                    "lastName": reseller_data["contact"]["lastName"],
+                    "email": reseller_data["contact"]["email"],
+                    "phoneNumber": join_phone_number(
+                        reseller_data["contact"]["phone"]
+                    ),
+                }
+            ],
+        },
+    }
+
+
+def get_customer_payload(
+    config: Config,
+    reseller: Reseller,
+    agreement_id: str,
+    customer_data: dict,
+) -> dict:
+    company_name: str = f"{customer_data['companyName']} ({agreement_id})"
+    country = config.get_country(customer_data["address"]["country"])
+    state_or_province = customer_data["address"]["state"]
+    state_code = (
+        state_or_province
+        if not country.provinces_to_code
+        else country.provinces_to_code.get(state_or_province, state_or_province)
+    )
+    payload = {
+        "resellerId": reseller.id,
+        "externalReferenceId": agreement_id,
+        "companyProfile": {
+            "companyName": company_name,
+            "preferredLanguage": config.get_preferred_language(
+                customer_data["address"]["country"],
+            ),
+            "address": {
+                "country": customer_data["address"]["country"],
+                "region": state_code,
+                "city": customer_data["address"]["city"],
+                "addressLine1": customer_data["address"]["addressLine1"],
+                "addressLine2": customer_data["address"]["addressLine2"],
+                "postalCode": customer_data["address"]["postCode"],
+                "phoneNumber": join_phone_number(customer_data["contact"]["phone"]),
+            },
+            "contacts": [
+                {
+                    "firstName": customer_data["contact"]["firstName"],
+                    "lastName": customer_data["contact"]["lastName"],
+                    "email": customer_data["contact"]["email"],
+                    "phoneNumber": join_phone_number(
+                        customer_data["contact"]["phone"]
+                    ),
+                },
+            ],
+        },
+    }
+    if customer_data["3YC"] == ["Yes"]:
+        quantities = []
+        if customer_data["3YCLicenses"]:
+            quantities.append(
+                {
+                    "offerType": OFFER_TYPE_LICENSE,
+                    "quantity": int(customer_data["3YCLicenses"]),
+                },
+            )
+        if customer_data["3YCConsumables"]:
+            quantities.append(
+                {
+                    "offerType": OFFER_TYPE_CONSUMABLES,
+                    "quantity": int(customer_data["3YCConsumables"]),
+                },
+            )
+        payload["benefits"] = [
+            {
+                "type": "THREE_YEAR_COMMIT",
+                "commitmentRequest": {
+                    "minimumQuantities": quantities,
+                },
+            },
+        ]
+    return payload
+
+
+def get_return_order_payload(
+    authorization: Authorization,
+    returning_order: dict,
+    returning_item: dict,
+) -> dict:
+    line_number = returning_item["extLineItemNumber"]
+    return {
+        "externalReferenceId": f"{returning_order['externalReferenceId']}-{line_number}",
+        "referenceOrderId": returning_order["orderId"],
+        "currencyCode": authorization.currency,
+        "orderType": ORDER_TYPE_RETURN,
+        "lineItems": [
+            {
+                "extLineItemNumber": line_number,
+                "offerId": returning_item["offerId"],
+                "quantity": returning_item["quantity"],
+            },
+        ],
+    }
+
+
+def get_preview_order_payload(
+    config: Config,
+    authorization: Authorization,
+    order_id: str,
+    lines: list,
+) -> dict:
+    payload = {
+        "externalReferenceId": order_id,
+        "currencyCode": authorization.currency,
+        "orderType": ORDER_TYPE_PREVIEW,
+        "lineItems": [],
+    }
+
+    for line in lines:
+        product: AdobeProduct = config.get_adobe_product(
+            line["item"]["externalIds"]["vendor"]
+        )
+        quantity = line["quantity"]
+        old_quantity = line["oldQuantity"]
+
+        if quantity > old_quantity:
+            # For purchasing new lines (oldQuantity = 0) or upsizing lines
+            # quantity it must send the delta (quantity - oldQuantity) since
+            # it is placing a new order.
+            # For downsizing lines quantity it must send the actual quantity
+            # since the previous purchased quantity has been returned back
+            # through one or more RETURN orders.
+            quantity = quantity - old_quantity
+        payload["lineItems"].append(
+            {
+                "extLineItemNumber": to_adobe_line_id(line["id"]),
+                "offerId": product.sku,
+                "quantity": quantity,
+            }
+        )
+    return payload
+
+
+def get_new_order_payload(authorization: Authorization, adobe_preview_order: dict) -> dict:
+    return {
+        "externalReferenceId": adobe_preview_order["externalReferenceId"],
+        "currencyCode": authorization.currency,
+        "orderType": ORDER_TYPE_NEW,
+        "lineItems": adobe_preview_order["lineItems"],
+    }
+
+
+def get_update_subscription_payload(auto_renewal: bool, quantity: int | None) -> dict:
+    payload = {
+        "autoRenewal": {
+            "enabled": auto_renewal,
+        },
+    }
+    if quantity:
+        payload["autoRenewal"]["renewalQuantity"] = quantity
+    return payload
+
+
+def get_3yc_request_payload(
+    customer: dict,
+    commitment_request: dict,
+    is_recommitment: bool,
+) -> dict:
+    request_type = "commitmentRequest" if not is_recommitment else "recommitmentRequest"
+
+    quantities = []
+    if commitment_request["3YCLicenses"]:
+        quantities.append(
+            {
+                "offerType": "LICENSE",
+                "quantity": int(commitment_request["3YCLicenses"]),
+            },
+        )
+    if commitment_request["3YCConsumables"]:
+        quantities.append(
+            {
+                "offerType": "CONSUMABLES",
+                "quantity": int(commitment_request["3YCConsumables"]),
+            },
+        )
+    return {
+        "companyProfile": customer["companyProfile"],
+        "benefits": [
+            {
+                "type": "THREE_YEAR_COMMIT",
+                request_type: {
+                    "minimumQuantities": quantities,
+                },
+            },
+        ]
+    }
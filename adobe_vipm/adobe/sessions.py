@@ -0,0 +1,281 @@
+import logging
+import socket
+import threading
+from dataclasses import dataclass, field
+from functools import partial
+from http import HTTPStatus
+from typing import MutableMapping
+from urllib.parse import urlparse
+
+from requests import Session
+from requests.adapters import Retry
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from adobe_vipm.adobe.config import Config
+from adobe_vipm.adobe.dataclasses import Authorization
+from adobe_vipm.adobe.throttling import RateLimiter
+from adobe_vipm.circuit_breaker import CircuitBreakerAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_FORCELIST = [502, 503, 504]
+
+ADOBE_ENDPOINT_FAMILIES = [
+    ("/orders", "adobe_orders"),
+    ("/subscriptions", "adobe_subscriptions"),
+    ("/memberships/", "adobe_transfers"),
+    ("/resellers", "adobe_resellers"),
+    ("/customers", "adobe_customers"),
+]
+
+
+def get_adobe_endpoint_family(url: str) -> str:
+    """
+    Returns the family of the Adobe endpoint a request is sent to, so each
+    family is guarded by its own circuit breaker. Requests outside of the
+    VIP Marketplace API belong to the `adobe_ims` family.
+    """
+    path = urlparse(url).path
+    if not path.startswith("/v3/"):
+        return "adobe_ims"
+    for fragment, family in ADOBE_ENDPOINT_FAMILIES:
+        if fragment in path:
+            return family
+    return "adobe"
+
+
+@dataclass
+class PoolStats:
+    """
+    Counters of the connections handled by a pool.
+
+    `created` counts the new TCP (+TLS) connections that have been opened,
+    `reused` counts the checkouts served by an already open connection and
+    `waited` counts the checkouts that found the pool exhausted, so they had
+    to wait for a connection to be released (blocking pools) or to open an
+    extra connection outside the pool (non blocking pools).
+    """
+
+    created: int = 0
+    checkouts: int = 0
+    waited: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def reused(self) -> int:
+        return max(self.checkouts - self.created, 0)
+
+    def record_created(self) -> None:
+        with self._lock:
+            self.created += 1
+
+    def record_checkout(self, exhausted: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            if exhausted:
+                self.waited += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "waited": self.waited,
+        }
+
+
+class _InstrumentedPoolMixin:
+    def __init__(self, *args, stats: PoolStats, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+
+    def _new_conn(self):
+        self.stats.record_created()
+        return super()._new_conn()
+
+    def _get_conn(self, timeout=None):
+        self.stats.record_checkout(self.pool is not None and self.pool.empty())
+        return super()._get_conn(timeout=timeout)
+
+
+class InstrumentedHTTPConnectionPool(_InstrumentedPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class InstrumentedHTTPSConnectionPool(_InstrumentedPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class PooledHTTPAdapter(CircuitBreakerAdapter):
+    """
+    An `HTTPAdapter` which connection pools keep track of the
+    connections created, reused and waited on.
+    Requests are sent through the circuit breaker of their Adobe endpoint family.
+    """
+
+    def __init__(self, *args, keepalive: bool = True, **kwargs):
+        self.stats = PoolStats()
+        self.keepalive = keepalive
+        super().__init__(*args, family=get_adobe_endpoint_family, **kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self.keepalive:
+            pool_kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": partial(InstrumentedHTTPConnectionPool, stats=self.stats),
+            "https": partial(InstrumentedHTTPSConnectionPool, stats=self.stats),
+        }
+
+
+class AuthorizationSession(Session):
+    """
+    A `requests.Session` that allows at most `max_concurrency` requests
+    to be in flight at the same time, so all the threads of the process
+    sharing an Authorization stay within its concurrency cap.
+    If a `RateLimiter` is given, requests are also paced through it and
+    those rejected by Adobe with 429 are retried up to `throttling_retries`
+    times once the backoff requested by Adobe has elapsed.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        rate_limiter: RateLimiter | None = None,
+        throttling_retries: int = 0,
+    ) -> None:
+        super().__init__()
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+        self.throttling_retries = throttling_retries
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    def request(self, method, url, *args, **kwargs):
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            with self._semaphore:
+                response = super().request(method, url, *args, **kwargs)
+            if (
+                response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+                or not self.rate_limiter
+                or attempt >= self.throttling_retries
+            ):
+                return response
+            delay = self.rate_limiter.backoff(response.headers.get("Retry-After"), attempt)
+            logger.warning(
+                f"Request {method} {url} has been throttled, retry in {delay:.2f} seconds",
+            )
+            response.close()
+            attempt += 1
+
+
+class SessionManager:
+    """
+    Holds one keep-alive `requests.Session` per Authorization so
+    concurrent callers share the same connection pools instead of
+    opening a new connection for each Adobe API call.
+    The number of requests in flight for each Authorization is capped
+    to the `ADOBE_MAX_CONCURRENT_REQUESTS` extension setting and their
+    rate is limited to `ADOBE_RATE_LIMIT` requests per second.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self._config = config
+        self._sessions: MutableMapping[Authorization, Session] = {}
+        self._lock = threading.Lock()
+
+    def get_session(self, authorization: Authorization) -> Session:
+        """
+        Returns the session bound to the given Authorization, creating it
+        the first time it is requested.
+
+        Args:
+            authorization (Authorization): The Authorization the session belongs to.
+
+        Returns:
+            Session: The session to use to perform HTTP calls.
+        """
+        session = self._sessions.get(authorization)
+        if session:
+            return session
+        with self._lock:
+            if authorization not in self._sessions:
+                self._sessions[authorization] = self._create_session()
+            return self._sessions[authorization]
+
+    def get_rate_limiter(self, authorization: Authorization) -> RateLimiter:
+        """
+        Returns the rate limiter of the session bound to the given Authorization,
+        so other clients of the same Authorization are paced together with it.
+
+        Args:
+            authorization (Authorization): The Authorization the rate limiter belongs to.
+
+        Returns:
+            RateLimiter: The rate limiter of the Authorization.
+        """
+        return self.get_session(authorization).rate_limiter
+
+    def get_stats(self) -> MutableMapping[str, dict]:
+        """
+        Returns the connection pools counters grouped by authorization.
+
+        Returns:
+            dict: A dictionary keyed by authorization_uk with the counters
+            of connections created, reused and waited on.
+        """
+        return {
+            authorization.authorization_uk: session.get_adapter("https://").stats.to_dict()
+            for authorization, session in self._sessions.items()
+        }
+
+    def get_throttling_stats(self) -> MutableMapping[str, dict]:
+        """
+        Returns the rate limiters counters grouped by authorization.
+
+        Returns:
+            dict: A dictionary keyed by authorization_uk with the counters
+            of requests queued, time spent waiting and throttled responses.
+        """
+        return {
+            authorization.authorization_uk: session.rate_limiter.stats.to_dict()
+            for authorization, session in self._sessions.items()
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def _create_session(self) -> Session:
+        session = AuthorizationSession(
+            self._config.max_concurrent_requests,
+            rate_limiter=RateLimiter(
+                self._config.rate_limit,
+                self._config.rate_limit_burst,
+                backoff_secs=self._config.throttling_backoff_secs,
+                max_backoff_secs=self._config.throttling_max_backoff_secs,
+            ),
+            throttling_retries=self._config.throttling_max_retries,
+        )
+        retries = Retry(
+            total=self._config.http_max_retries,
+            backoff_factor=0.1,
+            status_forcelist=RETRY_STATUS_FORCELIST,
+            raise_on_status=False,
+        )
+        adapter = PooledHTTPAdapter(
+            max_retries=retries,
+            pool_maxsize=self._config.http_pool_size,
+            pool_block=self._config.http_pool_block,
+            keepalive=self._config.http_keepalive,
+            timeout=self._config.http_timeout,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
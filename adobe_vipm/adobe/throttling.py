@@ -0,0 +1,161 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+JITTER_RATIO = 0.2
+
+
+@dataclass
+class RateLimiterStats:
+    """
+    Counters of the requests that went through a rate limiter.
+
+    `waited` counts the requests that had to wait in the queue to get a slot,
+    `wait_secs` and `max_wait_secs` are the total and the longest time spent
+    waiting while `throttled` counts the 429 responses received from Adobe.
+    """
+
+    requests: int = 0
+    waited: int = 0
+    wait_secs: float = 0.0
+    max_wait_secs: float = 0.0
+    throttled: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_wait(self, wait_secs: float) -> None:
+        with self._lock:
+            self.requests += 1
+            if wait_secs > 0:
+                self.waited += 1
+                self.wait_secs += wait_secs
+                self.max_wait_secs = max(self.max_wait_secs, wait_secs)
+
+    def record_throttled(self) -> None:
+        with self._lock:
+            self.throttled += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "waited": self.waited,
+            "wait_secs": round(self.wait_secs, 3),
+            "max_wait_secs": round(self.max_wait_secs, 3),
+            "throttled": self.throttled,
+        }
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parses the value of a `Retry-After` header that can be expressed
+    either as a number of seconds or as an HTTP date.
+
+    Args:
+        value (str): The value of the header.
+
+    Returns:
+        float: The number of seconds to wait or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RateLimiter:
+    """
+    A token bucket that lets requests through at `rate` requests per second
+    with bursts of up to `burst` requests.
+
+    Slots are reserved in arrival order so callers queue fairly. When Adobe
+    responds with 429 the whole bucket is paused for the time requested through
+    the `Retry-After` header (or an exponential backoff if it is missing) plus
+    a random jitter, so all the callers sharing the Authorization back off
+    together instead of hammering the API.
+    A `rate` of zero disables the limiter but keeps the backoff on 429.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        backoff_secs: float = 1.0,
+        max_backoff_secs: float = 60.0,
+    ) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.backoff_secs = backoff_secs
+        self.max_backoff_secs = max_backoff_secs
+        self.stats = RateLimiterStats()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Waits until a request can be sent.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        wait_secs = self.reserve()
+        if wait_secs > 0:
+            time.sleep(wait_secs)
+        return wait_secs
+
+    def reserve(self) -> float:
+        """
+        Reserves a slot for a request without waiting for it, so asyncio
+        callers can wait without blocking the event loop.
+
+        Returns:
+            float: The number of seconds the caller must wait before sending the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait_secs = max(self._paused_until - now, 0.0)
+            if self.rate > 0:
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait_secs = max(wait_secs, -self._tokens / self.rate)
+        self.stats.record_wait(wait_secs)
+        return wait_secs
+
+    def backoff(self, retry_after: str | None, attempt: int) -> float:
+        """
+        Pauses the bucket after a 429 response.
+
+        Args:
+            retry_after (str): The value of the `Retry-After` header of the response.
+            attempt (int): The number of times the request has already been retried.
+
+        Returns:
+            float: The number of seconds the bucket has been paused for.
+        """
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = self.backoff_secs * 2**attempt
+        delay = min(delay, self.max_backoff_secs)
+        delay += random.uniform(0, delay * JITTER_RATIO)
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self.stats.record_throttled()
+        return delay
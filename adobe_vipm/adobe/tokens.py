@@ -0,0 +1,142 @@
+import logging
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Callable, MutableMapping
+
+from adobe_vipm.adobe.dataclasses import APIToken, Authorization
+from adobe_vipm.token_store import TokenStore
+
+logger = logging.getLogger(__name__)
+
+
+class TokenManager:
+    """
+    Thread-safe cache of the IMS tokens of each Authorization.
+
+    Only one refresh per Authorization can be in flight: concurrent callers
+    that need the same token wait for the outcome of the running refresh
+    instead of issuing their own request to IMS.
+    A background thread renews the tokens that are about to expire so
+    the request path does not block on IMS.
+    If a `TokenStore` is provided, tokens are shared with the other
+    processes of the node through it.
+    """
+
+    def __init__(
+        self,
+        fetch_token: Callable[[Authorization], APIToken],
+        renew_ahead_secs: int = 120,
+        renew_interval_secs: int = 30,
+        store: TokenStore | None = None,
+    ) -> None:
+        self.tokens: MutableMapping[Authorization, APIToken] = {}
+        self._fetch_token = fetch_token
+        self._store = store
+        self._renew_ahead = timedelta(seconds=renew_ahead_secs)
+        self._renew_interval_secs = renew_interval_secs
+        self._inflight: MutableMapping[Authorization, Future] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._renewer: threading.Thread | None = None
+
+    def get_token(self, authorization: Authorization) -> APIToken:
+        """
+        Returns a valid token for the given Authorization, refreshing it
+        if it is missing or expired.
+
+        Args:
+            authorization (Authorization): The Authorization to get the token for.
+
+        Returns:
+            APIToken: A valid token.
+        """
+        token = self.tokens.get(authorization)
+        if token and not token.is_expired():
+            return token
+        return self.refresh(authorization)
+
+    def refresh(
+        self,
+        authorization: Authorization,
+        min_validity: timedelta = timedelta(0),
+    ) -> APIToken:
+        """
+        Requests a new token for the given Authorization. If a refresh
+        for such Authorization is already running, waits for its outcome.
+
+        Args:
+            authorization (Authorization): The Authorization to refresh the token for.
+            min_validity (timedelta): Time a token obtained from the shared store
+                must be still valid for to be used instead of requesting a new one.
+
+        Returns:
+            APIToken: The new token.
+        """
+        with self._lock:
+            future = self._inflight.get(authorization)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[authorization] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            token = self._get_new_token(authorization, min_validity)
+            self.tokens[authorization] = token
+            future.set_result(token)
+            self._start_renewer()
+            return token
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[authorization]
+
+    def renew_expiring(self) -> None:
+        """
+        Refreshes the tokens that will expire within the renewal window.
+        """
+        threshold = datetime.now() + self._renew_ahead
+        for authorization, token in list(self.tokens.items()):
+            if token.expires > threshold:
+                continue
+            try:
+                self.refresh(authorization, min_validity=self._renew_ahead)
+            except Exception:
+                logger.exception(
+                    f"Cannot renew the token for authorization {authorization.authorization_uk}",
+                )
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._renewer:
+            self._renewer.join()
+            self._renewer = None
+
+    def _get_new_token(self, authorization: Authorization, min_validity: timedelta) -> APIToken:
+        if not self._store:
+            return self._fetch_token(authorization)
+        return self._store.get_or_refresh(
+            f"adobe:{authorization.authorization_uk}:{authorization.client_id}",
+            lambda: self._fetch_token(authorization),
+            min_validity=min_validity,
+        )
+
+    def _start_renewer(self) -> None:
+        with self._lock:
+            if self._renewer or self._stop_event.is_set():
+                return
+            self._renewer = threading.Thread(
+                target=self._renew_tokens,
+                name="adobe-token-renewer",
+                daemon=True,
+            )
+            self._renewer.start()
+
+    def _renew_tokens(self) -> None:
+        while not self._stop_event.wait(self._renew_interval_secs):
+            self.renew_expiring()
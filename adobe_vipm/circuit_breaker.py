@@ -0,0 +1,341 @@
+"""
+This module contains the circuit breakers that protect the calls to the
+services the extension depends on (Adobe, MPT, Airtable and NAV).
+
+Each family of endpoints of a service has its own circuit breaker, so a
+degraded API does not tie up the worker threads: once a family keeps failing
+its circuit opens and calls to it fail fast with `CircuitOpenError` until
+the recovery time elapses and a probe call succeeds.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, MutableMapping, Tuple
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float) -> None:
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(
+            f"Circuit {self.name} is open, retry in {self.retry_after:.0f} seconds",
+        )
+
+
+@dataclass
+class CircuitBreakerStats:
+    calls: int = 0
+    failures: int = 0
+    rejected: int = 0
+    opened: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_call(self, failed: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            if failed:
+                self.failures += 1
+
+    def record_rejected(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def record_opened(self) -> None:
+        with self._lock:
+            self.opened += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "opened": self.opened,
+        }
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker with closed, open and half-open states.
+
+    The circuit opens after `failure_threshold` consecutive failures. While
+    open, calls are rejected with `CircuitOpenError`. Once `recovery_secs`
+    have elapsed the circuit becomes half-open and lets through up to
+    `half_open_max_calls` probe calls: the circuit closes if a probe succeeds
+    and opens again if it fails. A probe abandoned without an outcome (e.g.
+    cancelled) must give its slot back through `release_probe`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_secs: float,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.recovery_secs = recovery_secs
+        self.half_open_max_calls = max(half_open_max_calls, 1)
+        self.stats = CircuitBreakerStats()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == STATE_OPEN and self._get_retry_after() <= 0:
+                return STATE_HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """
+        Checks whether a call can be performed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or the half-open
+            circuit is already probing the service.
+        """
+        with self._lock:
+            if self._state == STATE_OPEN:
+                retry_after = self._get_retry_after()
+                if retry_after > 0:
+                    self.stats.record_rejected()
+                    raise CircuitOpenError(self.name, retry_after)
+                self._state = STATE_HALF_OPEN
+                self._probes = 0
+            if self._state == STATE_HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    self.stats.record_rejected()
+                    raise CircuitOpenError(self.name, self.recovery_secs)
+                self._probes += 1
+
+    def release_probe(self) -> None:
+        """
+        Gives back the probe slot taken by `before_call` for a call that
+        ended without telling whether the service is up (e.g. it has been
+        cancelled), so the half-open circuit can probe the service again.
+        """
+        with self._lock:
+            if self._state == STATE_HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self) -> None:
+        self.stats.record_call(failed=False)
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                logger.info(f"Circuit {self.name} closed")
+            self._state = STATE_CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        self.stats.record_call(failed=True)
+        with self._lock:
+            self._failures += 1
+            if self._state == STATE_HALF_OPEN or (
+                self._state == STATE_CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = STATE_OPEN
+                self._opened_at = time.monotonic()
+                self.stats.record_opened()
+                logger.warning(
+                    f"Circuit {self.name} opened after {self._failures} failures, "
+                    f"retry in {self.recovery_secs} seconds",
+                )
+
+    def record_status(self, status_code: int) -> None:
+        """
+        Records the outcome of a call given the HTTP status of its response:
+        server errors are failures while any other status means that the
+        service is up.
+        """
+        if status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def _get_retry_after(self) -> float:
+        return self._opened_at + self.recovery_secs - time.monotonic()
+
+
+class CircuitBreakerMixin:
+    """
+    Sends the requests of an `HTTPAdapter` through the circuit breaker
+    of their endpoint family. It is meant to be mixed in before the
+    adapter class, which stays in charge of everything else (e.g. timeouts).
+
+    `family` is either the name of the family of all the requests sent
+    through the adapter or a callable that returns it given the request URL.
+    """
+
+    def __init__(self, *args, family: str | Callable[[str], str], **kwargs) -> None:
+        self.family = family
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        family = self.family(request.url) if callable(self.family) else self.family
+        circuit_breaker = get_circuit_breaker(family)
+        circuit_breaker.before_call()
+        try:
+            response = super().send(request, **kwargs)
+        except requests.RequestException:
+            circuit_breaker.record_failure()
+            raise
+        except BaseException:
+            circuit_breaker.release_probe()
+            raise
+        circuit_breaker.record_status(response.status_code)
+        return response
+
+
+class CircuitBreakerAdapter(CircuitBreakerMixin, HTTPAdapter):
+    """
+    An `HTTPAdapter` that sends the requests through the circuit breaker
+    of their endpoint family (see `CircuitBreakerMixin`) and applies a
+    default timeout to the requests sent without one.
+    """
+
+    def __init__(
+        self,
+        *args,
+        family: str | Callable[[str], str],
+        timeout: Tuple[float, float] | None = None,
+        **kwargs,
+    ) -> None:
+        self.timeout = timeout
+        super().__init__(*args, family=family, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(
+            request,
+            timeout=timeout if timeout is not None else self.timeout,
+            **kwargs,
+        )
+
+
+class AsyncCircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """
+    An `httpx` transport that sends the requests through the circuit breaker
+    of their endpoint family before handing them to the wrapped transport.
+
+    `family` is either the name of the family of all the requests sent
+    through the transport or a callable that returns it given the request URL.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        family: str | Callable[[str], str],
+    ) -> None:
+        self.transport = transport
+        self.family = family
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        family = self.family(url) if callable(self.family) else self.family
+        circuit_breaker = get_circuit_breaker(family)
+        circuit_breaker.before_call()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except httpx.TransportError:
+            circuit_breaker.record_failure()
+            raise
+        except BaseException:
+            circuit_breaker.release_probe()
+            raise
+        circuit_breaker.record_status(response.status_code)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def get_timeout(service: str) -> Tuple[float, float]:
+    """
+    Returns the connect and read timeouts of the requests to a service,
+    configured through the `<SERVICE>_HTTP_CONNECT_TIMEOUT_SECS` and
+    `<SERVICE>_HTTP_READ_TIMEOUT_SECS` extension variables.
+
+    Args:
+        service (str): The name of the service (i.e. ADOBE, MPT, AIRTABLE or NAV).
+
+    Returns:
+        tuple: The connect and read timeouts in seconds.
+    """
+    return (
+        float(settings.EXTENSION_CONFIG.get(f"{service}_HTTP_CONNECT_TIMEOUT_SECS", "10")),
+        float(settings.EXTENSION_CONFIG.get(f"{service}_HTTP_READ_TIMEOUT_SECS", "60")),
+    )
+
+
+_CIRCUIT_BREAKERS: MutableMapping[str, CircuitBreaker] = {}
+_CIRCUIT_BREAKERS_LOCK = threading.Lock()
+
+
+def get_circuit_breaker(family: str) -> CircuitBreaker:
+    """
+    Returns the circuit breaker of a family of endpoints, creating it the first
+    time it is requested.
+    Its thresholds are taken from the `CIRCUIT_BREAKER_<FAMILY>_FAILURE_THRESHOLD`
+    and `CIRCUIT_BREAKER_<FAMILY>_RECOVERY_SECS` extension variables which
+    default to `CIRCUIT_BREAKER_FAILURE_THRESHOLD` (5) and
+    `CIRCUIT_BREAKER_RECOVERY_SECS` (30).
+
+    Args:
+        family (str): The name of the family of endpoints (i.e. adobe_orders).
+
+    Returns:
+        CircuitBreaker: The circuit breaker of the family.
+    """
+    circuit_breaker = _CIRCUIT_BREAKERS.get(family)
+    if circuit_breaker:
+        return circuit_breaker
+    with _CIRCUIT_BREAKERS_LOCK:
+        if family not in _CIRCUIT_BREAKERS:
+            prefix = f"CIRCUIT_BREAKER_{family.upper()}"
+            config = settings.EXTENSION_CONFIG
+            _CIRCUIT_BREAKERS[family] = CircuitBreaker(
+                family,
+                int(
+                    config.get(
+                        f"{prefix}_FAILURE_THRESHOLD",
+                        config.get("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5"),
+                    ),
+                ),
+                float(
+                    config.get(
+                        f"{prefix}_RECOVERY_SECS",
+                        config.get("CIRCUIT_BREAKER_RECOVERY_SECS", "30"),
+                    ),
+                ),
+            )
+        return _CIRCUIT_BREAKERS[family]
+
+
+def get_circuit_breakers_stats() -> MutableMapping[str, dict]:
+    """
+    Returns the state and the counters of the circuit breakers.
+
+    Returns:
+        dict: A dictionary keyed by family with the state of its circuit and
+        the number of calls, failures, rejected calls and times it opened.
+    """
+    return {
+        family: {"state": circuit_breaker.state, **circuit_breaker.stats.to_dict()}
+        for family, circuit_breaker in _CIRCUIT_BREAKERS.items()
+    }
@@ -1,4 +1,6 @@
 import logging
+import math
+import time
 from pprint import pformat
 from typing import Any, Mapping
 
@@ -8,7 +10,9 @@ from swo.mpt.client import MPTClient
 from swo.mpt.extensions.core import Extension, JWTAuth
 from swo.mpt.extensions.runtime.djapp.conf import get_for_product
 
+from adobe_vipm.circuit_breaker import CircuitOpenError
 from adobe_vipm.flows.fulfillment import fulfill_order
+from adobe_vipm.flows.helpers import prefetch_orders_agreements
 from adobe_vipm.flows.mpt import get_webhook
 from adobe_vipm.flows.validation import validate_order
 from adobe_vipm.models import Error
@@ -25,9 +29,46 @@ def jwt_secret_callback(client: MPTClient, claims: Mapping[str, Any]) -> str:
     return get_for_product(settings, "WEBHOOKS_SECRETS", product_id)
 
 
+@ext.events.enricher("orders")
+def prefetch_orders_info(client, events):
+    try:
+        agreements = prefetch_orders_agreements(
+            client,
+            [event.data for event in events],
+        )
+    except CircuitOpenError as e:
+        # The listener retrieves the agreements of the orders by itself.
+        logger.warning(f"Cannot prefetch the agreements of the orders: {e}")
+        return
+    prefetched_at = time.monotonic()
+    for event in events:
+        agreement = agreements.get(event.data["agreement"]["id"])
+        if agreement:
+            event.context["agreement"] = agreement
+            event.context["prefetched_at"] = prefetched_at
+
+
+def get_prefetched_agreement(event):
+    """
+    Returns the agreement attached to an order event by `prefetch_orders_info`
+    unless it is older than `ORDERS_PREFETCH_MAX_AGE_SECS` seconds (defaults to 60),
+    for instance because the worker has been busy retrieving the agreements of
+    the other orders taken from the queue together with it.
+    """
+    max_age = float(settings.EXTENSION_CONFIG.get("ORDERS_PREFETCH_MAX_AGE_SECS", "60"))
+    prefetched_at = event.context.get("prefetched_at")
+    if prefetched_at is None or time.monotonic() - prefetched_at > max_age:
+        return None
+    return event.context["agreement"]
+
+
 @ext.events.listener("orders")
 def process_order_fulfillment(client, event):
-    fulfill_order(client, event.data)
+    fulfill_order(
+        client,
+        event.data,
+        agreement=get_prefetched_agreement(event),
+    )
 
 
 @ext.api.post(
@@ -35,6 +76,7 @@ def process_order_fulfillment(client, event):
     response={
         200: dict,
         400: Error,
+        503: Error,
     },
     auth=JWTAuth(jwt_secret_callback),
 )
@@ -43,9 +85,26 @@ def process_order_validation(request, order: dict = Body(None)):
         validated_order = validate_order(request.client, order)
         logger.debug(f"Validated order: {pformat(validated_order)}")
         return 200, validated_order
+    except CircuitOpenError:
+        raise
     except Exception as e:
         logger.exception("Unexpected error during validation")
         return 400, Error(
             id="VIPMG001",
             message=f"Unexpected error during validation: {str(e)}.",
         )
+
+
+@ext.api.exception_handler(CircuitOpenError)
+def circuit_open_error_handler(request, exc):
+    logger.warning(f"Cannot serve {request.path}: {exc}")
+    response = ext.api.create_response(
+        request,
+        {
+            "id": "VIPMG002",
+            "message": f"Service temporarily unavailable: {exc}.",
+        },
+        status=503,
+    )
+    response["Retry-After"] = str(math.ceil(exc.retry_after))
+    return response
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from functools import cache
 
 from django.conf import settings
+from pyairtable import retry_strategy
 from pyairtable.formulas import (
     AND,
     EQUAL,
@@ -14,6 +15,12 @@ from pyairtable.orm import Model, fields
 from requests import HTTPError
 from swo.mpt.extensions.runtime.djapp.conf import get_for_product
 
+from adobe_vipm.circuit_breaker import (
+    CircuitBreakerAdapter,
+    CircuitOpenError,
+    get_timeout,
+)
+
 STATUS_INIT = "init"
 STATUS_RUNNING = "running"
 STATUS_RESCHEDULED = "rescheduled"
@@ -34,6 +41,22 @@ class AirTableBaseInfo:
         )
 
 
+def _mount_circuit_breaker(model):
+    """
+    Sends the requests of the given model through the Airtable circuit breaker
+    with the configured timeout, keeping the pyairtable retry strategy.
+    """
+    model.get_api().session.mount(
+        "https://",
+        CircuitBreakerAdapter(
+            family="airtable",
+            timeout=get_timeout("AIRTABLE"),
+            max_retries=retry_strategy(),
+        ),
+    )
+    return model
+
+
 @cache
 def get_transfer_model(base_info):
     class Transfer(Model):
@@ -97,7 +120,7 @@ def get_transfer_model(base_info):
             api_key = base_info.api_key
             base_id = base_info.base_id
 
-    return Transfer
+    return _mount_circuit_breaker(Transfer)
 
 
 @cache
@@ -118,7 +141,7 @@ def get_offer_model(base_info):
             api_key = base_info.api_key
             base_id = base_info.base_id
 
-    return Offer
+    return _mount_circuit_breaker(Offer)
 
 
 def get_offer_ids_by_membership_id(product_id, membership_id):
@@ -178,5 +201,5 @@ def get_transfer_link(transfer):
         view_id = transfer.get_table().schema().view("Transfer View").id
         record_id = transfer.id
         return f"https://airtable.com/{base_id}/{table_id}/{view_id}/{record_id}"
-    except HTTPError:
+    except (HTTPError, CircuitOpenError):
         pass
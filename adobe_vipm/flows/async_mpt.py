@@ -0,0 +1,157 @@
+"""
+Asyncio twins of the helpers of `adobe_vipm.flows.mpt` built on top of the
+`AsyncMPTClient`, so batch jobs can keep many MPT requests in flight from
+a single event loop. RQL queries are shared with the synchronous helpers.
+"""
+
+from django.conf import settings
+from swo.mpt.client.async_client import get_async_transport
+from swo.mpt.client.pagination import apaginate
+from swo.mpt.extensions.core.utils import setup_async_client
+
+from adobe_vipm.circuit_breaker import AsyncCircuitBreakerTransport
+from adobe_vipm.flows.errors import wrap_async_http_error
+from adobe_vipm.flows.mpt import (
+    ALL_AGREEMENTS_QUERY,
+    get_3yc_commitment_request_status_query,
+    get_3yc_recommitment_query,
+    get_3yc_resubmit_query,
+    get_mpt_endpoint_family,
+    get_next_sync_query,
+    get_page_size,
+    get_pagination_workers,
+)
+
+
+def setup_async_mpt_client(transport=None):
+    """
+    Creates an `AsyncMPTClient` which requests go through the circuit breakers
+    of the MPT endpoint families, like the ones of the synchronous client.
+    The caller owns the client and must close it.
+
+    Args:
+        transport (httpx.AsyncBaseTransport): The transport to send the requests
+            through, defaults to a pooled `httpx.AsyncHTTPTransport`.
+
+    Returns:
+        AsyncMPTClient: The client to consume the MPT platform API.
+    """
+    return setup_async_client(
+        transport=AsyncCircuitBreakerTransport(
+            transport
+            or get_async_transport(settings.MPT_API_POOL_MAXSIZE, settings.MPT_API_MAX_RETRIES),
+            family=get_mpt_endpoint_family,
+        ),
+    )
+
+
+@wrap_async_http_error
+async def iter_objects(mpt_client, url):
+    """
+    Lazily iterates over all the objects returned by a list endpoint of the MPT API.
+    Once the first page tells the total number of objects, the following pages
+    are fetched concurrently and returned in order.
+
+    Args:
+        mpt_client (AsyncMPTClient): The client to consume the MPT platform API.
+        url (str): The url of the list endpoint including the RQL query.
+
+    Returns:
+        AsyncIterator: An async iterator over the objects.
+    """
+    async for obj in apaginate(
+        mpt_client,
+        url,
+        limit=get_page_size(),
+        max_workers=get_pagination_workers(),
+    ):
+        yield obj
+
+
+@wrap_async_http_error
+async def get_agreement(mpt_client, agreement_id):
+    response = await mpt_client.get(
+        f"/commerce/agreements/{agreement_id}?select=seller,buyer,listing,product,subscriptions"
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@wrap_async_http_error
+async def get_licensee(mpt_client, licensee_id):
+    response = await mpt_client.get(f"/accounts/licensees/{licensee_id}")
+    response.raise_for_status()
+    return response.json()
+
+
+@wrap_async_http_error
+async def update_order(mpt_client, order_id, **kwargs):
+    response = await mpt_client.put(
+        f"/commerce/orders/{order_id}",
+        json=kwargs,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@wrap_async_http_error
+async def update_agreement(mpt_client, agreement_id, **kwargs):
+    response = await mpt_client.put(
+        f"/commerce/agreements/{agreement_id}",
+        json=kwargs,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@wrap_async_http_error
+async def update_agreement_subscription(mpt_client, subscription_id, **kwargs):
+    response = await mpt_client.put(
+        f"/commerce/subscriptions/{subscription_id}",
+        json=kwargs,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@wrap_async_http_error
+async def get_agreement_subscription(mpt_client, subscription_id):
+    response = await mpt_client.get(
+        f"/commerce/subscriptions/{subscription_id}",
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def iter_agreements_by_query(mpt_client, query):
+    return iter_objects(mpt_client, f"/commerce/agreements?{query}")
+
+
+async def get_agreements_by_query(mpt_client, query):
+    return [agreement async for agreement in iter_agreements_by_query(mpt_client, query)]
+
+
+async def get_agreements_by_next_sync(mpt_client):
+    return await get_agreements_by_query(mpt_client, get_next_sync_query())
+
+
+async def get_agreements_by_3yc_commitment_request_status(mpt_client, is_recommitment=False):
+    return await get_agreements_by_query(
+        mpt_client,
+        get_3yc_commitment_request_status_query(is_recommitment=is_recommitment),
+    )
+
+
+async def get_agreements_for_3yc_resubmit(mpt_client, is_recommitment=False):
+    return await get_agreements_by_query(
+        mpt_client,
+        get_3yc_resubmit_query(is_recommitment=is_recommitment),
+    )
+
+
+async def get_agreements_for_3yc_recommitment(mpt_client):
+    return await get_agreements_by_query(mpt_client, get_3yc_recommitment_query())
+
+
+def get_all_agreements(mpt_client):
+    return iter_agreements_by_query(mpt_client, ALL_AGREEMENTS_QUERY)
@@ -0,0 +1,132 @@
+"""
+This module contains the in-process cache of the MPT catalog, that is the
+product items looked up by SKU and the price list items looked up by product
+item, so that validating and fulfilling orders or synchronizing agreements do
+not query the catalog again for every line.
+"""
+
+from typing import Iterable, List, MutableMapping, Tuple
+
+from django.conf import settings
+
+from adobe_vipm.adobe.cache import TTLCache
+
+KIND_PRODUCT_ITEM = "product_item"
+KIND_PRICELIST_ITEM = "pricelist_item"
+
+
+class CatalogCache:
+    """
+    Keeps the product items of each product keyed by SKU and the price list
+    items of each price list keyed by product item id, so every lookup is a
+    dictionary access. Entries expire `ttl` seconds after they have been
+    stored and are then requested again to the MPT API.
+
+    Building the price matrix of a product in a price list (see
+    `adobe_vipm.flows.pricing`) loads all their items at once, so the
+    following lookups never hit the API until they expire.
+    """
+
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        self._cache = TTLCache(ttl, maxsize)
+
+    @property
+    def stats(self):
+        return self._cache.stats
+
+    def get_product_items(
+        self,
+        product_id: str,
+        skus: Iterable[str],
+    ) -> Tuple[List[dict], List[str]]:
+        """
+        Looks up the items of a product by SKU.
+
+        Args:
+            product_id (str): The id of the product.
+            skus (list): The SKUs of the items.
+
+        Returns:
+            tuple: The cached items and the SKUs which are not cached.
+        """
+        return self._lookup(KIND_PRODUCT_ITEM, product_id, skus)
+
+    def set_product_items(self, product_id: str, items: Iterable[dict]) -> None:
+        for item in items:
+            self._cache.set(
+                (KIND_PRODUCT_ITEM, product_id, item["externalIds"]["vendor"]),
+                item,
+            )
+
+    def get_pricelist_items(
+        self,
+        pricelist_id: str,
+        product_item_ids: Iterable[str],
+    ) -> Tuple[List[dict], List[str]]:
+        """
+        Looks up the items of a price list by product item id.
+
+        Args:
+            pricelist_id (str): The id of the price list.
+            product_item_ids (list): The ids of the product items.
+
+        Returns:
+            tuple: The cached price list items and the product item ids
+            which are not cached.
+        """
+        return self._lookup(KIND_PRICELIST_ITEM, pricelist_id, product_item_ids)
+
+    def set_pricelist_items(self, pricelist_id: str, items: Iterable[dict]) -> None:
+        for item in items:
+            self._cache.set((KIND_PRICELIST_ITEM, pricelist_id, item["item"]["id"]), item)
+
+    def invalidate(self, owner_id: str) -> None:
+        """
+        Removes the cached items of a product or a price list.
+
+        Args:
+            owner_id (str): The id of the product or of the price list.
+        """
+        for kind in (KIND_PRODUCT_ITEM, KIND_PRICELIST_ITEM):
+            self._cache.invalidate(kind, owner_id)
+
+    def _lookup(
+        self,
+        kind: str,
+        owner_id: str,
+        keys: Iterable[str],
+    ) -> Tuple[List[dict], List[str]]:
+        items = []
+        missing = []
+        for key in dict.fromkeys(keys):
+            item = self._cache.get((kind, owner_id, key))
+            if item is None:
+                missing.append(key)
+            else:
+                items.append(item)
+        return items, missing
+
+
+_CATALOG_CACHE: CatalogCache | None = None
+
+
+def get_catalog_cache() -> CatalogCache:
+    """
+    Returns the catalog cache of the process. Its entries expire after
+    `MPT_CATALOG_CACHE_TTL_SECS` seconds (defaults to 300, zero disables the cache)
+    and at most `MPT_CATALOG_CACHE_MAX_SIZE` items are kept (defaults to 20000).
+
+    Returns:
+        CatalogCache: The catalog cache.
+    """
+    global _CATALOG_CACHE
+    if not _CATALOG_CACHE:
+        _CATALOG_CACHE = CatalogCache(
+            float(settings.EXTENSION_CONFIG.get("MPT_CATALOG_CACHE_TTL_SECS", "300")),
+            int(settings.EXTENSION_CONFIG.get("MPT_CATALOG_CACHE_MAX_SIZE", "20000")),
+        )
+    return _CATALOG_CACHE
+
+
+def get_catalog_cache_stats() -> MutableMapping[str, int]:
+    return get_catalog_cache().stats.to_dict()
@@ -1,7 +1,10 @@
+import inspect
 import json
 from functools import wraps
+from json import JSONDecodeError
 
-from requests import HTTPError, JSONDecodeError
+import httpx
+from requests import HTTPError
 
 
 class MPTError(Exception):
@@ -36,16 +39,54 @@ class MPTAPIError(MPTHttpError):
         return str(self.payload)
 
 
+def _get_mpt_error(response):
+    try:
+        return MPTAPIError(response.status_code, response.json())
+    except JSONDecodeError:
+        return MPTHttpError(response.status_code, response.content.decode())
+
+
 def wrap_http_error(func):
+    if inspect.isgeneratorfunction(func):
+
+        @wraps(func)
+        def _generator_wrapper(*args, **kwargs):
+            try:
+                yield from func(*args, **kwargs)
+            except HTTPError as e:
+                raise _get_mpt_error(e.response)
+
+        return _generator_wrapper
+
     @wraps(func)
     def _wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
         except HTTPError as e:
+            raise _get_mpt_error(e.response)
+
+    return _wrapper
+
+
+def wrap_async_http_error(func):
+    if inspect.isasyncgenfunction(func):
+
+        @wraps(func)
+        async def _async_generator_wrapper(*args, **kwargs):
             try:
-                raise MPTAPIError(e.response.status_code, e.response.json())
-            except JSONDecodeError:
-                raise MPTHttpError(e.response.status_code, e.response.content.decode())
+                async for obj in func(*args, **kwargs):
+                    yield obj
+            except httpx.HTTPStatusError as e:
+                raise _get_mpt_error(e.response)
+
+        return _async_generator_wrapper
+
+    @wraps(func)
+    async def _wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except httpx.HTTPStatusError as e:
+            raise _get_mpt_error(e.response)
 
     return _wrapper
 
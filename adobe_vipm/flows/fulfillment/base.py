@@ -1,12 +1,14 @@
 import logging
 import traceback
 
+from adobe_vipm.circuit_breaker import CircuitOpenError
 from adobe_vipm.flows.fulfillment.change import fulfill_change_order
 from adobe_vipm.flows.fulfillment.purchase import fulfill_purchase_order
 from adobe_vipm.flows.fulfillment.shared import send_processing_notification
 from adobe_vipm.flows.fulfillment.termination import fulfill_termination_order
 from adobe_vipm.flows.fulfillment.transfer import fulfill_transfer_order
 from adobe_vipm.flows.helpers import populate_order_info
+from adobe_vipm.flows.mpt import order_updates
 from adobe_vipm.flows.utils import (
     is_change_order,
     is_purchase_order,
@@ -19,32 +21,43 @@ from adobe_vipm.flows.utils import (
 logger = logging.getLogger(__name__)
 
 
-def fulfill_order(client, order):
+def fulfill_order(client, order, agreement=None):
     """
     Fulfills an order of any type by processing the necessary actions
     based on the provided parameters.
+    The updates of the order are merged and sent at the checkpoints of
+    the flow (before calling Adobe and before any status transition)
+    instead of one by one.
+    If a service the order depends on is unavailable (its circuit is open)
+    the order is left as is, so it will be processed again at the next
+    polling cycle.
 
     Args:
         client (MPTClient): An instance of the client for consuming the MPT platform API.
         order (dict): The order that needs to be processed.
+        agreement (dict): The full representation of the agreement of the order
+            if it has been prefetched.
 
     Returns:
         None
     """
     logger.info(f'Start processing {order["type"]} order {order["id"]}')
     try:
-        order = populate_order_info(client, order)
-
-        send_processing_notification(client, order)
-
-        if is_purchase_order(order):
-            fulfill_purchase_order(client, order)
-        elif is_transfer_order(order):
-            fulfill_transfer_order(client, order)
-        elif is_change_order(order):
-            fulfill_change_order(client, order)
-        elif is_termination_order(order):  # pragma: no branch
-            fulfill_termination_order(client, order)
+        with order_updates(client, order["id"]):
+            order = populate_order_info(client, order, agreement)
+
+            send_processing_notification(client, order)
+
+            if is_purchase_order(order):
+                fulfill_purchase_order(client, order)
+            elif is_transfer_order(order):
+                fulfill_transfer_order(client, order)
+            elif is_change_order(order):
+                fulfill_change_order(client, order)
+            elif is_termination_order(order):  # pragma: no branch
+                fulfill_termination_order(client, order)
+    except CircuitOpenError as e:
+        logger.warning(f"Order {order['id']} has been rescheduled: {e}")
     except Exception:
         notify_unhandled_exception_in_teams(
             "fulfillment",
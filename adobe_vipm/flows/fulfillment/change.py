@@ -23,6 +23,7 @@ from adobe_vipm.flows.fulfillment.shared import (
     switch_order_to_failed,
     update_order_actual_price,
 )
+from adobe_vipm.flows.mpt import flush_order_updates
 from adobe_vipm.flows.utils import (
     get_adobe_customer_id,
     get_adobe_line_item_by_subscription_id,
@@ -172,6 +173,7 @@ def _submit_change_order(mpt_client, customer_id, order):
         f"upout={grouped_items.upsizing_out_win_or_migrated}, ",
         f"downout={grouped_items.downsizing_out_win_or_migrated}",
     )
+    flush_order_updates(order["id"])
     try:
         to_add_to_preview = []
         if grouped_items.upsizing_out_win_or_migrated:
@@ -215,6 +217,7 @@ def _submit_change_order(mpt_client, customer_id, order):
                 if not completed_return_orders:
                     return None
 
+            flush_order_updates(order["id"])
             adobe_order = adobe_client.create_new_order(
                 authorization_id,
                 customer_id,
@@ -43,6 +43,7 @@ from adobe_vipm.flows.fulfillment.shared import (
     update_order_actual_price,
 )
 from adobe_vipm.flows.helpers import prepare_customer_data
+from adobe_vipm.flows.mpt import flush_order_updates
 from adobe_vipm.flows.utils import (
     get_adobe_customer_id,
     get_adobe_order_id,
@@ -166,6 +167,7 @@ def create_customer_account(client, order):
         external_id = order["agreement"]["id"]
         seller_id = order["agreement"]["seller"]["id"]
         authorization_id = order["authorization"]["id"]
+        flush_order_updates(order["id"])
         customer = adobe_client.create_customer_account(
             authorization_id, seller_id, external_id, customer_data
         )
@@ -185,6 +187,7 @@ def create_customer_account(client, order):
 def _submit_new_order(mpt_client, customer_id, order):
     adobe_client = get_adobe_client()
     adobe_order = None
+    flush_order_updates(order["id"])
     try:
         authorization_id = order["authorization"]["id"]
         preview_order = adobe_client.create_preview_order(
@@ -3,7 +3,9 @@ This module contains shared functions used by the different fulfillment flows.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
 from operator import itemgetter
 
 from django.conf import settings
@@ -31,6 +33,7 @@ from adobe_vipm.flows.mpt import (
     complete_order,
     create_subscription,
     fail_order,
+    flush_order_updates,
     get_pricelist_items_by_product_items,
     get_product_items_by_skus,
     get_product_onetime_items_by_ids,
@@ -83,6 +86,9 @@ def save_adobe_customer_data(client, order, customer_id, request_3yc_status=None
     if request_3yc_status:
         order = set_adobe_3yc_commitment_request_status(order, request_3yc_status)
     update_order(client, order["id"], parameters=order["parameters"])
+    # the customer must not be created again if the process dies before the
+    # end of the fulfillment pass
+    flush_order_updates(order["id"])
     update_agreement(
         client, order["agreement"]["id"], externalIds={"vendor": customer_id}
     )
@@ -134,6 +140,9 @@ def save_adobe_order_id_and_customer_data(client, order, order_id, customer):
         parameters=order["parameters"],
         externalIds=order["externalIds"],
     )
+    # the transfer must not be submitted again if the process dies before
+    # the end of the fulfillment pass
+    flush_order_updates(order["id"])
     update_agreement(
         client, order["agreement"]["id"], externalIds={"vendor": customer["customerId"]}
     )
@@ -154,6 +163,9 @@ def save_adobe_order_id(client, order, order_id):
     """
     order = set_adobe_order_id(order, order_id)
     update_order(client, order["id"], externalIds=order["externalIds"])
+    # the Adobe order must not be placed again if the process dies before
+    # the end of the fulfillment pass
+    flush_order_updates(order["id"])
     return order
 
 
@@ -306,10 +318,42 @@ def check_adobe_order_fulfilled(
     return adobe_order
 
 
+def _handle_line_return_orders(
+    adobe_client, authorization_id, customer_id, orders_index, line
+):
+    completed_order_ids = []
+    pending_order_ids = []
+    orders_4_item = orders_index.search_new_and_returned_orders_by_sku_line_number(
+        line["item"]["externalIds"]["vendor"],
+        line["id"],
+    )
+    for order_to_return, item_to_return, return_order in orders_4_item:
+        if not return_order:
+            logger.debug(f"Return order not found for {line['item']['id']}")
+            return_order = adobe_client.create_return_order(
+                authorization_id,
+                customer_id,
+                order_to_return,
+                item_to_return,
+            )
+            orders_index.add_return_order(return_order)
+            logger.debug(
+                f"Return order created for a return order for item: {line}"
+            )
+        if return_order["status"] == STATUS_PENDING:
+            pending_order_ids.append(return_order["orderId"])
+            break
+        else:
+            completed_order_ids.append(return_order["orderId"])
+    return completed_order_ids, pending_order_ids
+
+
 def handle_return_orders(mpt_client, adobe_client, customer_id, order, lines):
     """
     Handles return orders for a given MPT order by processing the necessary
     actions based on the provided parameters.
+    The lines are processed concurrently by up to `RETURN_ORDERS_MAX_WORKERS`
+    threads while the orders to return for each line are handled sequentially.
 
     Args:
         mpt_client (MPTClient): An instance of the Marketplace platform client.
@@ -326,31 +370,32 @@ def handle_return_orders(mpt_client, adobe_client, customer_id, order, lines):
     completed_order_ids = []
     pending_order_ids = []
     authorization_id = order["authorization"]["id"]
-    for line in lines:
-        orders_4_item = adobe_client.search_new_and_returned_orders_by_sku_line_number(
-            authorization_id,
-            customer_id,
-            line["item"]["externalIds"]["vendor"],
-            line["id"],
-        )
-        for order_to_return, item_to_return, return_order in orders_4_item:
-            if not return_order:
-                logger.debug(f"Return order not found for {line['item']['id']}")
-                return_order = adobe_client.create_return_order(
-                    authorization_id,
-                    customer_id,
-                    order_to_return,
-                    item_to_return,
-                )
-                logger.debug(
-                    f"Return order created for a return order for item: {line}"
-                )
-            if return_order["status"] == STATUS_PENDING:
-                pending_order_ids.append(return_order["orderId"])
-                break
-            else:
-                completed_order_ids.append(return_order["orderId"])
-                order = reset_retries(mpt_client, order)
+    orders_index = adobe_client.get_customer_orders_index(authorization_id, customer_id)
+    max_workers = int(settings.EXTENSION_CONFIG.get("RETURN_ORDERS_MAX_WORKERS", "4"))
+    handle_line = partial(
+        _handle_line_return_orders,
+        adobe_client,
+        authorization_id,
+        customer_id,
+        orders_index,
+    )
+
+    flush_order_updates(order["id"])
+    if max_workers > 1 and len(lines) > 1:
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(lines)),
+            thread_name_prefix="return-orders",
+        ) as executor:
+            results = list(executor.map(handle_line, lines))
+    else:
+        results = [handle_line(line) for line in lines]
+
+    for line_completed_order_ids, line_pending_order_ids in results:
+        completed_order_ids.extend(line_completed_order_ids)
+        pending_order_ids.extend(line_pending_order_ids)
+
+    if completed_order_ids:
+        order = reset_retries(mpt_client, order)
 
     if pending_order_ids:
         handle_retries(
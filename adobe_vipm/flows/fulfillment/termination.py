@@ -11,6 +11,7 @@ from adobe_vipm.flows.fulfillment.shared import (
     handle_return_orders,
     switch_order_to_completed,
 )
+from adobe_vipm.flows.mpt import flush_order_updates
 from adobe_vipm.flows.utils import (
     get_adobe_customer_id,
     get_adobe_subscription_id,
@@ -71,6 +72,7 @@ def fulfill_termination_order(mpt_client, order):
 
     grouped_items = group_items_by_type(order)
     if grouped_items.downsizing_out_win_or_migrated:
+        flush_order_updates(order["id"])
         _terminate_out_of_win_or_migrated_subscriptions(
             customer_id, order, grouped_items.downsizing_out_win_or_migrated
         )
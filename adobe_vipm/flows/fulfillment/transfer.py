@@ -44,6 +44,7 @@ from adobe_vipm.flows.fulfillment.shared import (
     switch_order_to_failed,
     switch_order_to_query,
 )
+from adobe_vipm.flows.mpt import flush_order_updates
 from adobe_vipm.flows.utils import (
     get_adobe_membership_id,
     get_adobe_order_id,
@@ -151,6 +152,7 @@ def _submit_transfer_order(mpt_client, order, membership_id):
     authorization_id = order["authorization"]["id"]
     seller_id = order["agreement"]["seller"]["id"]
     adobe_transfer_order = None
+    flush_order_updates(order["id"])
     try:
         adobe_transfer_order = adobe_client.create_transfer(
             authorization_id, seller_id, order["id"], membership_id
@@ -233,6 +235,7 @@ def _fulfill_transfer_migrated(mpt_client, order, transfer):
 
     one_time_skus = get_one_time_skus(mpt_client, order)
 
+    flush_order_updates(order["id"])
     commitment_date = None
     for line in adobe_transfer["lineItems"]:
         if get_partial_sku(line["offerId"]) in one_time_skus:
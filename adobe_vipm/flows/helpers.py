@@ -2,6 +2,7 @@
 This module contains orders helper functions.
 """
 
+import copy
 import logging
 
 from adobe_vipm.flows.constants import (
@@ -12,7 +13,9 @@ from adobe_vipm.flows.constants import (
 )
 from adobe_vipm.flows.mpt import (
     get_agreement,
+    get_agreements_with_details_by_ids,
     get_licensee,
+    get_licensees_by_ids,
     get_pricelist_items_by_product_items,
     get_product_items_by_skus,
     update_order,
@@ -28,7 +31,41 @@ from adobe_vipm.flows.utils import (
 logger = logging.getLogger(__name__)
 
 
-def populate_order_info(client, order):
+def prefetch_orders_agreements(client, orders):
+    """
+    Retrieves the full representation of the agreements of many orders,
+    including their licensee, with a few bulk requests.
+    Agreements returned without their licensee are left out, so the
+    orders fall back to retrieve them one by one.
+
+    Args:
+        client (MPTClient): an instance of the Marketplace platform client.
+        orders (list): the orders that are going to be processed.
+
+    Returns:
+        dict: The agreements indexed by id.
+    """
+    agreements = {
+        agreement_id: agreement
+        for agreement_id, agreement in get_agreements_with_details_by_ids(
+            client,
+            [order["agreement"]["id"] for order in orders],
+        ).items()
+        if agreement.get("licensee")
+    }
+    licensees = get_licensees_by_ids(
+        client,
+        [agreement["licensee"]["id"] for agreement in agreements.values()],
+    )
+    prefetched = {}
+    for agreement_id, agreement in agreements.items():
+        licensee = licensees.get(agreement["licensee"]["id"])
+        if licensee:
+            prefetched[agreement_id] = {**agreement, "licensee": licensee}
+    return prefetched
+
+
+def populate_order_info(client, order, agreement=None):
     """
     Enrich the order with the full representation of the
     agreement object.
@@ -36,10 +73,16 @@ def populate_order_info(client, order):
     Args:
         client (MPTClient): an instance of the Marketplace platform client.
         order (dict): the order that is being processed.
+        agreement (dict): the full representation of the agreement including
+            its licensee if it has already been retrieved.
 
     Returns:
         dict: The enriched order.
     """
+    if agreement:
+        order["agreement"] = copy.deepcopy(agreement)
+        return order
+
     order["agreement"] = get_agreement(client, order["agreement"]["id"])
     order["agreement"]["licensee"] = get_licensee(client, order["agreement"]["licensee"]["id"])
 
@@ -1,7 +1,14 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import date, timedelta
 from functools import cache
 
+from django.conf import settings
+from swo.mpt.client.base import MPTHTTPAdapter
+from swo.mpt.client.pagination import DEFAULT_PAGE_SIZE, paginate
+
 from adobe_vipm.adobe.constants import (
     STATUS_3YC_ACCEPTED,
     STATUS_3YC_COMMITTED,
@@ -10,6 +17,10 @@ from adobe_vipm.adobe.constants import (
     STATUS_3YC_NONCOMPLIANT,
     STATUS_3YC_REQUESTED,
 )
+from adobe_vipm.circuit_breaker import CircuitBreakerMixin
+from adobe_vipm.flows.catalog import (
+    get_catalog_cache,
+)
 from adobe_vipm.flows.constants import (
     ERR_VIPM_UNHANDLED_EXCEPTION,
     PARAM_3YC,
@@ -26,12 +37,153 @@ from adobe_vipm.flows.errors import wrap_http_error
 
 logger = logging.getLogger(__name__)
 
+ALL_AGREEMENTS_QUERY = (
+    "eq(status,Active))&select=lines,parameters,subscriptions,product,listing"
+)
+
+MPT_ENDPOINT_FAMILIES = [
+    ("/commerce/orders", "mpt_orders"),
+    ("/commerce/agreements", "mpt_agreements"),
+    ("/commerce/subscriptions", "mpt_subscriptions"),
+    ("/catalog/", "mpt_catalog"),
+]
+
+
+def get_mpt_endpoint_family(url):
+    for fragment, family in MPT_ENDPOINT_FAMILIES:
+        if fragment in url:
+            return family
+    return "mpt"
+
+
+class MPTCircuitBreakerAdapter(CircuitBreakerMixin, MPTHTTPAdapter):
+    """
+    An `MPTHTTPAdapter`, which owns the timeout and the connection pool
+    metrics, that sends the requests through the circuit breaker of their
+    MPT endpoint family.
+    It is mounted by the MPT clients of the extension once for all, when
+    they are built (see the `MPT_API_ADAPTER` setting).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, family=get_mpt_endpoint_family, **kwargs)
+
 
-def _has_more_pages(page):
-    if not page:
-        return True
-    pagination = page["$meta"]["pagination"]
-    return pagination["total"] > pagination["limit"] + pagination["offset"]
+def get_page_size():
+    """
+    Returns the number of objects requested per page to the MPT list endpoints,
+    configured through the `MPT_API_PAGE_SIZE` extension variable.
+    """
+    return int(settings.EXTENSION_CONFIG.get("MPT_API_PAGE_SIZE", DEFAULT_PAGE_SIZE))
+
+
+def get_pagination_workers():
+    """
+    Returns the number of pages of an MPT list endpoint requested concurrently,
+    configured through the `MPT_API_PAGINATION_WORKERS` extension variable.
+    """
+    return int(settings.EXTENSION_CONFIG.get("MPT_API_PAGINATION_WORKERS", "4"))
+
+
+@wrap_http_error
+def iter_objects(mpt_client, url):
+    """
+    Lazily iterates over all the objects returned by a list endpoint of the MPT API.
+    Once the first page tells the total number of objects, the following pages
+    are fetched concurrently in background and returned in order.
+
+    Args:
+        mpt_client (MPTClient): The client to consume the MPT platform API.
+        url (str): The url of the list endpoint including the RQL query.
+
+    Returns:
+        Iterator: An iterator over the objects.
+    """
+    yield from paginate(
+        mpt_client,
+        url,
+        limit=get_page_size(),
+        max_workers=get_pagination_workers(),
+    )
+
+
+def get_max_url_length():
+    """
+    Returns the maximum length of the urls sent to the MPT API,
+    configured through the `MPT_API_MAX_URL_LENGTH` extension variable.
+    """
+    return int(settings.EXTENSION_CONFIG.get("MPT_API_MAX_URL_LENGTH", "2000"))
+
+
+def split_rql_values(values, max_length):
+    """
+    Splits a list of values into chunks which comma separated
+    representation is at most `max_length` characters long.
+    A value longer than `max_length` makes up a chunk by itself.
+
+    Args:
+        values (list): The values to split.
+        max_length (int): The maximum length of a chunk.
+
+    Returns:
+        list: The chunks of values.
+    """
+    chunks = []
+    chunk = []
+    length = -1
+    for value in values:
+        if chunk and length + len(value) + 1 > max_length:
+            chunks.append(chunk)
+            chunk = []
+            length = -1
+        chunk.append(value)
+        length += len(value) + 1
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def get_objects_by_keys(mpt_client, get_url, keys, key=lambda obj: obj["id"]):
+    """
+    Retrieves the objects matching a list of keys through an RQL `in()` query.
+    The keys are de-duplicated and split into chunks so that no url, including
+    the base url of the client, exceeds `MPT_API_MAX_URL_LENGTH` characters, and
+    the chunks are requested concurrently.
+
+    Args:
+        mpt_client (MPTClient): The client to consume the MPT platform API.
+        get_url (callable): A callable that returns the url of the list endpoint
+            including the RQL query given the comma separated keys of a chunk.
+        keys (list): The keys of the objects.
+        key (callable): A callable that returns the key of an object.
+
+    Returns:
+        dict: The objects indexed by key, in the order they have been returned.
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+    # leave room for the base url and the pagination parameters
+    max_length = get_max_url_length() - len(mpt_client.join_url(get_url(""))) - 32
+    chunks = split_rql_values(keys, max_length)
+
+    def get_objects(chunk):
+        return list(iter_objects(mpt_client, get_url(",".join(chunk))))
+
+    if len(chunks) == 1:
+        results = [get_objects(chunks[0])]
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(len(chunks), get_pagination_workers()),
+            thread_name_prefix="mpt-query",
+        ) as executor:
+            results = list(executor.map(get_objects, chunks))
+
+    objects = {}
+    for chunk_objects in results:
+        for obj in chunk_objects:
+            objects.setdefault(key(obj), obj)
+    return objects
 
 
 @wrap_http_error
@@ -50,18 +202,130 @@ def get_licensee(mpt_client, licensee_id):
     return response.json()
 
 
+def get_agreements_with_details_by_ids(mpt_client, ids):
+    """
+    Retrieves many agreements with the same details returned by `get_agreement`.
+
+    Returns:
+        dict: The agreements indexed by id.
+    """
+    return get_objects_by_keys(
+        mpt_client,
+        lambda chunk: (
+            f"/commerce/agreements?in(id,({chunk}))"
+            "&select=seller,buyer,listing,product,subscriptions,licensee"
+        ),
+        ids,
+    )
+
+
+def get_licensees_by_ids(mpt_client, ids):
+    """
+    Retrieves many licensees at once.
+
+    Returns:
+        dict: The licensees indexed by id.
+    """
+    return get_objects_by_keys(
+        mpt_client,
+        lambda chunk: f"/accounts/licensees?in(id,({chunk}))",
+        ids,
+    )
+
+
+class OrderUpdates:
+    """
+    Write-behind buffer of the updates of an MPT order: the fields passed
+    to `update_order` are collected in memory, the last value of each field
+    wins, and sent with a single `PUT` when the buffer is flushed.
+    """
+
+    def __init__(self, mpt_client, order_id):
+        self.mpt_client = mpt_client
+        self.order_id = order_id
+        self.pending = {}
+        self.updates = 0
+        self.flushes = 0
+
+    def add(self, **kwargs):
+        self.pending.update(kwargs)
+        self.updates += 1
+
+    def flush(self):
+        if not self.pending:
+            return None
+        payload, self.pending = self.pending, {}
+        self.flushes += 1
+        return _put_order(self.mpt_client, self.order_id, payload)
+
+
+_ORDER_UPDATES: ContextVar[OrderUpdates | None] = ContextVar("order_updates", default=None)
+
+
+@contextmanager
+def order_updates(mpt_client, order_id):
+    """
+    Opens a unit of work for an MPT order: within it the calls to `update_order`
+    for the order are merged and deferred until a checkpoint, that is an
+    explicit `flush_order_updates`, a status transition of the order
+    (query, fail or complete) or the end of the unit of work.
+    The ids of the objects created on Adobe side must be flushed as soon as
+    they are known, since they are lost if the process dies before the next
+    checkpoint and the objects would be created again by the next pass.
+
+    Args:
+        mpt_client (MPTClient): The client to consume the MPT platform API.
+        order_id (str): The id of the order.
+
+    Returns:
+        OrderUpdates: The buffer of the updates of the order.
+    """
+    updates = OrderUpdates(mpt_client, order_id)
+    token = _ORDER_UPDATES.set(updates)
+    try:
+        yield updates
+    except BaseException:
+        _ORDER_UPDATES.reset(token)
+        try:
+            updates.flush()
+        except Exception:
+            logger.exception(f"Cannot save the pending updates of the order {order_id}")
+        raise
+    _ORDER_UPDATES.reset(token)
+    updates.flush()
+
+
+def flush_order_updates(order_id):
+    """
+    Sends the pending updates of an order if a unit of work is open for it.
+    It must be called before any side effect the order state depends on.
+    """
+    updates = _ORDER_UPDATES.get()
+    if updates is not None and updates.order_id == order_id:
+        updates.flush()
+
+
 @wrap_http_error
-def update_order(mpt_client, order_id, **kwargs):
+def _put_order(mpt_client, order_id, payload):
     response = mpt_client.put(
         f"/commerce/orders/{order_id}",
-        json=kwargs,
+        json=payload,
     )
     response.raise_for_status()
     return response.json()
 
 
+def update_order(mpt_client, order_id, **kwargs):
+    updates = _ORDER_UPDATES.get()
+    if updates is not None and updates.order_id == order_id:
+        updates.add(**kwargs)
+        return None
+    return _put_order(mpt_client, order_id, kwargs)
+
+
 @wrap_http_error
 def query_order(mpt_client, order_id, **kwargs):
+    flush_order_updates(order_id)
     response = mpt_client.post(
         f"/commerce/orders/{order_id}/query",
         json=kwargs,
@@ -72,6 +336,7 @@ def query_order(mpt_client, order_id, **kwargs):
 
 @wrap_http_error
 def fail_order(mpt_client, order_id, reason):
+    flush_order_updates(order_id)
     response = mpt_client.post(
         f"/commerce/orders/{order_id}/fail",
         json={"statusNotes": ERR_VIPM_UNHANDLED_EXCEPTION.to_dict(error=reason)},
@@ -82,6 +347,7 @@ def fail_order(mpt_client, order_id, reason):
 
 @wrap_http_error
 def complete_order(mpt_client, order_id, template):
+    flush_order_updates(order_id)
     response = mpt_client.post(
         f"/commerce/orders/{order_id}/complete",
         json={"template": template},
@@ -90,14 +356,8 @@ def complete_order(mpt_client, order_id, template):
     return response.json()
 
 
-@wrap_http_error
 def set_processing_template(mpt_client, order_id, template):
-    response = mpt_client.put(
-        f"/commerce/orders/{order_id}",
-        json={"template": template},
-    )
-    response.raise_for_status()
-    return response.json()
+    return update_order(mpt_client, order_id, template=template)
 
 
 @wrap_http_error
@@ -131,42 +391,43 @@ def get_subscription_by_external_id(mpt_client, order_id, subscription_external_
         return subscriptions["data"][0]
 
 
-@wrap_http_error
-def get_product_items_by_skus(mpt_client, product_id, skus):
-    items = []
-    rql_query = (
-        f"and(eq(product.id,{product_id}),in(externalIds.vendor,({','.join(skus)})))"
-    )
-    url = f"/items?{rql_query}"
-    page = None
-    limit = 10
-    offset = 0
-    while _has_more_pages(page):
-        response = mpt_client.get(f"{url}&limit={limit}&offset={offset}")
-        response.raise_for_status()
-        page = response.json()
-        items.extend(page["data"])
-        offset += limit
+def _sort_by_keys(items, keys, key):
+    """
+    Returns the items in the order of the given keys, the cached ones
+    and the retrieved ones alike.
+    """
+    items_by_key = {key(item): item for item in items}
+    return [items_by_key[k] for k in dict.fromkeys(keys) if k in items_by_key]
 
-    return items
+
+def get_product_items_by_skus(mpt_client, product_id, skus):
+    catalog = get_catalog_cache()
+    items, missing_skus = catalog.get_product_items(product_id, skus)
+    if missing_skus:
+        product_items = get_objects_by_keys(
+            mpt_client,
+            lambda skus: f"/items?and(eq(product.id,{product_id}),in(externalIds.vendor,({skus})))",
+            missing_skus,
+            key=lambda item: item["externalIds"]["vendor"],
+        ).values()
+        catalog.set_product_items(product_id, product_items)
+        items.extend(product_items)
+    return _sort_by_keys(items, skus, lambda item: item["externalIds"]["vendor"])
 
 
-@wrap_http_error
 def get_pricelist_items_by_product_items(mpt_client, pricelist_id, product_item_ids):
-    items = []
-    rql_query = f"in(item.id,({",".join(product_item_ids)}))"
-    url = f"/price-lists/{pricelist_id}/items?{rql_query}"
-    page = None
-    limit = 10
-    offset = 0
-    while _has_more_pages(page):
-        response = mpt_client.get(f"{url}&limit={limit}&offset={offset}")
-        response.raise_for_status()
-        page = response.json()
-        items.extend(page["data"])
-        offset += limit
-
-    return items
+    catalog = get_catalog_cache()
+    items, missing_item_ids = catalog.get_pricelist_items(pricelist_id, product_item_ids)
+    if missing_item_ids:
+        pricelist_items = get_objects_by_keys(
+            mpt_client,
+            lambda item_ids: f"/price-lists/{pricelist_id}/items?in(item.id,({item_ids}))",
+            missing_item_ids,
+            key=lambda item: item["item"]["id"],
+        ).values()
+        catalog.set_pricelist_items(pricelist_id, pricelist_items)
+        items.extend(pricelist_items)
+    return _sort_by_keys(items, product_item_ids, lambda item: item["item"]["id"])
 
 
 @cache
@@ -201,24 +462,15 @@ def update_agreement(mpt_client, agreement_id, **kwargs):
     return response.json()
 
 
-@wrap_http_error
-def get_agreements_by_query(mpt_client, query):
-    agreements = []
-    url = f"/commerce/agreements?{query}"
-    page = None
-    limit = 10
-    offset = 0
-    while _has_more_pages(page):
-        response = mpt_client.get(f"{url}&limit={limit}&offset={offset}")
-        response.raise_for_status()
-        page = response.json()
-        agreements.extend(page["data"])
-        offset += limit
+def iter_agreements_by_query(mpt_client, query):
+    return iter_objects(mpt_client, f"/commerce/agreements?{query}")
 
-    return agreements
 
+def get_agreements_by_query(mpt_client, query):
+    return list(iter_agreements_by_query(mpt_client, query))
 
-def get_agreements_by_next_sync(mpt_client):
+
+def get_next_sync_query():
     today = date.today().isoformat()
     param_condition = (
         f"any(parameters.fulfillment,and(eq(externalId,{PARAM_NEXT_SYNC_DATE})"
@@ -226,11 +478,14 @@ def get_agreements_by_next_sync(mpt_client):
     )
     status_condition = "eq(status,Active)"
 
-    rql_query = (
+    return (
         f"and({status_condition},{param_condition})"
         "&select=lines,parameters,subscriptions,product,listing"
     )
-    return get_agreements_by_query(mpt_client, rql_query)
+
+
+def get_agreements_by_next_sync(mpt_client):
+    return get_agreements_by_query(mpt_client, get_next_sync_query())
 
 
 @wrap_http_error
@@ -252,7 +507,7 @@ def get_agreement_subscription(mpt_client, subscription_id):
     return response.json()
 
 
-def get_agreements_by_3yc_commitment_request_status(mpt_client, is_recommitment=False):
+def get_3yc_commitment_request_status_query(is_recommitment=False):
     param_external_id = (
         PARAM_3YC_COMMITMENT_REQUEST_STATUS
         if not is_recommitment
@@ -281,15 +536,20 @@ def get_agreements_by_3yc_commitment_request_status(mpt_client, is_recommitment=
     )
     status_condition = "eq(status,Active)"
 
-    rql_query = (
+    return (
         f"and({status_condition},{enroll_status_condition},"
         f"{request_3yc_condition})&select=parameters"
     )
-    return get_agreements_by_query(mpt_client, rql_query)
 
 
-@wrap_http_error
-def get_agreements_for_3yc_resubmit(mpt_client, is_recommitment=False):
+def get_agreements_by_3yc_commitment_request_status(mpt_client, is_recommitment=False):
+    return get_agreements_by_query(
+        mpt_client,
+        get_3yc_commitment_request_status_query(is_recommitment=is_recommitment),
+    )
+
+
+def get_3yc_resubmit_query(is_recommitment=False):
     param_external_id = (
         PARAM_3YC_COMMITMENT_REQUEST_STATUS
         if not is_recommitment
@@ -321,14 +581,20 @@ def get_agreements_for_3yc_resubmit(mpt_client, is_recommitment=False):
     )
     status_condition = "eq(status,Active)"
 
-    rql_query = (
+    return (
         f"and({status_condition},{enroll_status_condition},"
         f"{request_3yc_condition})&select=parameters"
     )
-    return get_agreements_by_query(mpt_client, rql_query)
 
 
-def get_agreements_for_3yc_recommitment(mpt_client):
+def get_agreements_for_3yc_resubmit(mpt_client, is_recommitment=False):
+    return get_agreements_by_query(
+        mpt_client,
+        get_3yc_resubmit_query(is_recommitment=is_recommitment),
+    )
+
+
+def get_3yc_recommitment_query():
     today = date.today()
     limit_date = today + timedelta(days=30)
     enroll_status_condition = (
@@ -369,8 +635,11 @@ def get_agreements_for_3yc_recommitment(mpt_client):
         status_condition,
     )
 
-    rql_query = f"and({','.join(all_conditions)})&select=parameters"
-    return get_agreements_by_query(mpt_client, rql_query)
+    return f"and({','.join(all_conditions)})&select=parameters"
+
+
+def get_agreements_for_3yc_recommitment(mpt_client):
+    return get_agreements_by_query(mpt_client, get_3yc_recommitment_query())
 
 
 @wrap_http_error
@@ -382,38 +651,33 @@ def get_rendered_template(mpt_client, order_id):
     return response.json()
 
 
-@wrap_http_error
 def get_product_onetime_items_by_ids(mpt_client, product_id, item_ids):
-    items = []
-    rql_query = (
-        f"and(eq(product.id,{product_id}),in(id,({','.join(item_ids)})),eq(terms.period,one-time))"
+    return list(
+        get_objects_by_keys(
+            mpt_client,
+            lambda chunk: (
+                f"/items?and(eq(product.id,{product_id}),in(id,({chunk})),"
+                "eq(terms.period,one-time))"
+            ),
+            item_ids,
+        ).values(),
     )
-    url = f"/items?{rql_query}"
-    page = None
-    limit = 10
-    offset = 0
-    while _has_more_pages(page):
-        response = mpt_client.get(f"{url}&limit={limit}&offset={offset}")
-        response.raise_for_status()
-        page = response.json()
-        items.extend(page["data"])
-        offset += limit
-
-    return items
 
 
 def get_agreements_by_ids(mpt_client, ids):
-    rql_query = (
-        f"and(in(id,({','.join(ids)})),eq(status,Active))"
-        "&select=lines,parameters,subscriptions,product,listing"
+    return list(
+        get_objects_by_keys(
+            mpt_client,
+            lambda chunk: (
+                f"/commerce/agreements?and(in(id,({chunk})),eq(status,Active))"
+                "&select=lines,parameters,subscriptions,product,listing"
+            ),
+            ids,
+        ).values(),
     )
-    return get_agreements_by_query(mpt_client, rql_query)
 
 
 def get_all_agreements(
     mpt_client,
 ):
-    return get_agreements_by_query(
-        mpt_client,
-        "eq(status,Active))&select=lines,parameters,subscriptions,product,listing",
-    )
+    return iter_agreements_by_query(mpt_client, ALL_AGREEMENTS_QUERY)
@@ -1,47 +1,32 @@
-import copy
-import json
 import logging
-import os
-from datetime import UTC, datetime, timedelta
+from datetime import datetime, timedelta
+from functools import cache
 from urllib.parse import urljoin
 
 import requests
 from django.conf import settings
 
-logger = logging.getLogger(__name__)
-
-TOKEN_CACHE_FILE = os.path.join(
-    os.path.expanduser("~"),
-    ".nav-token-cache.json",
-)
-
-
-def get_token_from_disk():
-    if not os.path.exists(TOKEN_CACHE_FILE):
-        return
+from adobe_vipm.adobe.dataclasses import APIToken
+from adobe_vipm.circuit_breaker import CircuitBreakerAdapter, get_timeout
+from adobe_vipm.token_store import get_token_store
 
-    token_data = json.load(open(TOKEN_CACHE_FILE))
-    expires_at = datetime.fromisoformat(token_data["expires_at"])
-    if expires_at < datetime.now(UTC):
-        return
+logger = logging.getLogger(__name__)
 
-    return token_data["access_token"]
 
+class NAVAuthError(Exception):
+    pass
 
-def save_token_to_disk(token_data):
-    new_token_data = copy.copy(token_data)
-    new_token_data["expires_at"] = (
-        datetime.now(UTC) + timedelta(seconds=token_data["expires_in"] - 300)
-    ).isoformat()
-    with open(TOKEN_CACHE_FILE, "w") as f:
-        f.write(json.dumps(new_token_data))
 
+@cache
+def _get_session(family):
+    session = requests.Session()
+    adapter = CircuitBreakerAdapter(family=family, timeout=get_timeout("NAV"))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
-def get_token():
-    cached_token = get_token_from_disk()
-    if cached_token:
-        return True, cached_token
 
+def _request_token():
     payload = {
         "client_id": settings.EXTENSION_CONFIG["NAV_AUTH_CLIENT_ID"],
         "client_secret": settings.EXTENSION_CONFIG["NAV_AUTH_CLIENT_SECRET"],
@@ -49,16 +34,30 @@ def get_token():
         "grant_type": "client_credentials",
     }
 
-    resp = requests.post(
+    resp = _get_session("nav_auth").post(
         settings.EXTENSION_CONFIG["NAV_AUTH_ENDPOINT_URL"],
         data=payload,
     )
-    if resp.status_code == 200:
-        token_data = resp.json()
-        save_token_to_disk(token_data)
-        return True, token_data["access_token"]
+    if resp.status_code != 200:
+        raise NAVAuthError(f"{resp.status_code} - {resp.content.decode()}")
 
-    return False, f"{resp.status_code} - {resp.content.decode()}"
+    token_data = resp.json()
+    return APIToken(
+        token=token_data["access_token"],
+        expires=datetime.now() + timedelta(seconds=token_data["expires_in"] - 300),
+    )
+
+
+def get_token():
+    try:
+        token = get_token_store().get_or_refresh(
+            f"nav:{settings.EXTENSION_CONFIG['NAV_AUTH_CLIENT_ID']}",
+            _request_token,
+        )
+    except NAVAuthError as e:
+        return False, str(e)
+
+    return True, token.token
 
 
 def terminate_contract(cco):
@@ -68,7 +67,7 @@ def terminate_contract(cco):
 
     base_url = settings.EXTENSION_CONFIG["NAV_API_BASE_URL"]
 
-    resp = requests.post(
+    resp = _get_session("nav_contracts").post(
         urljoin(base_url, f"/v1.0/contracts/terminateNow/{cco}"),
         headers={
             "Authorization": f"Bearer {response}",
@@ -0,0 +1,239 @@
+"""
+This module contains the price matrix of a product in a price list, that is
+the unit purchase price of every item of the product for every discount level,
+so repricing the lines of agreements is resolved locally once the matrix has
+been built instead of querying the catalog for every line.
+"""
+
+import math
+import threading
+import time
+from array import array
+from typing import Iterable, List, MutableMapping, Sequence, Tuple
+
+from django.conf import settings
+
+from adobe_vipm.flows.catalog import get_catalog_cache
+from adobe_vipm.flows.mpt import (
+    get_pricelist_items_by_product_items,
+    get_product_items_by_skus,
+    iter_objects,
+)
+
+
+def get_sku_with_discount_level(sku: str, discount_level: str) -> str:
+    """
+    Returns the SKU of an item for the given discount level.
+    """
+    return f"{sku[0:10]}{discount_level}{sku[12:]}"
+
+
+def split_sku(sku: str) -> Tuple[str, str]:
+    """
+    Splits an SKU into its base SKU (the SKU without the discount level)
+    and its discount level.
+    """
+    return f"{sku[0:10]}{sku[12:]}", sku[10:12]
+
+
+class PriceMatrix:
+    """
+    The unit purchase prices of the items of a product in a price list stored
+    in a flat array with a row for every base SKU and a column for every
+    discount level. Prices of missing items are NaN.
+    """
+
+    def __init__(self, product_items: Iterable[dict], pricelist_items: Iterable[dict]) -> None:
+        skus = {item["id"]: item["externalIds"]["vendor"] for item in product_items}
+        entries = []
+        for price_item in pricelist_items:
+            sku = skus.get(price_item["item"]["id"])
+            if sku is None or price_item.get("unitPP") is None:
+                continue
+            entries.append((*split_sku(sku), price_item))
+
+        self._rows = {
+            base_sku: row for row, base_sku in enumerate(dict.fromkeys(e[0] for e in entries))
+        }
+        self._columns = {
+            level: column for column, level in enumerate(sorted({e[1] for e in entries}))
+        }
+        size = len(self._rows) * len(self._columns)
+        self._prices = array("d", [math.nan]) * size
+        self._item_ids: List[Tuple[str, str] | None] = [None] * size
+        for base_sku, discount_level, price_item in entries:
+            index = self._rows[base_sku] * len(self._columns) + self._columns[discount_level]
+            self._prices[index] = float(price_item["unitPP"])
+            self._item_ids[index] = (price_item["item"]["id"], price_item["id"])
+
+    @property
+    def discount_levels(self) -> List[str]:
+        return list(self._columns)
+
+    def __len__(self) -> int:
+        return sum(not math.isnan(price) for price in self._prices)
+
+    def get_price(self, sku: str, discount_level: str | None = None) -> float | None:
+        """
+        Returns the unit purchase price of an item.
+
+        Args:
+            sku (str): The SKU of the item.
+            discount_level (str): The discount level to price the item with
+                instead of the one of the SKU.
+
+        Returns:
+            float: The unit purchase price or None if the price list does not
+            price the item.
+        """
+        index = self._get_index(sku, discount_level)
+        return None if index is None else self._prices[index]
+
+    def get_item_ids(
+        self,
+        sku: str,
+        discount_level: str | None = None,
+    ) -> Tuple[str, str] | None:
+        """
+        Returns the ids of the product item and of the price list item of an item.
+        """
+        index = self._get_index(sku, discount_level)
+        return None if index is None else self._item_ids[index]
+
+    def reprice(
+        self,
+        skus: Sequence[str],
+        discount_levels: Sequence[str | None],
+    ) -> List[float | None]:
+        """
+        Returns the unit purchase prices of many items at once.
+
+        Args:
+            skus (list): The SKUs of the items.
+            discount_levels (list): The discount level to price each item with.
+
+        Returns:
+            list: The unit purchase prices in the same order of the SKUs.
+        """
+        return [
+            self.get_price(sku, discount_level)
+            for sku, discount_level in zip(skus, discount_levels, strict=True)
+        ]
+
+    def _get_index(self, sku: str, discount_level: str | None) -> int | None:
+        base_sku, sku_discount_level = split_sku(sku)
+        row = self._rows.get(base_sku)
+        column = self._columns.get(discount_level or sku_discount_level)
+        if row is None or column is None:
+            return None
+        index = row * len(self._columns) + column
+        return None if math.isnan(self._prices[index]) else index
+
+
+class CatalogPrices:
+    """
+    Prices the items of a product in a price list through targeted lookups
+    of their SKUs in the catalog, with the same interface of the `PriceMatrix`.
+    Lookups are remembered for the lifetime of the instance.
+    """
+
+    def __init__(self, mpt_client, product_id: str, pricelist_id: str) -> None:
+        self.mpt_client = mpt_client
+        self.product_id = product_id
+        self.pricelist_id = pricelist_id
+        self._entries: MutableMapping[str, Tuple[float, Tuple[str, str]] | None] = {}
+
+    def get_price(self, sku: str, discount_level: str | None = None) -> float | None:
+        entry = self._get_entry(sku, discount_level)
+        return None if entry is None else entry[0]
+
+    def get_item_ids(
+        self,
+        sku: str,
+        discount_level: str | None = None,
+    ) -> Tuple[str, str] | None:
+        entry = self._get_entry(sku, discount_level)
+        return None if entry is None else entry[1]
+
+    def reprice(
+        self,
+        skus: Sequence[str],
+        discount_levels: Sequence[str | None],
+    ) -> List[float | None]:
+        return [
+            self.get_price(sku, discount_level)
+            for sku, discount_level in zip(skus, discount_levels, strict=True)
+        ]
+
+    def _get_entry(
+        self,
+        sku: str,
+        discount_level: str | None,
+    ) -> Tuple[float, Tuple[str, str]] | None:
+        if discount_level:
+            sku = get_sku_with_discount_level(sku, discount_level)
+        if sku not in self._entries:
+            self._entries[sku] = self._lookup(sku)
+        return self._entries[sku]
+
+    def _lookup(self, sku: str) -> Tuple[float, Tuple[str, str]] | None:
+        product_items = get_product_items_by_skus(self.mpt_client, self.product_id, [sku])
+        if not product_items:
+            return None
+        price_items = get_pricelist_items_by_product_items(
+            self.mpt_client,
+            self.pricelist_id,
+            [product_items[0]["id"]],
+        )
+        if not price_items or price_items[0].get("unitPP") is None:
+            return None
+        return (
+            float(price_items[0]["unitPP"]),
+            (product_items[0]["id"], price_items[0]["id"]),
+        )
+
+
+_PRICE_MATRICES: MutableMapping[Tuple[str, str], Tuple[float, PriceMatrix]] = {}
+_PRICE_MATRICES_LOCK = threading.Lock()
+
+
+def get_price_matrix(
+    mpt_client,
+    product_id: str,
+    pricelist_id: str,
+) -> PriceMatrix | CatalogPrices:
+    """
+    Returns the price matrix of a product in a price list, loading all
+    their items the first time it is requested. The matrix is rebuilt once
+    older than `MPT_CATALOG_CACHE_TTL_SECS` seconds (defaults to 300).
+    If such setting is zero (the catalog cache is disabled) a matrix would be
+    thrown away after pricing a single agreement, so the prices are looked up
+    item by item instead.
+
+    Args:
+        mpt_client (MPTClient): The client to consume the MPT platform API.
+        product_id (str): The id of the product.
+        pricelist_id (str): The id of the price list.
+
+    Returns:
+        PriceMatrix: The price matrix or the `CatalogPrices` if the cache is disabled.
+    """
+    ttl = float(settings.EXTENSION_CONFIG.get("MPT_CATALOG_CACHE_TTL_SECS", "300"))
+    if ttl <= 0:
+        return CatalogPrices(mpt_client, product_id, pricelist_id)
+
+    key = (product_id, pricelist_id)
+    entry = _PRICE_MATRICES.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+
+    product_items = list(iter_objects(mpt_client, f"/items?eq(product.id,{product_id})"))
+    pricelist_items = list(iter_objects(mpt_client, f"/price-lists/{pricelist_id}/items"))
+    catalog = get_catalog_cache()
+    catalog.set_product_items(product_id, product_items)
+    catalog.set_pricelist_items(pricelist_id, pricelist_items)
+
+    matrix = PriceMatrix(product_items, pricelist_items)
+    with _PRICE_MATRICES_LOCK:
+        _PRICE_MATRICES[key] = (time.monotonic() + ttl, matrix)
+    return matrix
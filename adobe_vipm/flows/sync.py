@@ -12,11 +12,10 @@ from adobe_vipm.flows.mpt import (
     get_agreements_by_ids,
     get_agreements_by_next_sync,
     get_all_agreements,
-    get_pricelist_items_by_product_items,
-    get_product_items_by_skus,
     update_agreement,
     update_agreement_subscription,
 )
+from adobe_vipm.flows.pricing import get_price_matrix, get_sku_with_discount_level
 from adobe_vipm.flows.utils import (
     get_adobe_customer_id,
     get_customer_licenses_discount_level,
@@ -58,7 +57,10 @@ def sync_agreement_prices(
 
         discount_level = get_customer_licenses_discount_level(customer)
         coterm_date = customer["cotermDate"]
+        price_matrix = get_price_matrix(mpt_client, product_id, pricelist_id)
 
+        active_subscriptions = []
+        skus = []
         for subscription in subscriptions:
             if subscription["status"] == "Terminated":
                 continue
@@ -71,21 +73,48 @@ def sync_agreement_prices(
                 customer_id,
                 adobe_subscription_id,
             )
+            active_subscriptions.append(subscription)
+            skus.append(adobe_subscription["offerId"])
 
-            actual_sku = adobe_subscription["offerId"]
-            actual_sku = f"{actual_sku[0:10]}{discount_level}{actual_sku[12:]}"
-            prod_item = get_product_items_by_skus(mpt_client, product_id, [actual_sku])[
-                0
-            ]
-            price_item = get_pricelist_items_by_product_items(
-                mpt_client, pricelist_id, [prod_item["id"]]
-            )[0]
+        for line in agreement["lines"]:
+            skus.append(
+                adobe_config.get_adobe_product(line["item"]["externalIds"]["vendor"]).sku,
+            )
+
+        # Price all the SKUs at once so nothing is updated unless every
+        # subscription and line of the agreement can be repriced.
+        discount_levels = [discount_level] * len(skus)
+        prices = price_matrix.reprice(skus, discount_levels)
+        missing_skus = [
+            get_sku_with_discount_level(sku, discount_level)
+            for sku, price in zip(skus, prices)
+            if price is None
+        ]
+        if missing_skus:
+            logger.error(
+                f"Price list {pricelist_id} has no price for "
+                f"{', '.join(missing_skus)}, skip agreement {agreement_id}"
+            )
+            return
+
+        priced_items = [
+            (
+                get_sku_with_discount_level(sku, discount_level),
+                unit_pp,
+                *price_matrix.get_item_ids(sku, discount_level),
+            )
+            for sku, unit_pp in zip(skus, prices)
+        ]
 
+        for subscription, (actual_sku, unit_pp, prod_item_id, price_item_id) in zip(
+            active_subscriptions,
+            priced_items,
+        ):
             line_id = subscription["lines"][0]["id"]
             lines = [
                 {
                     "price": {
-                        "unitPP": price_item["unitPP"],
+                        "unitPP": unit_pp,
                     },
                     "id": line_id,
                 }
@@ -111,43 +140,36 @@ def sync_agreement_prices(
                 )
                 logger.info(
                     f"Subscription: {subscription['id']} ({line_id}): "
-                    f"sku={actual_sku} ({prod_item['id']} - {price_item['id']})"
+                    f"sku={actual_sku} ({prod_item_id} - {price_item_id})"
                 )
             else:
                 current_price = subscription["lines"][0]["price"]["unitPP"]
                 sys.stdout.write(
                     f"Subscription: {subscription['id']} ({line_id}): "
-                    f"sku={actual_sku} ({prod_item['id']}), "
+                    f"sku={actual_sku} ({prod_item_id}), "
                     f"current_price={current_price}, "
-                    f"new_price={price_item['unitPP']} ({price_item['id']})\n"
+                    f"new_price={unit_pp} ({price_item_id})\n"
                 )
 
 
-        for line in agreement["lines"]:
-            actual_sku = adobe_config.get_adobe_product(
-                line["item"]["externalIds"]["vendor"]
-            ).sku
-            actual_sku = f"{actual_sku[0:10]}{discount_level}{actual_sku[12:]}"
-            prod_item = get_product_items_by_skus(mpt_client, product_id, [actual_sku])[
-                0
-            ]
-            price_item = get_pricelist_items_by_product_items(
-                mpt_client, pricelist_id, [prod_item["id"]]
-            )[0]
+        for line, (actual_sku, unit_pp, prod_item_id, price_item_id) in zip(
+            agreement["lines"],
+            priced_items[len(active_subscriptions):],
+        ):
             current_price = line["price"]["unitPP"]
-            line["price"]["unitPP"] = price_item["unitPP"]
+            line["price"]["unitPP"] = unit_pp
 
             if dry_run:
                 sys.stdout.write(
                     f"OneTime item: {line['id']}: "
-                    f"sku={actual_sku} ({prod_item['id']}), "
+                    f"sku={actual_sku} ({prod_item_id}), "
                     f"current_price={current_price}, "
-                    f"new_price={price_item['unitPP']} ({price_item['id']})\n",
+                    f"new_price={unit_pp} ({price_item_id})\n",
                 )
             else:
                 logger.info(
                     f"OneTime item: {line['id']}: "
-                    f"sku={actual_sku} ({prod_item['id']} - {price_item['id']})"
+                    f"sku={actual_sku} ({prod_item_id} - {price_item_id})"
                 )
 
         next_sync = (
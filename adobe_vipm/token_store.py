@@ -0,0 +1,197 @@
+"""
+This module contains a token store shared by all the processes running on
+the same node, so the authentication tokens obtained by one process
+(validation workers, event consumer or management commands) are reused by
+the others instead of requesting a new one.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import Callable
+
+from django.conf import settings
+
+from adobe_vipm.adobe.dataclasses import APIToken
+
+logger = logging.getLogger(__name__)
+
+TOKEN_STORE_FILENAME = ".swo-adobe-vipm-tokens.sqlite3"
+BUSY_TIMEOUT_SECS = 5
+REFRESH_LOCK_TIMEOUT_SECS = 60
+REFRESH_POLL_INTERVAL_SECS = 0.1
+
+
+class TokenStore:
+    """
+    A small SQLite database of tokens keyed by an arbitrary string.
+
+    SQLite locking makes the store safe to be used concurrently by
+    several processes: refreshes of tokens are serialized through an
+    advisory lock row (which expires after `REFRESH_LOCK_TIMEOUT_SECS`)
+    so only one process at a time requests a new token while the others
+    pick it up from the store once saved. No database lock is held while
+    the token is requested. If the store cannot be used, tokens are
+    requested anyway.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def get(self, key: str, min_validity: timedelta = timedelta(0)) -> APIToken | None:
+        """
+        Returns the token stored for the given key if it will be still valid
+        after `min_validity`.
+
+        Args:
+            key (str): The key of the token.
+            min_validity (timedelta): Time the token must be still valid for.
+
+        Returns:
+            APIToken: The stored token or None.
+        """
+        with closing(self._connect()) as conn:
+            return self._select(conn, key, min_validity)
+
+    def set(self, key: str, token: APIToken) -> None:
+        with closing(self._connect()) as conn:
+            self._upsert(conn, key, token)
+
+    def get_or_refresh(
+        self,
+        key: str,
+        refresh: Callable[[], APIToken],
+        min_validity: timedelta = timedelta(0),
+    ) -> APIToken:
+        """
+        Returns the token stored for the given key or, if it is missing or about
+        to expire, obtains a new one invoking `refresh` and stores it.
+        Refreshes are serialized across processes, if the store is not
+        available `refresh` is invoked anyway.
+
+        Args:
+            key (str): The key of the token.
+            refresh (callable): A callable that returns a new token.
+            min_validity (timedelta): Time the token must be still valid for.
+
+        Returns:
+            APIToken: A valid token.
+        """
+        owner = uuid.uuid4().hex
+        try:
+            token = self.get(key, min_validity)
+            if token:
+                return token
+            while not self._acquire(key, owner):
+                time.sleep(REFRESH_POLL_INTERVAL_SECS)
+                token = self.get(key, min_validity)
+                if token:
+                    return token
+            # the token could have been saved right before the lock was taken
+            token = self.get(key, min_validity)
+        except (sqlite3.Error, OSError):
+            logger.exception(f"Token store {self.path} is not available")
+            return refresh()
+
+        try:
+            if not token:
+                token = refresh()
+                self._save(key, token)
+        finally:
+            self._release(key, owner)
+        return token
+
+    def _save(self, key: str, token: APIToken) -> None:
+        try:
+            self.set(key, token)
+        except (sqlite3.Error, OSError):
+            logger.exception(f"Cannot save the token {key} to the token store {self.path}")
+
+    def _acquire(self, key: str, owner: str) -> bool:
+        """
+        Takes the refresh lock of the given key unless another owner
+        holds it and it has not expired yet.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "INSERT INTO locks (key, owner, expires) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, "
+                "expires = excluded.expires WHERE locks.expires <= ?",
+                (key, owner, now + REFRESH_LOCK_TIMEOUT_SECS, now),
+            )
+            return cursor.rowcount == 1
+
+    def _release(self, key: str, owner: str) -> None:
+        try:
+            with closing(self._connect()) as conn:
+                conn.execute("DELETE FROM locks WHERE key = ? AND owner = ?", (key, owner))
+        except (sqlite3.Error, OSError):
+            logger.exception(f"Cannot release the refresh lock of the token {key}")
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    self._initialize()
+        return sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECS, isolation_level=None)
+
+    def _initialize(self) -> None:
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        with closing(
+            sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECS, isolation_level=None),
+        ) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tokens "
+                "(key TEXT PRIMARY KEY, token TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS locks "
+                "(key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+        os.chmod(self.path, 0o600)
+        self._initialized = True
+
+    def _select(
+        self, conn: sqlite3.Connection, key: str, min_validity: timedelta,
+    ) -> APIToken | None:
+        row = conn.execute(
+            "SELECT token, expires FROM tokens WHERE key = ? AND expires > ?",
+            (key, (datetime.now() + min_validity).timestamp()),
+        ).fetchone()
+        if row:
+            return APIToken(token=row[0], expires=datetime.fromtimestamp(row[1]))
+
+    def _upsert(self, conn: sqlite3.Connection, key: str, token: APIToken) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO tokens (key, token, expires) VALUES (?, ?, ?)",
+            (key, token.token, token.expires.timestamp()),
+        )
+
+
+_TOKEN_STORE = None
+
+
+def get_token_store() -> TokenStore:
+    """
+    Returns the token store located in the directory configured through
+    the `TOKEN_CACHE_DIR` extension variable (defaults to the user home).
+
+    Returns:
+        TokenStore: The token store.
+    """
+    global _TOKEN_STORE
+    if not _TOKEN_STORE:
+        directory = settings.EXTENSION_CONFIG.get(
+            "TOKEN_CACHE_DIR",
+            os.path.expanduser("~"),
+        )
+        _TOKEN_STORE = TokenStore(os.path.join(directory, TOKEN_STORE_FILENAME))
+    return _TOKEN_STORE
@@ -6,3 +6,37 @@ def get_attempt_count(event):  # pragma: no cover
     from adobe_vipm.flows.utils import get_retry_count
 
     return get_retry_count(event.data)
+
+
+def get_order_priority(event):
+    """
+    New purchase and transfer orders come first, since they are cheap and
+    the customer is waiting for them, then the other new orders and finally
+    the orders still pending on Adobe side.
+    """
+    from adobe_vipm.flows.utils import get_retry_count
+
+    order = event.data
+    if get_retry_count(order) > 0:
+        return 2
+    return 0 if order.get("type") == "Purchase" else 1
+
+
+def get_order_customer_key(event):
+    from adobe_vipm.flows.utils import get_adobe_customer_id
+
+    order = event.data
+    return get_adobe_customer_id(order) or order.get("agreement", {}).get("id") or order["id"]
+
+
+def get_scheduling_policy():
+    from django.conf import settings
+    from swo.mpt.extensions.runtime.events.policies import FairPriorityPolicy
+
+    return FairPriorityPolicy(
+        priority=get_order_priority,
+        fairness_key=get_order_customer_key,
+        max_in_flight_per_key=int(
+            settings.EXTENSION_CONFIG.get("ORDERS_MAX_IN_FLIGHT_PER_CUSTOMER", "2"),
+        ),
+    )
@@ -1 +1,10 @@
 from swo.mpt.client.base import MPTClient as MPTClient  # noqa: F401
+
+
+def __getattr__(name):
+    # httpx is only imported by the processes that use the async client
+    if name == "AsyncMPTClient":
+        from swo.mpt.client.async_client import AsyncMPTClient
+
+        return AsyncMPTClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,72 @@
+import asyncio
+
+import httpx
+from swo.mpt.client.base import (
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_TIMEOUT,
+)
+
+RETRY_STATUSES = (500, 502, 503, 504)
+# the methods retried by the urllib3 `Retry` of the `MPTClient`
+RETRY_METHODS = frozenset(["DELETE", "GET", "HEAD", "OPTIONS", "PUT", "TRACE"])
+RETRY_BACKOFF_FACTOR = 0.1
+
+
+def get_async_transport(pool_maxsize=DEFAULT_POOL_MAXSIZE, max_retries=DEFAULT_MAX_RETRIES):
+    return httpx.AsyncHTTPTransport(
+        retries=max_retries,
+        limits=httpx.Limits(
+            max_connections=pool_maxsize,
+            max_keepalive_connections=pool_maxsize,
+        ),
+    )
+
+
+class AsyncMPTClient(httpx.AsyncClient):
+    """
+    Asyncio twin of the `MPTClient` built on top of `httpx`: it pools up to
+    `pool_maxsize` connections, retries the idempotent requests up to
+    `max_retries` times on server errors and applies the given (connect, read)
+    timeout.
+
+    Connections are bound to the event loop they are opened from, so an
+    instance must be used from a single loop and closed through `aclose`
+    (or used as an async context manager) before such loop ends.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        api_token,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        timeout=DEFAULT_TIMEOUT,
+        max_retries=DEFAULT_MAX_RETRIES,
+        transport=None,
+    ):
+        super().__init__(
+            base_url=f"{base_url}/" if base_url[-1] != "/" else base_url,
+            headers={
+                "User-Agent": "swo-extensions/1.0",
+                "Authorization": f"Bearer {api_token}",
+            },
+            timeout=httpx.Timeout(timeout[1], connect=timeout[0]),
+            transport=transport or get_async_transport(pool_maxsize, max_retries),
+        )
+        self.api_token = api_token
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+
+    async def send(self, request, **kwargs):
+        attempt = 0
+        while True:
+            response = await super().send(request, **kwargs)
+            if (
+                request.method not in RETRY_METHODS
+                or response.status_code not in RETRY_STATUSES
+                or attempt >= self.max_retries
+            ):
+                return response
+            await response.aclose()
+            await asyncio.sleep(RETRY_BACKOFF_FACTOR * (2**attempt))
+            attempt += 1
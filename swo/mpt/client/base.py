@@ -1,21 +1,117 @@
-from urllib.parse import urljoin
+import threading
+from urllib.parse import urljoin, urlsplit
 
 from requests import Session
 from requests.adapters import HTTPAdapter, Retry
 
+DEFAULT_POOL_MAXSIZE = 36
+DEFAULT_TIMEOUT = (10.0, 60.0)
+DEFAULT_MAX_RETRIES = 5
+
+
+class PoolStats:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.requests = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            self.requests += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+
+    def to_dict(self):
+        return {
+            "maxsize": self.maxsize,
+            "requests": self.requests,
+            "active": self.active,
+            "peak": self.peak,
+            "utilization": self.peak / self.maxsize,
+        }
+
+
+class MPTHTTPAdapter(HTTPAdapter):
+    """
+    An `HTTPAdapter` that applies a default timeout to the requests sent
+    without one and keeps track of how many connections of each pool
+    (one per scheme, host and port) are in use.
+    """
+
+    def __init__(self, *args, timeout=None, pool_maxsize=DEFAULT_POOL_MAXSIZE, **kwargs):
+        self.timeout = timeout
+        self.pools_stats = {}
+        self._pools_stats_lock = threading.Lock()
+        super().__init__(*args, pool_maxsize=pool_maxsize, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        stats = self._get_pool_stats(request.url)
+        stats.acquire()
+        try:
+            return super().send(
+                request,
+                timeout=timeout if timeout is not None else self.timeout,
+                **kwargs,
+            )
+        finally:
+            stats.release()
+
+    def get_pools_stats(self):
+        with self._pools_stats_lock:
+            return {pool: stats.to_dict() for pool, stats in self.pools_stats.items()}
+
+    def _get_pool_stats(self, url):
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        pool = f"{parts.scheme}://{parts.hostname}:{port}"
+        with self._pools_stats_lock:
+            if pool not in self.pools_stats:
+                self.pools_stats[pool] = PoolStats(self._pool_maxsize)
+            return self.pools_stats[pool]
+
 
 class MPTClient(Session):
-    def __init__(self, base_url, api_token):
+    """
+    A `requests.Session` bound to the MPT API.
+
+    The same instance is meant to be shared by many threads: requests to both
+    http and https urls are sent through a single adapter, an instance of
+    `adapter_class` built once with the client, that pools up to
+    `pool_maxsize` connections per host, retries up to `max_retries` times
+    on server errors and applies the given (connect, read) timeout.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        api_token,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        timeout=DEFAULT_TIMEOUT,
+        max_retries=DEFAULT_MAX_RETRIES,
+        adapter_class=MPTHTTPAdapter,
+    ):
         super().__init__()
         retries = Retry(
-            total=5,
+            total=max_retries,
             backoff_factor=0.1,
             status_forcelist=[500, 502, 503, 504],
+            raise_on_status=False,
         )
-        self.mount("http://", HTTPAdapter(
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        adapter = adapter_class(
             max_retries=retries,
-            pool_maxsize=36,
-        ))
+            pool_maxsize=pool_maxsize,
+            timeout=timeout,
+        )
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
         self.headers.update(
             {
                 "User-Agent": "swo-extensions/1.0",
@@ -36,3 +132,14 @@ class MPTClient(Session):
     def join_url(self, url):
         url = url[1:] if url[0] == "/" else url
         return urljoin(self.base_url, url)
+
+    def get_pools_stats(self):
+        """
+        Returns the utilization of the connection pools of the mounted adapters
+        keyed by scheme, host and port.
+        """
+        stats = {}
+        for adapter in {id(adapter): adapter for adapter in self.adapters.values()}.values():
+            if isinstance(adapter, MPTHTTPAdapter):
+                stats.update(adapter.get_pools_stats())
+        return stats
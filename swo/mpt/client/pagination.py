@@ -0,0 +1,106 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, AsyncIterator, Iterator
+
+from swo.mpt.client.base import MPTClient
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def paginate(
+    client: MPTClient,
+    url: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    prefetch: bool = True,
+    max_workers: int = 1,
+) -> Iterator[Any]:
+    """
+    Lazily iterates over the objects returned by a list endpoint of the
+    MPT API, requesting them `limit` objects at a time (up to `MAX_PAGE_SIZE`).
+
+    If `prefetch` is set, the following pages are requested in background
+    while the caller consumes the current one: once the first page tells the
+    total number of objects, up to `max_workers` pages are requested
+    concurrently. Objects are always returned in the order of the pages.
+    Errors are raised as `requests.HTTPError` while iterating.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    separator = "&" if "?" in url else "?"
+
+    def get_page(offset):
+        response = client.get(f"{url}{separator}limit={limit}&offset={offset}")
+        response.raise_for_status()
+        return response.json()
+
+    page = get_page(0)
+    pagination = page["$meta"]["pagination"]
+    # the API could serve less objects per page than requested
+    offsets = iter(range(pagination["limit"], pagination["total"], pagination["limit"]))
+
+    if not prefetch:
+        yield from page["data"]
+        for offset in offsets:
+            yield from get_page(offset)["data"]
+        return
+
+    max_workers = max(max_workers, 1)
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mpt-paginator")
+    try:
+        pending = deque(
+            executor.submit(get_page, offset) for offset in islice(offsets, max_workers)
+        )
+        yield from page["data"]
+        while pending:
+            page = pending.popleft().result()
+            offset = next(offsets, None)
+            if offset is not None:
+                pending.append(executor.submit(get_page, offset))
+            yield from page["data"]
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def apaginate(
+    client,
+    url: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    max_workers: int = 1,
+) -> AsyncIterator[Any]:
+    """
+    Asyncio twin of `paginate` for the `AsyncMPTClient`: once the first page
+    tells the total number of objects, up to `max_workers` of the following
+    pages are requested concurrently while the caller consumes the current one.
+    Objects are always returned in the order of the pages.
+    Errors are raised as `httpx.HTTPStatusError` while iterating.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    separator = "&" if "?" in url else "?"
+
+    async def get_page(offset):
+        response = await client.get(f"{url}{separator}limit={limit}&offset={offset}")
+        response.raise_for_status()
+        return response.json()
+
+    page = await get_page(0)
+    pagination = page["$meta"]["pagination"]
+    offsets = iter(range(pagination["limit"], pagination["total"], pagination["limit"]))
+    pending = deque(
+        asyncio.ensure_future(get_page(offset))
+        for offset in islice(offsets, max(max_workers, 1))
+    )
+    try:
+        for obj in page["data"]:
+            yield obj
+        while pending:
+            page = await pending.popleft()
+            offset = next(offsets, None)
+            if offset is not None:
+                pending.append(asyncio.ensure_future(get_page(offset)))
+            for obj in page["data"]:
+                yield obj
+    finally:
+        for task in pending:
+            task.cancel()
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Literal, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Literal, Mapping, MutableMapping, Sequence
 
 from typing_extensions import Annotated, Doc
 
@@ -11,3 +11,7 @@ class Event:
     id: Annotated[str, Doc("Unique identifier of the event.")]
     type: EventType
     data: Annotated[Mapping | Sequence, Doc("Event data.")]
+    context: Annotated[
+        MutableMapping,
+        Doc("Data attached to the event by the enricher of its type."),
+    ] = field(default_factory=dict)
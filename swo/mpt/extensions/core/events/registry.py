@@ -3,6 +3,7 @@ from typing import Any, Callable, MutableMapping, Sequence
 from .dataclasses import Event, EventType
 
 EventListener = Callable[[Any, Event], None]
+EventsEnricher = Callable[[Any, Sequence[Event]], None]
 
 
 class EventsRegistry:
@@ -10,6 +11,7 @@ class EventsRegistry:
         self,
     ) -> None:
         self.listeners: MutableMapping[str, EventListener] = {}
+        self.enrichers: MutableMapping[str, EventsEnricher] = {}
 
     def listener(
         self,
@@ -39,6 +41,43 @@ class EventsRegistry:
 
         return decorator
 
+    def enricher(
+        self,
+        event_type: EventType,
+        /,
+    ) -> Callable[[EventsEnricher], EventsEnricher]:
+        """
+        Registers a function that receives the events of a type taken
+        together from the queue of the dispatcher right before they are
+        processed, so the data their listener needs can be retrieved in bulk
+        and attached to the `context` of the events.
+
+        ## Example
+
+        ```python
+        from swo.mpt.extensions.core import Extension
+
+        ext = Extension()
+
+
+        @ext.events.enricher("orders")
+        def prefetch_orders_info(client, events):
+            ...
+        ```
+        """
+
+        def decorator(func: EventsEnricher) -> EventsEnricher:
+            self.enrichers[event_type] = func
+            return func
+
+        return decorator
+
+    def get_enricher(
+        self,
+        event_type: EventType,
+    ) -> EventsEnricher | None:
+        return self.enrichers.get(event_type)
+
     def get_listener(
         self,
         event_type: EventType,
@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.utils.module_loading import import_string
 
 from swo.mpt.client import MPTClient
 
@@ -6,4 +7,21 @@ def setup_client():
     return MPTClient(
         f"{settings.MPT_API_BASE_URL}/v1/",
         settings.MPT_API_TOKEN,
+        pool_maxsize=settings.MPT_API_POOL_MAXSIZE,
+        timeout=(settings.MPT_API_CONNECT_TIMEOUT_SECS, settings.MPT_API_READ_TIMEOUT_SECS),
+        max_retries=settings.MPT_API_MAX_RETRIES,
+        adapter_class=import_string(settings.MPT_API_ADAPTER),
+    )
+
+
+def setup_async_client(transport=None):
+    from swo.mpt.client.async_client import AsyncMPTClient
+
+    return AsyncMPTClient(
+        f"{settings.MPT_API_BASE_URL}/v1/",
+        settings.MPT_API_TOKEN,
+        pool_maxsize=settings.MPT_API_POOL_MAXSIZE,
+        timeout=(settings.MPT_API_CONNECT_TIMEOUT_SECS, settings.MPT_API_READ_TIMEOUT_SECS),
+        max_retries=settings.MPT_API_MAX_RETRIES,
+        transport=transport,
     )
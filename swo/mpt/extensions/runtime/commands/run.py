@@ -1,5 +1,5 @@
 import click
-from swo.mpt.extensions.runtime.master import Master
+from swo.mpt.extensions.runtime.master import MAX_EVENT_CONSUMERS, Master
 
 
 @click.command()
@@ -7,7 +7,29 @@ from swo.mpt.extensions.runtime.master import Master
 @click.option("--debug", is_flag=True, default=False)
 @click.option("--reload", is_flag=True, default=False)
 @click.option("--debug-py", default=None)
-def run(color, debug, reload, debug_py):
+@click.option(
+    "--consumers",
+    type=click.IntRange(1, MAX_EVENT_CONSUMERS),
+    default=1,
+    envvar="MPT_EVENT_CONSUMERS",
+    help="Number of event consumer processes, each one owns a shard of the events.",
+)
+@click.option(
+    "--liveness-timeout",
+    type=int,
+    default=600,
+    envvar="MPT_EVENT_CONSUMER_LIVENESS_TIMEOUT_SECS",
+    help="Seconds without progress after which an event consumer process is restarted.",
+)
+@click.option(
+    "--drain-timeout",
+    type=int,
+    default=60,
+    envvar="MPT_EVENT_CONSUMER_DRAIN_TIMEOUT_SECS",
+    help="Seconds an event consumer process being stopped is given to complete "
+    "the events it is processing before it is killed.",
+)
+def run(color, debug, reload, debug_py, consumers, liveness_timeout, drain_timeout):
     "Run the extension."
 
     if debug_py:
@@ -20,6 +42,9 @@ def run(color, debug, reload, debug_py):
             "color": color,
             "debug": debug,
             "reload": reload,
+            "consumers": consumers,
+            "liveness_timeout": liveness_timeout,
+            "drain_timeout": drain_timeout,
         },
     )
     master.run()
@@ -186,5 +186,31 @@ MPT_PRODUCTS_IDS = os.getenv("MPT_PRODUCTS_IDS", "PRD-1111-1111")
 MPT_PORTAL_BASE_URL = os.getenv("MPT_PORTAL_BASE_URL", "https://portal.s1.show")
 
 MPT_ORDERS_API_POLLING_INTERVAL_SECS = int(os.getenv("MPT_ORDERS_API_POLLING_INTERVAL_SECS", "120"))
+MPT_ORDERS_API_PAGE_SIZE = int(os.getenv("MPT_ORDERS_API_PAGE_SIZE", "100"))
+MPT_ORDERS_API_PAGINATION_WORKERS = int(os.getenv("MPT_ORDERS_API_PAGINATION_WORKERS", "4"))
+# orders that haven't changed since they were dispatched are dispatched again
+# only every MPT_ORDERS_API_RECHECK_INTERVAL_SECS seconds, 0 dispatches
+# all the processing orders at every polling cycle
+MPT_ORDERS_API_RECHECK_INTERVAL_SECS = int(os.getenv("MPT_ORDERS_API_RECHECK_INTERVAL_SECS", "0"))
+
+MPT_DISPATCHER_MAX_WORKERS = int(
+    os.getenv("MPT_DISPATCHER_MAX_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))),
+)
+MPT_DISPATCHER_QUEUE_MAXSIZE = int(os.getenv("MPT_DISPATCHER_QUEUE_MAXSIZE", "1000"))
+MPT_DISPATCHER_SCHEDULING_POLICY = os.getenv(
+    "MPT_DISPATCHER_SCHEDULING_POLICY", "adobe_vipm.utils.get_scheduling_policy"
+)
+# an event which object has been processed N times without being completed
+# is delayed by MPT_DISPATCHER_BACKOFF_BASE_SECS * 2 ** (N - 1) seconds up to
+# MPT_DISPATCHER_BACKOFF_MAX_SECS, 0 disables the delay
+MPT_DISPATCHER_BACKOFF_BASE_SECS = float(os.getenv("MPT_DISPATCHER_BACKOFF_BASE_SECS", "0"))
+MPT_DISPATCHER_BACKOFF_MAX_SECS = float(os.getenv("MPT_DISPATCHER_BACKOFF_MAX_SECS", "3600"))
+MPT_API_POOL_MAXSIZE = int(
+    os.getenv("MPT_API_POOL_MAXSIZE", str(max(36, MPT_DISPATCHER_MAX_WORKERS))),
+)
+MPT_API_CONNECT_TIMEOUT_SECS = float(os.getenv("MPT_API_CONNECT_TIMEOUT_SECS", "10"))
+MPT_API_READ_TIMEOUT_SECS = float(os.getenv("MPT_API_READ_TIMEOUT_SECS", "60"))
+MPT_API_MAX_RETRIES = int(os.getenv("MPT_API_MAX_RETRIES", "5"))
+MPT_API_ADAPTER = os.getenv("MPT_API_ADAPTER", "adobe_vipm.flows.mpt.MPTCircuitBreakerAdapter")
 
 EXTENSION_CONFIG = {}
@@ -1,3 +1,4 @@
+import logging
 import signal
 from threading import Event
 
@@ -5,6 +6,8 @@ from django.core.management.base import BaseCommand
 from swo.mpt.extensions.runtime.events.dispatcher import Dispatcher
 from swo.mpt.extensions.runtime.events.producers import OrderEventProducer
 
+logger = logging.getLogger(__name__)
+
 
 class Command(BaseCommand):
     help = "Consume events from the MPT platform"
@@ -12,6 +15,21 @@ class Command(BaseCommand):
         OrderEventProducer,
     ]
     producers = []
+    stealth_options = ("heartbeat",)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--shard",
+            type=int,
+            default=0,
+            help="Index of the shard of the events to consume",
+        )
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=1,
+            help="Number of shards the events are split into",
+        )
 
     def handle(self, *args, **options):
         self.shutdown_event = Event()
@@ -24,7 +42,12 @@ class Command(BaseCommand):
         signal.signal(signal.SIGTERM, shutdown)
         signal.signal(signal.SIGINT, shutdown)
         for producer_cls in self.producer_classes:
-            producer = producer_cls(self.dispatcher)
+            producer = producer_cls(
+                self.dispatcher,
+                shard=options["shard"],
+                shards=options["shards"],
+                heartbeat=options.get("heartbeat"),
+            )
             self.producers.append(producer)
             producer.start()
 
@@ -32,3 +55,6 @@ class Command(BaseCommand):
         for producer in self.producers:
             producer.stop()
         self.dispatcher.stop()
+        # the queued events are given up, they are polled again at restart
+        logger.info("Waiting for the processing events to complete...")
+        self.dispatcher.executor.shutdown(wait=True)
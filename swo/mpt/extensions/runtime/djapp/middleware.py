@@ -1,5 +1,4 @@
-from django.conf import settings
-from swo.mpt.client import MPTClient
+from swo.mpt.extensions.core.utils import setup_client
 
 _CLIENT = None
 
@@ -11,10 +10,7 @@ class MPTClientMiddleware:
     def __call__(self, request):
         global _CLIENT
         if not _CLIENT:
-            _CLIENT = MPTClient(
-                f"{settings.MPT_API_BASE_URL}/v1/",
-                settings.MPT_API_TOKEN,
-            )
+            _CLIENT = setup_client()
         request.client = _CLIENT
         response = self.get_response(request)
         return response
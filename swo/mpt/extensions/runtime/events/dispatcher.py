@@ -2,33 +2,70 @@ import functools
 import logging
 import threading
 import time
-from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 
+from django.conf import settings
+
 from swo.mpt.extensions.core.events.dataclasses import Event
 from swo.mpt.extensions.core.events.registry import EventsRegistry
 from swo.mpt.extensions.core.utils import setup_client
+from swo.mpt.extensions.runtime.events.policies import get_scheduling_policy
+from swo.mpt.extensions.runtime.events.scheduler import BackoffScheduler
 from swo.mpt.extensions.runtime.events.utils import wrap_for_trace
 from swo.mpt.extensions.runtime.utils import get_events_registry
 
 logger = logging.getLogger(__name__)
 
 
-def done_callback(futures, key, future):
-    del futures[key]
-    exc = future.exception()
-    if not exc:
-        logger.debug(f"Future for {key} has been completed successfully")
-        return
-    logger.error(f"Future for {key} has failed: {exc}")
+class Dispatcher:
+    """
+    Runs the listeners of the events in a pool of `MPT_DISPATCHER_MAX_WORKERS`
+    worker threads.
 
+    Events are taken from the queue as soon as a worker is free, in the order
+    given by the `MPT_DISPATCHER_SCHEDULING_POLICY` policy. The queue
+    holds the events of up to `MPT_DISPATCHER_QUEUE_MAXSIZE` objects (a newer
+    event replaces in place the queued one with the same type and id): once
+    full, `dispatch_event` blocks the producers until there is room again.
+    While an event is processing, the following event with the same
+    type and id is parked (a newer one replaces it) and it is queued
+    again once the processing event has completed, so the events of an
+    object are never processed concurrently.
+    If `MPT_DISPATCHER_BACKOFF_BASE_SECS` is set, events of objects that
+    have already been processed without being completed are held until
+    they are due (see `BackoffScheduler`).
+    The events taken from the queue together are enriched at once, right
+    before being submitted, so only the events actually processed are
+    enriched.
+    The dispatcher records the last time it has made progress (an event has
+    been submitted to a worker or has completed) so that a process which
+    workers are all hanging can be told apart from a busy one.
+    """
 
-class Dispatcher:
     def __init__(self):
         self.registry: EventsRegistry = get_events_registry()
-        self.queue = deque()
+        self.queue = get_scheduling_policy()
+        self.parked = {}
         self.futures = {}
-        self.executor = ThreadPoolExecutor()
+        self.condition = threading.Condition()
+        self.max_workers = settings.MPT_DISPATCHER_MAX_WORKERS
+        self.queue_maxsize = settings.MPT_DISPATCHER_QUEUE_MAXSIZE
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.scheduler = (
+            BackoffScheduler(
+                settings.MPT_DISPATCHER_BACKOFF_BASE_SECS,
+                settings.MPT_DISPATCHER_BACKOFF_MAX_SECS,
+                # held events are refreshed at every polling cycle, or at every
+                # recheck of the unchanged orders if it is enabled
+                max_age=2 * max(
+                    settings.MPT_ORDERS_API_POLLING_INTERVAL_SECS,
+                    settings.MPT_ORDERS_API_RECHECK_INTERVAL_SECS,
+                ),
+            )
+            if settings.MPT_DISPATCHER_BACKOFF_BASE_SECS > 0
+            else None
+        )
+        self.progressed_at = time.time()
         self.running_event = threading.Event()
         self.processor = threading.Thread(target=self.process_events)
         self.client = setup_client()
@@ -38,36 +75,166 @@ class Dispatcher:
         self.processor.start()
 
     def stop(self):
-        self.running_event.clear()
+        with self.condition:
+            self.running_event.clear()
+            self.condition.notify_all()
         self.processor.join()
 
     @property
     def running(self):
         return self.running_event.is_set()
 
-    def dispatch_event(self, event: Event):
-        if self.registry.is_event_supported(event.type):
-            logger.info(f"event of type {event.type} with id {event.id} accepted")
-            self.queue.appendleft((event.type, event))
+    @property
+    def full(self):
+        return len(self.queue) >= self.queue_maxsize
+
+    @property
+    def idle(self):
+        return not self.futures and not len(self.queue)
+
+    def get_progressed_at(self) -> float:
+        """
+        Returns the last time the dispatcher has made progress, or the current
+        time if it has nothing to process.
+        """
+        with self.condition:
+            return time.time() if self.idle else self.progressed_at
+
+    def dispatch_event(self, event: Event, timeout: float | None = None) -> bool:
+        """
+        Queues an event to be processed, waiting up to `timeout` seconds
+        (forever if None) for room in the queue if it is full.
+
+        Returns:
+            bool: False if the event has not been queued because the queue is
+            still full once the timeout has expired or the dispatcher has been
+            stopped, True otherwise.
+        """
+        if not self.registry.is_event_supported(event.type):
+            return True
+        key = (event.type, event.id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            if self.running and key in self.futures:
+                logger.info(f"An event for {key} is already processing, park it")
+                self.parked[key] = event
+                return True
+            if self.running and self.hold_event(event):
+                logger.info(f"event of type {event.type} with id {event.id} delayed")
+                self.condition.notify_all()
+                return True
+            while self.running and self.full and key not in self.queue:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+            if not self.running:
+                return False
+            if self.idle:
+                self.progressed_at = time.time()
+            self.queue.push(event)
+            self.condition.notify_all()
+        logger.info(f"event of type {event.type} with id {event.id} accepted")
+        return True
+
+    def hold_event(self, event: Event) -> bool:
+        return self.scheduler is not None and self.scheduler.hold(event, time.monotonic())
 
     def process_events(self):
-        while self.running:
-            skipped = []
-            while len(self.queue) > 0:
-                event_type, event = self.queue.pop()
-                logger.debug(f"got event of type {event_type} ({event.id}) from queue...")
-                listener = wrap_for_trace(self.registry.get_listener(event_type), event_type)
-                if (event.type, event.id) not in self.futures:
-                    future = self.executor.submit(listener, self.client, event)
-                    self.futures[(event.type, event.id)] = future
-                    future.add_done_callback(
-                        functools.partial(done_callback, self.futures, (event.type, event.id))
-                    )
-                else:
-                    logger.info(
-                        f"An event for {(event.type, event.id)} is already processing, skip it"
-                    )
-                    skipped.append((event.type, event))
-
-            self.queue.extendleft(skipped)
-            time.sleep(0.5)
+        while True:
+            with self.condition:
+                while True:
+                    if not self.running:
+                        return
+                    if self.scheduler:
+                        for due_event in self.scheduler.pop_due(time.monotonic()):
+                            self.queue.push(due_event)
+                    events = self.admit_events()
+                    if events:
+                        break
+                    self.condition.wait(self.get_wait_timeout())
+                # wake up the producers waiting for room in the queue
+                self.condition.notify_all()
+            self.enrich_events(events)
+            with self.condition:
+                for event in events:
+                    self.submit_event(event)
+
+    def get_wait_timeout(self):
+        next_due = self.scheduler.get_next_due() if self.scheduler else None
+        if next_due is None:
+            return None
+        return max(next_due - time.monotonic(), 0)
+
+    def admit_events(self) -> list[Event]:
+        """
+        Takes from the queue the events to process, up to the number of free
+        workers, and reserves a worker for each of them. Events of objects
+        which are processing are parked, the ones that are not due are held.
+        """
+        events = []
+        while len(self.futures) < self.max_workers:
+            event = self.queue.pop()
+            if event is None:
+                break
+            key = (event.type, event.id)
+            logger.debug(f"got event of type {event.type} ({event.id}) from queue...")
+            if key in self.futures:
+                logger.info(f"An event for {key} is already processing, park it")
+                self.parked[key] = event
+                continue
+            # its object could have been processed since the event has been queued
+            if self.hold_event(event):
+                logger.info(f"event of type {event.type} with id {event.id} delayed")
+                continue
+            # the worker is reserved until the event is submitted, so newer
+            # events of the same object are parked in the meantime
+            self.futures[key] = None
+            self.progressed_at = time.time()
+            self.queue.started(event)
+            events.append(event)
+        return events
+
+    def enrich_events(self, events: list[Event]):
+        """
+        Invokes the enricher of each event type, if any, once with all the
+        admitted events of such type.
+        """
+        events_by_type = {}
+        for event in events:
+            events_by_type.setdefault(event.type, []).append(event)
+        for event_type, typed_events in events_by_type.items():
+            enricher = self.registry.get_enricher(event_type)
+            if not enricher:
+                continue
+            try:
+                enricher(self.client, typed_events)
+            except Exception:
+                # listeners must not rely on the enrichment, so process anyway
+                logger.exception(f"Cannot enrich events of type {event_type}")
+
+    def submit_event(self, event: Event):
+        key = (event.type, event.id)
+        listener = wrap_for_trace(self.registry.get_listener(event.type), event.type)
+        future = self.executor.submit(listener, self.client, event)
+        self.futures[key] = future
+        self.progressed_at = time.time()
+        future.add_done_callback(functools.partial(self.done_callback, event))
+
+    def done_callback(self, event, future):
+        key = (event.type, event.id)
+        with self.condition:
+            del self.futures[key]
+            self.progressed_at = time.time()
+            self.queue.completed(event)
+            if self.scheduler:
+                self.scheduler.completed(key, time.monotonic())
+            parked = self.parked.pop(key, None)
+            if parked and not self.hold_event(parked):
+                self.queue.push(parked, first=True)
+            self.condition.notify_all()
+        exc = future.exception()
+        if not exc:
+            logger.debug(f"Future for {key} has been completed successfully")
+            return
+        logger.error(f"Future for {key} has failed: {exc}")
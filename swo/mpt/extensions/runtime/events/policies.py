@@ -0,0 +1,162 @@
+import logging
+from collections import OrderedDict, defaultdict, deque
+from typing import Callable, Hashable
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from swo.mpt.extensions.core.events.dataclasses import Event
+
+logger = logging.getLogger(__name__)
+
+
+def get_event_key(event: Event):
+    return event.type, event.id
+
+
+class FifoPolicy:
+    """
+    Schedules the events in the order they have been dispatched.
+    A queued event is replaced in place by a newer event with the
+    same type and id.
+    """
+
+    def __init__(self):
+        self.keys = deque()
+        self.events = {}
+
+    def __len__(self):
+        return len(self.events)
+
+    def __contains__(self, key):
+        return key in self.events
+
+    def push(self, event: Event, first: bool = False):
+        key = get_event_key(event)
+        if key in self.events:
+            self.events[key] = event
+            return
+        self.events[key] = event
+        if first:
+            self.keys.appendleft(key)
+        else:
+            self.keys.append(key)
+
+    def pop(self) -> Event | None:
+        return self.events.pop(self.keys.popleft()) if self.keys else None
+
+    def started(self, event: Event):
+        pass
+
+    def completed(self, event: Event):
+        pass
+
+
+class FairPriorityPolicy:
+    """
+    Schedules the events by priority class (lower first) and, within the same
+    class, round-robin across the fairness keys of the events (e.g. their
+    customer) so a burst of events for a key doesn't delay the others.
+    Events of a key are scheduled in the order they have been dispatched,
+    and no more than `max_in_flight_per_key` of them are processed at once.
+    A queued event is replaced in place by a newer event with the same type
+    and id, unless the newer event has another priority or fairness key: it
+    is then filed under its own class and key instead.
+    """
+
+    def __init__(
+        self,
+        priority: Callable[[Event], int],
+        fairness_key: Callable[[Event], Hashable],
+        max_in_flight_per_key: int = 0,
+    ):
+        self.priority = priority
+        self.fairness_key = fairness_key
+        self.max_in_flight_per_key = max_in_flight_per_key
+        # priority -> fairness key -> event keys, fairness keys are rotated once served
+        self.classes = defaultdict(OrderedDict)
+        self.events = {}
+        self.in_flight = defaultdict(int)
+
+    def __len__(self):
+        return len(self.events)
+
+    def __contains__(self, key):
+        return key in self.events
+
+    def push(self, event: Event, first: bool = False):
+        event_key = get_event_key(event)
+        queued = self.events.get(event_key)
+        if queued is not None:
+            if (self.priority(queued), self.fairness_key(queued)) == (
+                self.priority(event),
+                self.fairness_key(event),
+            ):
+                self.events[event_key] = event
+                return
+            self.remove(queued)
+        self.events[event_key] = event
+        keys = self.classes[self.priority(event)]
+        key = self.fairness_key(event)
+        if key not in keys:
+            keys[key] = deque()
+        if first:
+            keys[key].appendleft(event_key)
+        else:
+            keys[key].append(event_key)
+
+    def remove(self, event: Event):
+        event_key = get_event_key(event)
+        priority = self.priority(event)
+        keys = self.classes[priority]
+        key = self.fairness_key(event)
+        keys[key].remove(event_key)
+        if not keys[key]:
+            del keys[key]
+        if not keys:
+            del self.classes[priority]
+        del self.events[event_key]
+
+    def pop(self) -> Event | None:
+        """
+        Returns the next event to process or None if there are no events
+        or all the keys of the queued events are at their in-flight limit.
+        """
+        for priority in sorted(self.classes):
+            keys = self.classes[priority]
+            for key in list(keys):
+                if (
+                    self.max_in_flight_per_key > 0
+                    and self.in_flight[key] >= self.max_in_flight_per_key
+                ):
+                    continue
+                event_keys = keys.pop(key)
+                event = self.events.pop(event_keys.popleft())
+                if event_keys:
+                    keys[key] = event_keys
+                if not keys:
+                    del self.classes[priority]
+                return event
+        return None
+
+    def started(self, event: Event):
+        self.in_flight[self.fairness_key(event)] += 1
+
+    def completed(self, event: Event):
+        key = self.fairness_key(event)
+        self.in_flight[key] -= 1
+        if self.in_flight[key] <= 0:
+            del self.in_flight[key]
+
+
+def get_scheduling_policy():
+    try:
+        factory = import_string(settings.MPT_DISPATCHER_SCHEDULING_POLICY)
+    except ImportError:
+        logger.warning(
+            "Cannot import the scheduling policy "
+            f"{settings.MPT_DISPATCHER_SCHEDULING_POLICY}, fall back to FIFO",
+            exc_info=True,
+        )
+        factory = FifoPolicy
+    return factory()
@@ -6,15 +6,43 @@ from contextlib import contextmanager
 
 import requests
 from django.conf import settings
+from swo.mpt.client.pagination import paginate
 from swo.mpt.extensions.core.events import Event
 from swo.mpt.extensions.core.utils import setup_client
+from swo.mpt.extensions.runtime.events.utils import get_attempt
 
 logger = logging.getLogger(__name__)
 
 
+def get_shard_suffixes(shard, shards):
+    """
+    Returns the trailing digits of the keys (e.g. agreement ids) that belong
+    to a shard, so each process can ask the API for its own objects only.
+    Keys are split by their last digit if that spreads them evenly across
+    the shards, by their last two digits otherwise (up to 100 shards).
+    """
+    digits = 1 if 10 % shards == 0 else 2
+    return [
+        f"{suffix:0{digits}d}" for suffix in range(10**digits) if suffix % shards == shard
+    ]
+
+
 class EventProducer(ABC):
-    def __init__(self, dispatcher):
+    """
+    Base class of the producers of events.
+
+    When several consumer processes are running, each one produces only the
+    events of its `shard` out of `shards`. While it is running, the producer
+    keeps the `heartbeat` shared value, if any, updated with the last time
+    the dispatcher has made progress, so the master process can tell whether
+    the producer or the workers of the dispatcher are stuck.
+    """
+
+    def __init__(self, dispatcher, shard=0, shards=1, heartbeat=None):
         self.dispatcher = dispatcher
+        self.shard = shard
+        self.shards = max(shards, 1)
+        self.heartbeat = heartbeat
         self.running_event = threading.Event()
         self.producer = threading.Thread(target=self.produce_events)
 
@@ -30,59 +58,166 @@ class EventProducer(ABC):
         self.running_event.clear()
         self.producer.join()
 
+    def beat(self):
+        if self.heartbeat is not None:
+            self.heartbeat.value = self.dispatcher.get_progressed_at()
+
+    def get_shard_rql(self, field):
+        """
+        Returns the RQL filter that selects the objects of the shard of this
+        producer by the given key field, or None if there is a single shard.
+        """
+        if self.shards == 1:
+            return None
+        clauses = ",".join(
+            f"like({field},*{suffix})"
+            for suffix in get_shard_suffixes(self.shard, self.shards)
+        )
+        return f"or({clauses})"
+
     @contextmanager
     def sleep(self, secs, interval=0.5):
+        self.beat()
         yield
         sleeped = 0
         while sleeped < secs and self.running_event.is_set():
+            self.beat()
             time.sleep(interval)
             sleeped += interval
 
+    def dispatch_events(self, events, timeout):
+        """
+        Dispatches the events, waiting while the queue of the dispatcher is
+        full. Once `timeout` seconds have passed, or the producer has been
+        stopped, the remaining events are given up.
+
+        Returns:
+            list: The events that have not been dispatched.
+        """
+        deadline = time.monotonic() + timeout
+        for index, event in enumerate(events):
+            while not self.dispatcher.dispatch_event(
+                event,
+                timeout=min(1, max(deadline - time.monotonic(), 0)),
+            ):
+                self.beat()
+                if not self.running or time.monotonic() >= deadline:
+                    return events[index:]
+        return []
+
     @abstractmethod
     def produce_events(self):
         pass
 
 
+class OrdersTracker:
+    """
+    Tracks the version of the processing orders across polling cycles to
+    select the ones worth processing.
+
+    The version of an order is the time it has been updated at plus its
+    processing attempt. New orders and orders that have been changed since
+    they were dispatched are selected at once. Orders that haven't been
+    changed, or which only change is a new processing attempt (the order is
+    still pending on the vendor side), are selected again once every
+    `recheck_interval` seconds.
+    """
+
+    def __init__(self, recheck_interval):
+        self.recheck_interval = recheck_interval
+        # order id -> (updated at, attempt, dispatched at)
+        self.orders = {}
+
+    def select(self, events):
+        now = time.monotonic()
+        selected = []
+        orders = {}
+        for event in events:
+            audit = event.data.get("audit") or {}
+            updated_at = (audit.get("updated") or {}).get("at")
+            attempt = get_attempt(event)
+            previous = self.orders.get(event.id)
+            dispatched_at = previous[2] if previous else None
+            if (
+                previous is None
+                or (previous[0] != updated_at and attempt <= previous[1])
+                or now - dispatched_at >= self.recheck_interval
+            ):
+                selected.append(event)
+                dispatched_at = now
+            orders[event.id] = (updated_at, attempt, dispatched_at)
+        # forget the orders that are not processing anymore
+        self.orders = orders
+        return selected
+
+    def forget(self, events):
+        """
+        Forgets the orders of events that have not been dispatched,
+        so they are selected again at the next polling cycle.
+        """
+        for event in events:
+            self.orders.pop(event.id, None)
+
+
 class OrderEventProducer(EventProducer):
-    def __init__(self, dispatcher):
-        super().__init__(dispatcher)
+    """
+    Polls the processing orders. Orders are sharded by agreement, so the
+    orders of an agreement are always processed by the same consumer process,
+    and each process retrieves only the orders of its shard.
+    """
+
+    def __init__(self, dispatcher, **kwargs):
+        super().__init__(dispatcher, **kwargs)
         self.client = setup_client()
+        self.tracker = (
+            OrdersTracker(settings.MPT_ORDERS_API_RECHECK_INTERVAL_SECS)
+            if settings.MPT_ORDERS_API_RECHECK_INTERVAL_SECS > 0
+            else None
+        )
 
     def produce_events(self):
         while self.running:
             with self.sleep(settings.MPT_ORDERS_API_POLLING_INTERVAL_SECS):
+                if self.dispatcher.full:
+                    logger.info("The dispatcher is full, skip fetching the orders")
+                    continue
                 orders = self.get_processing_orders()
                 logger.info(f"{len(orders)} orders found for processing...")
-                for order in orders:
-                    self.dispatcher.dispatch_event(Event(order["id"], "orders", order))
+                events = [Event(order["id"], "orders", order) for order in orders]
+                if self.tracker:
+                    events = self.tracker.select(events)
+                    logger.info(f"{len(events)} orders are new, changed or due to recheck")
+                postponed = self.dispatch_events(
+                    events,
+                    settings.MPT_ORDERS_API_POLLING_INTERVAL_SECS,
+                )
+                if postponed:
+                    logger.warning(
+                        f"The dispatcher is full, {len(postponed)} orders "
+                        "have been postponed to the next polling cycle",
+                    )
+                    if self.tracker:
+                        self.tracker.forget(postponed)
 
     def get_processing_orders(self):
         products = ','.join(settings.MPT_PRODUCTS_IDS)
-        orders = []
-        rql_query = f"and(in(agreement.product.id,({products})),eq(status,processing))"
+        rql_filters = [f"in(agreement.product.id,({products}))", "eq(status,processing)"]
+        shard_rql = self.get_shard_rql("agreement.id")
+        if shard_rql:
+            rql_filters.append(shard_rql)
+        rql_query = f"and({','.join(rql_filters)})"
         url = f"/commerce/orders?{rql_query}&select=audit,parameters,lines,subscriptions,subscriptions.lines&order=audit.created.at"
-        page = None
-        limit = 10
-        offset = 0
-        while self.has_more_pages(page):
-            try:
-                response = self.client.get(f"{url}&limit={limit}&offset={offset}")
-            except requests.RequestException:
-                logger.exception("Cannot retrieve orders")
-                return []
-
-            if response.status_code == 200:
-                page = response.json()
-                orders.extend(page["data"])
-            else:
-                logger.warning(f"Order API error: {response.status_code} {response.content}")
-                return []
-            offset += limit
-
-        return orders
-
-    def has_more_pages(self, orders):
-        if not orders:
-            return True
-        pagination = orders["$meta"]["pagination"]
-        return pagination["total"] > pagination["limit"] + pagination["offset"]
+        try:
+            return list(
+                paginate(
+                    self.client,
+                    url,
+                    limit=settings.MPT_ORDERS_API_PAGE_SIZE,
+                    max_workers=settings.MPT_ORDERS_API_PAGINATION_WORKERS,
+                ),
+            )
+        except requests.HTTPError as e:
+            logger.warning(f"Order API error: {e.response.status_code} {e.response.content}")
+        except requests.RequestException:
+            logger.exception("Cannot retrieve orders")
+        return []
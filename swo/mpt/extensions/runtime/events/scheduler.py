@@ -0,0 +1,108 @@
+import heapq
+import random
+from collections import OrderedDict
+
+from swo.mpt.extensions.core.events.dataclasses import Event
+from swo.mpt.extensions.runtime.events.utils import get_attempt
+
+
+class BackoffScheduler:
+    """
+    Delays the events of objects that are waiting for something to happen
+    (e.g. an order still pending on the vendor side).
+
+    The processing attempt of an event (see `LOGGING_ATTEMPT_GETTER`) tells
+    how many times its object has been processed without being completed:
+    an event with attempt N > 0 is due `base_delay * 2 ** (N - 1)` seconds
+    (up to `max_delay`, +/- `jitter` drawn once the processing has
+    completed) after the last processing of its object has completed.
+    Events that are not due yet are kept in a heap ordered by due time, a
+    newer event for the same object replaces the held one and its due time
+    is computed again from its own attempt (e.g. it is released right away
+    if the object has changed and its attempt has been reset).
+    Events which have not been replaced for more than `max_age` seconds
+    are dropped once due, since their object is likely not to be waiting
+    anymore (producers poll the waiting objects again and again).
+    """
+
+    def __init__(self, base_delay, max_delay, max_age, jitter=0.1):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_age = max_age
+        self.jitter = jitter
+        self.heap = []
+        self.delayed = {}
+        # key -> (last processing completed at, jitter factor)
+        self.last_runs = OrderedDict()
+
+    def get_delay(self, attempt):
+        if attempt <= 0:
+            return 0
+        return min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+    def hold(self, event: Event, now: float) -> bool:
+        """
+        Holds the event if it is not due yet.
+
+        Returns:
+            bool: True if the event has been held, False if it is due.
+        """
+        key = (event.type, event.id)
+        last_run = self.last_runs.get(key)
+        if last_run is None:
+            self.delayed.pop(key, None)
+            return False
+        completed_at, factor = last_run
+        due_at = completed_at + self.get_delay(get_attempt(event)) * factor
+        if due_at <= now:
+            self.delayed.pop(key, None)
+            return False
+        held = self.delayed.get(key)
+        self.delayed[key] = (due_at, event, now)
+        if held is None or held[0] != due_at:
+            heapq.heappush(self.heap, (due_at, key))
+        return True
+
+    def discard_stale(self):
+        """
+        Discards the heap entries of the events which have been released or
+        which due time has changed since they have been held.
+        """
+        while self.heap:
+            due_at, key = self.heap[0]
+            held = self.delayed.get(key)
+            if held is not None and held[0] == due_at:
+                return
+            heapq.heappop(self.heap)
+
+    def pop_due(self, now: float) -> list[Event]:
+        """
+        Returns the held events that are due, in order of due time.
+        """
+        events = []
+        self.discard_stale()
+        while self.heap and self.heap[0][0] <= now:
+            _, key = heapq.heappop(self.heap)
+            _, event, held_at = self.delayed.pop(key)
+            if now - held_at <= self.max_age:
+                events.append(event)
+            self.discard_stale()
+        return events
+
+    def get_next_due(self) -> float | None:
+        self.discard_stale()
+        return self.heap[0][0] if self.heap else None
+
+    def completed(self, key, now: float):
+        """
+        Records that the processing of an object has completed and forgets
+        the objects which last processing is older than the maximum delay.
+        """
+        self.last_runs.pop(key, None)
+        self.last_runs[key] = (now, random.uniform(1 - self.jitter, 1 + self.jitter))
+        horizon = now - self.max_delay * (1 + self.jitter)
+        while self.last_runs:
+            oldest_key, (completed_at, _) = next(iter(self.last_runs.items()))
+            if completed_at > horizon:
+                break
+            del self.last_runs[oldest_key]
@@ -40,18 +40,21 @@ def instrument_logging():
     LoggingInstrumentor().instrument()
 
 
+def get_attempt(event):
+    try:
+        attempt_func = import_string(settings.LOGGING_ATTEMPT_GETTER)
+    except ImportError:
+        return 0
+    return attempt_func(event)
+
+
 def wrap_for_trace(func, event_type):
     @wraps(func)
     def opentelemetry_wrapper(client, event):
         tracer = trace.get_tracer(event_type)
         object_id = event.id
 
-        try:
-            attempt_func = import_string(settings.LOGGING_ATTEMPT_GETTER)
-        except ImportError:
-            attempt_func = lambda _: 0  # noqa: E731
-
-        attempt = attempt_func(event)
+        attempt = get_attempt(event)
         with tracer.start_as_current_span(
             f"Event {event_type} for {object_id} attempt {attempt}"
         ) as span:
@@ -1,4 +1,5 @@
 import logging
+import multiprocessing
 import signal
 import threading
 import time
@@ -14,6 +15,9 @@ logger = logging.getLogger(__name__)
 
 HANDLED_SIGNALS = (signal.SIGINT, signal.SIGTERM)
 PROCESS_CHECK_INTERVAL_SECS = 5
+DEFAULT_LIVENESS_TIMEOUT_SECS = 600
+DEFAULT_DRAIN_TIMEOUT_SECS = 60
+MAX_EVENT_CONSUMERS = 100
 
 
 def _display_path(path):
@@ -24,6 +28,18 @@ def _display_path(path):
 
 
 class Master:
+    """
+    Starts and monitors the worker processes of the extension.
+
+    The events are consumed by `consumers` processes, each one owning a
+    shard of the events. A consumer process is restarted if it dies or if
+    its heartbeat is older than `liveness_timeout` seconds, that is its
+    producer is stuck or its dispatcher has work to do but hasn't made
+    progress for that long.
+    A consumer process being stopped is given `drain_timeout` seconds to
+    complete the events it is processing before it is killed.
+    """
+
     PROC_TARGETS = {
         "event-consumer": start_event_consumer,
         "gunicorn": start_gunicorn,
@@ -31,7 +47,11 @@ class Master:
 
     def __init__(self, options):
         self.workers = {}
+        self.heartbeats = {}
         self.options = options
+        self.targets = self.get_targets()
+        self.liveness_timeout = options.get("liveness_timeout") or DEFAULT_LIVENESS_TIMEOUT_SECS
+        self.drain_timeout = options.get("drain_timeout") or DEFAULT_DRAIN_TIMEOUT_SECS
         self.stop_event = threading.Event()
         self.monitor_event = threading.Event()
         self.watch_filter = PythonFilter(ignore_paths=None)
@@ -51,26 +71,56 @@ class Master:
     def handle_signal(self, *args, **kwargs):
         self.stop_event.set()
 
-    def start(self):
+    def get_targets(self):
+        consumers = max(self.options.get("consumers") or 1, 1)
+        targets = {}
         for worker_type, target in self.PROC_TARGETS.items():
-            self.start_worker_process(worker_type, target)
+            if worker_type == "event-consumer" and consumers > 1:
+                for shard in range(consumers):
+                    targets[f"{worker_type}-{shard}"] = (
+                        target,
+                        {**self.options, "shard": shard, "shards": consumers},
+                    )
+            else:
+                targets[worker_type] = (target, self.options)
+        return targets
+
+    def start(self):
+        for worker_type, (target, options) in self.targets.items():
+            self.start_worker_process(worker_type, target, options)
         self.monitor_thread = threading.Thread(target=self.monitor_processes)
         self.monitor_event.set()
         self.monitor_thread.start()
 
-    def start_worker_process(self, worker_type, target):
-        p = start_process(target, "function", (self.options,), {})
+    def start_worker_process(self, worker_type, target, options):
+        if target is start_event_consumer:
+            heartbeat = multiprocessing.get_context("spawn").Value("d", time.time())
+            self.heartbeats[worker_type] = heartbeat
+            options = {**options, "heartbeat": heartbeat}
+        p = start_process(target, "function", (options,), {})
         self.workers[worker_type] = p
         logger.info(f"{worker_type.capitalize()} worker pid: {p.pid}")
 
+    def stop_worker_process(self, worker_type, p):
+        sigint_timeout = self.drain_timeout if worker_type in self.heartbeats else 5
+        p.stop(sigint_timeout=sigint_timeout, sigkill_timeout=1)
+
+    def is_stuck(self, worker_type):
+        heartbeat = self.heartbeats.get(worker_type)
+        return heartbeat is not None and time.time() - heartbeat.value > self.liveness_timeout
+
     def monitor_processes(self):
         while self.monitor_event.is_set():
             exited_workers = []
-            for worker_type, p in self.workers.items():
-                if not p.is_alive():
+            for worker_type, p in list(self.workers.items()):
+                if p.is_alive() and self.is_stuck(worker_type):
+                    logger.warning(f"Process of type {worker_type} is stuck, restart it")
+                    self.stop_worker_process(worker_type, p)
+                    self.start_worker_process(worker_type, *self.targets[worker_type])
+                elif not p.is_alive():
                     if p.exitcode != 0:
                         logger.info(f"Process of type {worker_type} is dead, restart it")
-                        self.start_worker_process(worker_type, self.PROC_TARGETS[worker_type])
+                        self.start_worker_process(worker_type, *self.targets[worker_type])
                     else:
                         exited_workers.append(worker_type)
                         logger.info(f"{worker_type.capitalize()} worker exited")
@@ -83,7 +133,7 @@ class Master:
         self.monitor_event.clear()
         self.monitor_thread.join()
         for worker_type, process in self.workers.items():
-            process.stop(sigint_timeout=5, sigkill_timeout=1)
+            self.stop_worker_process(worker_type, process)
             logger.info(f"{worker_type.capitalize()} process with pid {process.pid} stopped.")
 
     def restart(self):
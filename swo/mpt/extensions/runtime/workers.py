@@ -25,7 +25,12 @@ class ExtensionWebApplication(BaseApplication):
 
 def start_event_consumer(options):
     initialize(options)
-    call_command("consume_events")
+    call_command(
+        "consume_events",
+        shard=options.get("shard", 0),
+        shards=options.get("shards", 1),
+        heartbeat=options.get("heartbeat"),
+    )
 
 
 def start_gunicorn(options):
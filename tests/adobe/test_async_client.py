@@ -0,0 +1,493 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from adobe_vipm.adobe.async_client import AsyncAdobeClient, get_async_adobe_client
+from adobe_vipm.adobe.constants import (
+    ORDER_TYPE_NEW,
+    ORDER_TYPE_PREVIEW,
+    ORDER_TYPE_RETURN,
+    STATUS_PENDING,
+    STATUS_PROCESSED,
+)
+from adobe_vipm.adobe.dataclasses import APIToken
+from adobe_vipm.adobe.errors import AdobeAPIError, AdobeError
+from adobe_vipm.adobe.utils import to_adobe_line_id
+from adobe_vipm.circuit_breaker import STATE_CLOSED, get_circuit_breaker
+
+
+@pytest.fixture()
+def async_adobe_client_factory(adobe_client_factory):
+    """
+    Returns a factory that creates an AsyncAdobeClient bound to an AdobeClient
+    with a fake token, which requests are served by the given handler.
+    """
+
+    def _factory(handler):
+        client, authorization, api_token = adobe_client_factory()
+        return (
+            AsyncAdobeClient(client, transport=httpx.MockTransport(handler)),
+            authorization,
+            api_token,
+        )
+
+    return _factory
+
+
+def test_get_customer(async_adobe_client_factory, adobe_authorizations_file):
+    """
+    Tests the retrieval of a customer through the async client.
+    """
+    authorization_uk = adobe_authorizations_file["authorizations"][0]["authorization_uk"]
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"customerId": "a-customer-id"})
+
+    client, authorization, api_token = async_adobe_client_factory(handler)
+
+    async def run():
+        try:
+            return await client.get_customer(authorization_uk, "a-customer-id")
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == {"customerId": "a-customer-id"}
+    assert requests[0].method == "GET"
+    assert requests[0].url.path == "/v3/customers/a-customer-id"
+    assert requests[0].headers["Authorization"] == f"Bearer {api_token.token}"
+    assert requests[0].headers["X-Api-Key"] == authorization.client_id
+
+
+def test_create_preview_order(
+    async_adobe_client_factory,
+    adobe_authorizations_file,
+    order,
+):
+    """
+    Tests the creation of a preview order through the async client.
+    """
+    authorization_uk = adobe_authorizations_file["authorizations"][0]["authorization_uk"]
+    payloads = []
+
+    def handler(request):
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, json={"orderType": ORDER_TYPE_PREVIEW})
+
+    client, _, _ = async_adobe_client_factory(handler)
+
+    preview = asyncio.run(
+        client.create_preview_order(
+            authorization_uk,
+            "a-customer",
+            order["id"],
+            order["lines"],
+        ),
+    )
+
+    assert preview == {"orderType": ORDER_TYPE_PREVIEW}
+    assert payloads == [
+        {
+            "externalReferenceId": order["id"],
+            "currencyCode": "USD",
+            "orderType": ORDER_TYPE_PREVIEW,
+            "lineItems": [
+                {
+                    "extLineItemNumber": to_adobe_line_id(order["lines"][0]["id"]),
+                    "offerId": "65304578CA01A12",
+                    "quantity": order["lines"][0]["quantity"],
+                },
+            ],
+        },
+    ]
+
+
+def test_get_customer_orders_index(
+    async_adobe_client_factory,
+    adobe_authorizations_file,
+    adobe_order_factory,
+):
+    """
+    Tests the async client follows the pages of the orders of a customer
+    to build its index.
+    """
+    authorization_uk = adobe_authorizations_file["authorizations"][0]["authorization_uk"]
+    new_orders = [
+        adobe_order_factory(ORDER_TYPE_NEW, status=STATUS_PROCESSED, order_id="P01"),
+        adobe_order_factory(ORDER_TYPE_NEW, status=STATUS_PROCESSED, order_id="P02"),
+    ]
+
+    def handler(request):
+        if request.url.params["order-type"] == ORDER_TYPE_RETURN:
+            assert request.url.params.get_list("status") == [STATUS_PROCESSED, STATUS_PENDING]
+            return httpx.Response(200, json={"items": [], "links": {}})
+        if request.url.params["offset"] == "0":
+            return httpx.Response(
+                200,
+                json={
+                    "items": new_orders[:1],
+                    "links": {
+                        "next": {
+                            "uri": "/v3/customers/a-customer/orders?order-type=NEW&offset=1",
+                        },
+                    },
+                },
+            )
+        return httpx.Response(200, json={"items": new_orders[1:], "links": {}})
+
+    client, _, _ = async_adobe_client_factory(handler)
+
+    orders_index = asyncio.run(
+        client.get_customer_orders_index(authorization_uk, "a-customer"),
+    )
+
+    assert orders_index.new_orders == new_orders
+
+
+def test_throttled_request_is_retried(
+    mocker,
+    settings,
+    async_adobe_client_factory,
+    adobe_authorizations_file,
+):
+    """
+    Tests the async client backs off and retries the requests throttled by Adobe.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "ADOBE_THROTTLING_MAX_RETRIES": "1",
+    }
+    mocked_sleep = mocker.patch(
+        "adobe_vipm.adobe.async_client.asyncio.sleep",
+        new=mocker.AsyncMock(),
+    )
+    authorization_uk = adobe_authorizations_file["authorizations"][0]["authorization_uk"]
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(200, json={"customerId": "a-customer-id"}),
+    ]
+
+    def handler(request):
+        return responses.pop(0)
+
+    client, _, _ = async_adobe_client_factory(handler)
+
+    assert asyncio.run(client.get_customer(authorization_uk, "a-customer-id")) == {
+        "customerId": "a-customer-id",
+    }
+    assert 2 <= mocked_sleep.await_args.args[0] <= 2.4
+
+
+@pytest.mark.parametrize("status_code", [502, 503, 504])
+def test_server_error_is_retried(
+    mocker,
+    settings,
+    async_adobe_client_factory,
+    adobe_authorizations_file,
+    status_code,
+):
+    """
+    Tests the async client retries the idempotent requests failed with a
+    server error like the synchronous sessions do.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "ADOBE_HTTP_MAX_RETRIES": "2",
+    }
+    mocked_sleep = mocker.patch(
+        "adobe_vipm.adobe.async_client.asyncio.sleep",
+        new=mocker.AsyncMock(),
+    )
+    authorization_uk = adobe_authorizations_file["authorizations"][0]["authorization_uk"]
+    responses = [
+        httpx.Response(status_code),
+        httpx.Response(status_code),
+        httpx.Response(200, json={"customerId": "a-customer-id"}),
+    ]
+
+    def handler(request):
+        return responses.pop(0)
+
+    client, _, _ = async_adobe_client_factory(handler)
+
+    assert asyncio.run(client.get_customer(authorization_uk, "a-customer-id")) == {
+        "customerId": "a-customer-id",
+    }
+    assert [call.args[0] for call in mocked_sleep.await_args_list] == [0.1, 0.2]
+
+
+def test_server_error_not_retried(
+    settings,
+    async_adobe_client_factory,
+    adobe_authorizations_file,
+):
+    """
+    Tests the async client neither retries the requests that are not idempotent
+    nor the idempotent ones once the retries are exhausted.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "ADOBE_HTTP_MAX_RETRIES": "0",
+    }
+    authorization_uk = adobe_authorizations_file["authorizations"][0]["authorization_uk"]
+    requests = []
+
+    def handler(request):
+        requests.append(request.method)
+        return httpx.Response(503, content=b"unavailable")
+
+    client, _, _ = async_adobe_client_factory(handler)
+
+    with pytest.raises(AdobeError):
+        asyncio.run(client.get_customer(authorization_uk, "a-customer-id"))
+    with pytest.raises(AdobeError):
+        asyncio.run(client.create_preview_renewal(authorization_uk, "a-customer-id"))
+    assert requests == ["GET", "POST"]
+
+
+def test_aclose_resets_loop_bound_state(async_adobe_client_factory, adobe_authorizations_file):
+    """
+    Tests the client can be used again from another event loop once closed.
+    """
+    authorization_uk = adobe_authorizations_file["authorizations"][0]["authorization_uk"]
+
+    def handler(request):
+        return httpx.Response(200, json={"customerId": "a-customer-id"})
+
+    client, _, _ = async_adobe_client_factory(handler)
+
+    async def run():
+        customer = await client.get_customer(authorization_uk, "a-customer-id")
+        await client.aclose()
+        return customer
+
+    for _ in range(2):
+        assert asyncio.run(run()) == {"customerId": "a-customer-id"}
+        assert client._clients == {}
+        assert client._semaphores == {}
+
+
+def test_http_errors_are_wrapped(
+    settings,
+    async_adobe_client_factory,
+    adobe_authorizations_file,
+    adobe_api_error_factory,
+):
+    """
+    Tests the errors returned by Adobe are raised as AdobeError.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "ADOBE_THROTTLING_MAX_RETRIES": "0",
+    }
+    authorization_uk = adobe_authorizations_file["authorizations"][0]["authorization_uk"]
+
+    def handler(request):
+        if request.url.path.endswith("not-found"):
+            return httpx.Response(
+                404,
+                json=adobe_api_error_factory("1004", "Customer not found"),
+            )
+        return httpx.Response(429, content=b'{"error_code": "429050"}')
+
+    client, _, _ = async_adobe_client_factory(handler)
+
+    with pytest.raises(AdobeAPIError) as cv:
+        asyncio.run(client.get_customer(authorization_uk, "not-found"))
+    assert cv.value.code == "1004"
+
+    with pytest.raises(AdobeError) as cv:
+        asyncio.run(client.get_customer(authorization_uk, "a-customer-id"))
+    assert str(cv.value) == '429 - {"error_code": "429050"}'
+
+
+def test_expired_token_is_refreshed(
+    mocker,
+    async_adobe_client_factory,
+    adobe_authorizations_file,
+):
+    """
+    Tests the async client refreshes an expired token through
+    the token manager shared with the AdobeClient.
+    """
+    authorization_uk = adobe_authorizations_file["authorizations"][0]["authorization_uk"]
+    headers = []
+
+    def handler(request):
+        headers.append(request.headers)
+        return httpx.Response(200, json={})
+
+    client, authorization, _ = async_adobe_client_factory(handler)
+    client._token_manager.tokens[authorization] = APIToken(
+        "expired-token",
+        expires=datetime.now() - timedelta(seconds=1),
+    )
+    new_token = APIToken("new-token", expires=datetime.now() + timedelta(seconds=3600))
+    mocked_fetch = mocker.patch.object(
+        client._token_manager,
+        "_fetch_token",
+        return_value=new_token,
+    )
+
+    asyncio.run(client.get_subscriptions(authorization_uk, "a-customer-id"))
+
+    mocked_fetch.assert_called_once_with(authorization)
+    assert headers[0]["Authorization"] == "Bearer new-token"
+
+
+def test_cancelled_half_open_probe(
+    mocker,
+    settings,
+    async_adobe_client_factory,
+    adobe_authorizations_file,
+):
+    """
+    Tests a half-open probe cancelled while in flight (or while waiting for
+    the concurrency cap) gives its slot back to the circuit breaker.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "ADOBE_MAX_CONCURRENT_REQUESTS": "1",
+        "CIRCUIT_BREAKER_FAILURE_THRESHOLD": "1",
+        "CIRCUIT_BREAKER_RECOVERY_SECS": "30",
+    }
+    mocked_monotonic = mocker.patch(
+        "adobe_vipm.circuit_breaker.time.monotonic",
+        return_value=100.0,
+    )
+    authorization_uk = adobe_authorizations_file["authorizations"][0]["authorization_uk"]
+    circuit_breaker = get_circuit_breaker("adobe_customers")
+    circuit_breaker.record_failure()
+    mocked_monotonic.return_value = 130.0
+    started = asyncio.Event()
+
+    async def handler(request):
+        if request.url.path.endswith("slow"):
+            started.set()
+            await asyncio.sleep(10)
+        return httpx.Response(200, json={"customerId": "a-customer-id"})
+
+    client, _, _ = async_adobe_client_factory(handler)
+
+    async def run():
+        probe = asyncio.ensure_future(client.get_customer(authorization_uk, "slow"))
+        await started.wait()
+        waiting = asyncio.ensure_future(client.get_customer(authorization_uk, "waiting"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        probe.cancel()
+        await asyncio.gather(probe, waiting, return_exceptions=True)
+        return await client.get_customer(authorization_uk, "a-customer-id")
+
+    assert asyncio.run(run()) == {"customerId": "a-customer-id"}
+    assert circuit_breaker.state == STATE_CLOSED
+
+
+def test_shares_rate_limiter_with_adobe_client(
+    mocker,
+    async_adobe_client_factory,
+    adobe_authorizations_file,
+):
+    """
+    Tests the async client paces its requests through the rate limiter of
+    the session of the AdobeClient for the same Authorization.
+    """
+    authorization_uk = adobe_authorizations_file["authorizations"][0]["authorization_uk"]
+
+    def handler(request):
+        return httpx.Response(200, json={"items": []})
+
+    client, authorization, _ = async_adobe_client_factory(handler)
+    rate_limiter = client._adobe_client._sessions.get_rate_limiter(authorization)
+    mocked_reserve = mocker.patch.object(rate_limiter, "reserve", return_value=0)
+
+    asyncio.run(client.get_subscriptions(authorization_uk, "a-customer-id"))
+
+    assert rate_limiter is client._adobe_client._get_session(authorization).rate_limiter
+    mocked_reserve.assert_called_once()
+
+
+def test_shares_cache_with_adobe_client(
+    async_adobe_client_factory,
+    adobe_authorizations_file,
+):
+    """
+    Tests customers and subscriptions are read through the cache of the AdobeClient
+    and that the updates of the async client invalidate it.
+    """
+    authorization_uk = adobe_authorizations_file["authorizations"][0]["authorization_uk"]
+    requests = []
+
+    def handler(request):
+        requests.append((request.method, request.url.path))
+        return httpx.Response(200, json={"subscriptionId": "a-sub-id"})
+
+    client, _, _ = async_adobe_client_factory(handler)
+
+    async def run():
+        await client.get_subscription(authorization_uk, "a-customer-id", "a-sub-id")
+        await client.get_subscription(authorization_uk, "a-customer-id", "a-sub-id")
+        await client.update_subscription(
+            authorization_uk, "a-customer-id", "a-sub-id", quantity=2,
+        )
+        await client.get_subscription(authorization_uk, "a-customer-id", "a-sub-id")
+
+    asyncio.run(run())
+
+    path = "/v3/customers/a-customer-id/subscriptions/a-sub-id"
+    assert requests == [("GET", path), ("PATCH", path), ("GET", path)]
+    assert client._adobe_client.get_cache_stats()["hits"] == 1
+    assert client._adobe_client.get_subscription(
+        authorization_uk, "a-customer-id", "a-sub-id",
+    ) == {"subscriptionId": "a-sub-id"}
+    assert len(requests) == 3
+
+
+def test_identical_get_requests_are_coalesced(
+    async_adobe_client_factory,
+    adobe_authorizations_file,
+):
+    """
+    Tests concurrent identical GET requests share a single network request
+    and are counted in the coalescing stats of the AdobeClient.
+    """
+    authorization_uk = adobe_authorizations_file["authorizations"][0]["authorization_uk"]
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"items": []})
+
+    client, _, _ = async_adobe_client_factory(handler)
+
+    async def run():
+        return await asyncio.gather(
+            client.get_subscriptions(authorization_uk, "a-customer-id"),
+            client.get_subscriptions(authorization_uk, "a-customer-id"),
+        )
+
+    assert asyncio.run(run()) == [{"items": []}, {"items": []}]
+    assert len(requests) == 1
+    assert client._adobe_client.get_coalescing_stats() == {"calls": 2, "coalesced": 1}
+
+
+def test_get_async_adobe_client(mocker):
+    """
+    Test AsyncAdobeClient is cached per process and bound to the AdobeClient.
+    """
+    mocked_adobe_client = mocker.MagicMock()
+    mocker.patch(
+        "adobe_vipm.adobe.async_client.get_adobe_client",
+        return_value=mocked_adobe_client,
+    )
+    mocker.patch("adobe_vipm.adobe.async_client._ASYNC_ADOBE_CLIENT", None)
+
+    client = get_async_adobe_client()
+
+    assert get_async_adobe_client() is client
+    assert client._adobe_client == mocked_adobe_client
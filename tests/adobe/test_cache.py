@@ -0,0 +1,147 @@
+import threading
+
+import pytest
+
+from adobe_vipm.adobe.cache import TTLCache
+
+
+@pytest.fixture()
+def mocked_monotonic(mocker):
+    return mocker.patch("adobe_vipm.adobe.cache.time.monotonic", return_value=100.0)
+
+
+def test_get_or_load(mocker, mocked_monotonic):
+    """
+    Test that the value is loaded once and a copy of it is returned.
+    """
+    cache = TTLCache(ttl=10, maxsize=10)
+    load = mocker.MagicMock(return_value={"a": {"b": "c"}})
+
+    value = cache.get_or_load(("auth", "customer"), load)
+    value["a"]["b"] = "modified"
+
+    assert cache.get_or_load(("auth", "customer"), load) == {"a": {"b": "c"}}
+    load.assert_called_once()
+    assert cache.stats.to_dict() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "invalidations": 0,
+    }
+
+
+def test_get_or_load_expired(mocker, mocked_monotonic):
+    """
+    Test that an expired value is loaded again.
+    """
+    cache = TTLCache(ttl=10, maxsize=10)
+    load = mocker.MagicMock(side_effect=["old", "new"])
+
+    assert cache.get_or_load(("auth", "customer"), load) == "old"
+    mocked_monotonic.return_value = 110.0
+    assert cache.get_or_load(("auth", "customer"), load) == "new"
+
+
+def test_get(mocked_monotonic):
+    """
+    Test that a copy of the stored value is returned until it expires.
+    """
+    cache = TTLCache(ttl=10, maxsize=10)
+
+    assert cache.get(("product", "sku")) is None
+    cache.set(("product", "sku"), {"id": "ITM-1"})
+    cache.get(("product", "sku"))["id"] = "modified"
+
+    assert cache.get(("product", "sku")) == {"id": "ITM-1"}
+    mocked_monotonic.return_value = 110.0
+    assert cache.get(("product", "sku")) is None
+    assert cache.stats.hits == 2
+    assert cache.stats.misses == 2
+
+
+def test_get_or_load_error(mocker, mocked_monotonic):
+    """
+    Test that nothing is cached if the value cannot be loaded.
+    """
+    cache = TTLCache(ttl=10, maxsize=10)
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load(("auth", "customer"), mocker.MagicMock(side_effect=RuntimeError()))
+
+    assert cache.get_or_load(("auth", "customer"), lambda: "value") == "value"
+
+
+def test_lru_eviction(mocked_monotonic):
+    """
+    Test that the least recently used entry is evicted when the cache is full.
+    """
+    cache = TTLCache(ttl=10, maxsize=2)
+    cache.set(("a",), 1)
+    cache.set(("b",), 2)
+    cache.get_or_load(("a",), lambda: 0)
+    cache.set(("c",), 3)
+
+    assert cache.get_or_load(("a",), lambda: 0) == 1
+    assert cache.get_or_load(("b",), lambda: 0) == 0
+    assert cache.stats.evictions == 2
+
+
+def test_invalidate(mocked_monotonic):
+    """
+    Test that all the entries which key starts with the given items are invalidated.
+    """
+    cache = TTLCache(ttl=10, maxsize=10)
+    cache.set(("auth", "customer"), "customer")
+    cache.set(("auth", "customer", "sub-1"), "subscription")
+    cache.set(("auth", "another-customer"), "another customer")
+
+    cache.invalidate("auth", "customer")
+
+    assert cache.get_or_load(("auth", "customer"), lambda: None) is None
+    assert cache.get_or_load(("auth", "customer", "sub-1"), lambda: None) is None
+    assert cache.get_or_load(("auth", "another-customer"), lambda: None) == "another customer"
+    assert cache.stats.invalidations == 2
+
+
+def test_invalidate_while_loading(mocked_monotonic):
+    """
+    Test that a value being loaded while its key is invalidated is returned
+    to the caller but not stored.
+    """
+    cache = TTLCache(ttl=10, maxsize=10)
+    loading = threading.Event()
+    invalidated = threading.Event()
+    values = []
+
+    def load():
+        loading.set()
+        assert invalidated.wait(timeout=5)
+        return "stale"
+
+    thread = threading.Thread(
+        target=lambda: values.append(cache.get_or_load(("auth", "customer", "sub-1"), load)),
+    )
+    thread.start()
+    assert loading.wait(timeout=5)
+    cache.invalidate("auth", "customer")
+    invalidated.set()
+    thread.join(timeout=5)
+
+    assert values == ["stale"]
+    assert cache.get(("auth", "customer", "sub-1")) is None
+    assert cache.get_or_load(("auth", "customer", "sub-1"), lambda: "fresh") == "fresh"
+    assert cache.get(("auth", "customer", "sub-1")) == "fresh"
+
+
+def test_disabled(mocker):
+    """
+    Test that a TTL of zero disables the cache.
+    """
+    cache = TTLCache(ttl=0, maxsize=10)
+    load = mocker.MagicMock(return_value="value")
+
+    cache.get_or_load(("auth", "customer"), load)
+    cache.get_or_load(("auth", "customer"), load)
+
+    assert load.call_count == 2
+    assert cache.stats.to_dict()["hits"] == 0
@@ -1,5 +1,7 @@
 import copy
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from hashlib import sha256
 from urllib.parse import urljoin
@@ -775,40 +777,19 @@ def test_search_new_and_returned_orders_by_sku_line_number(
 
     return_order_3 = adobe_order_factory(
         ORDER_TYPE_RETURN,
-        order_id="prev-returned-order",
-        reference_order_id="prev-order-already-returned",
-        external_id="ORD-4444-1",
+        order_id="another-line-returned-order",
+        reference_order_id="another-order-to-return",
+        external_id="ORD-3333-2",
         status=STATUS_PROCESSED,
     )
 
-    requests_mocker.get(
-        urljoin(
-            settings.EXTENSION_CONFIG["ADOBE_API_BASE_URL"],
-            f"/v3/customers/{customer_id}/orders",
-        ),
-        status=200,
-        json={
-            "totalCount": 3,
-            "items": [new_order_0, new_order_1, new_order_2, new_order_3, new_order_4],
-            "links": {},
+    headers_matcher = matchers.header_matcher(
+        {
+            "X-Api-Key": authorization.client_id,
+            "Authorization": f"Bearer {api_token.token}",
+            "Accept": "application/json",
+            "Content-Type": "application/json",
         },
-        match=[
-            matchers.header_matcher(
-                {
-                    "X-Api-Key": authorization.client_id,
-                    "Authorization": f"Bearer {api_token.token}",
-                    "Accept": "application/json",
-                    "Content-Type": "application/json",
-                },
-            ),
-            matchers.query_param_matcher(
-                {
-                    "order-type": ORDER_TYPE_NEW,
-                    "limit": 100,
-                    "offset": 0,
-                },
-            ),
-        ],
     )
 
     requests_mocker.get(
@@ -818,25 +799,20 @@ def test_search_new_and_returned_orders_by_sku_line_number(
         ),
         status=200,
         json={
-            "totalCount": 1,
-            "items": [return_order_1],
+            "totalCount": 5,
+            "items": [new_order_0, new_order_1, new_order_2],
+            "links": {
+                "next": {
+                    "uri": f"/v3/customers/{customer_id}/orders?order-type=NEW&limit=100&offset=3",
+                },
+            },
         },
         match=[
-            matchers.header_matcher(
-                {
-                    "X-Api-Key": authorization.client_id,
-                    "Authorization": f"Bearer {api_token.token}",
-                    "Accept": "application/json",
-                    "Content-Type": "application/json",
-                },
-            ),
+            headers_matcher,
             matchers.query_param_matcher(
                 {
-                    "reference-order-id": new_order_1["orderId"],
-                    "offer-id": new_order_1["lineItems"][0]["offerId"],
-                    "order-type": ORDER_TYPE_RETURN,
-                    "status": [STATUS_PROCESSED, STATUS_PENDING],
-                    "limit": 1,
+                    "order-type": ORDER_TYPE_NEW,
+                    "limit": 100,
                     "offset": 0,
                 },
             ),
@@ -850,26 +826,17 @@ def test_search_new_and_returned_orders_by_sku_line_number(
         ),
         status=200,
         json={
-            "totalCount": 0,
-            "items": [],
+            "totalCount": 5,
+            "items": [new_order_3, new_order_4],
+            "links": {},
         },
         match=[
-            matchers.header_matcher(
-                {
-                    "X-Api-Key": authorization.client_id,
-                    "Authorization": f"Bearer {api_token.token}",
-                    "Accept": "application/json",
-                    "Content-Type": "application/json",
-                },
-            ),
+            headers_matcher,
             matchers.query_param_matcher(
                 {
-                    "reference-order-id": new_order_2["orderId"],
-                    "offer-id": new_order_2["lineItems"][0]["offerId"],
-                    "order-type": ORDER_TYPE_RETURN,
-                    "status": [STATUS_PROCESSED, STATUS_PENDING],
-                    "limit": 1,
-                    "offset": 0,
+                    "order-type": ORDER_TYPE_NEW,
+                    "limit": 100,
+                    "offset": 3,
                 },
             ),
         ],
@@ -882,25 +849,17 @@ def test_search_new_and_returned_orders_by_sku_line_number(
         ),
         status=200,
         json={
-            "totalCount": 1,
-            "items": [return_order_3],
+            "totalCount": 2,
+            "items": [return_order_1, return_order_3],
+            "links": {},
         },
         match=[
-            matchers.header_matcher(
-                {
-                    "X-Api-Key": authorization.client_id,
-                    "Authorization": f"Bearer {api_token.token}",
-                    "Accept": "application/json",
-                    "Content-Type": "application/json",
-                },
-            ),
+            headers_matcher,
             matchers.query_param_matcher(
                 {
-                    "reference-order-id": new_order_3["orderId"],
-                    "offer-id": new_order_3["lineItems"][0]["offerId"],
                     "order-type": ORDER_TYPE_RETURN,
                     "status": [STATUS_PROCESSED, STATUS_PENDING],
-                    "limit": 1,
+                    "limit": 100,
                     "offset": 0,
                 },
             ),
@@ -919,6 +878,7 @@ def test_search_new_and_returned_orders_by_sku_line_number(
         (new_order_2, new_order_2["lineItems"][0], None),
         (new_order_3, new_order_3["lineItems"][0], None),
     ]
+    assert len(requests_mocker.calls) == 3
 
 
 def test_search_new_and_returned_orders_by_sku_line_number_not_found(
@@ -956,13 +916,6 @@ def test_search_new_and_returned_orders_by_sku_line_number_not_found(
                     "Content-Type": "application/json",
                 },
             ),
-            matchers.query_param_matcher(
-                {
-                    "order-type": ORDER_TYPE_NEW,
-                    "limit": 100,
-                    "offset": 0,
-                },
-            ),
         ],
     )
 
@@ -976,6 +929,36 @@ def test_search_new_and_returned_orders_by_sku_line_number_not_found(
     assert results == []
 
 
+def test_get_customer_orders_index_error(
+    requests_mocker,
+    settings,
+    adobe_client_factory,
+    adobe_authorizations_file,
+    adobe_api_error_factory,
+):
+    """
+    Tests that an error retrieving the orders of a customer is wrapped.
+    """
+    authorization_uk = adobe_authorizations_file["authorizations"][0][
+        "authorization_uk"
+    ]
+    client, _, _ = adobe_client_factory()
+
+    requests_mocker.get(
+        urljoin(
+            settings.EXTENSION_CONFIG["ADOBE_API_BASE_URL"],
+            "/v3/customers/a-customer/orders",
+        ),
+        status=500,
+        json=adobe_api_error_factory("500", "Internal Server Error"),
+    )
+
+    with pytest.raises(AdobeError) as cv:
+        client.get_customer_orders_index(authorization_uk, "a-customer")
+
+    assert cv.value.code == "500"
+
+
 def test_create_return_order(
     mocker,
     settings,
@@ -1488,7 +1471,7 @@ def test_get_auth_token(
         assert isinstance(token, APIToken)
         assert token.token == "an-access-token"
         assert token.expires == datetime.now() + timedelta(seconds=83000 - 180)
-        assert client._token_cache[authorization] == token
+        assert client._token_manager.tokens[authorization] == token
 
 
 def test_get_auth_token_error(
@@ -1609,6 +1592,54 @@ def test_get_customer(
     }
 
 
+def test_get_customer_cached(
+    requests_mocker, settings, adobe_client_factory, adobe_authorizations_file
+):
+    """
+    Tests that the customer is retrieved from the cache until
+    it is modified through the client.
+    """
+    authorization_uk = adobe_authorizations_file["authorizations"][0][
+        "authorization_uk"
+    ]
+    customer_id = "a-customer-id"
+    customer_url = urljoin(
+        settings.EXTENSION_CONFIG["ADOBE_API_BASE_URL"],
+        f"/v3/customers/{customer_id}",
+    )
+
+    client, _, _ = adobe_client_factory()
+
+    requests_mocker.get(
+        customer_url,
+        status=200,
+        json={"companyProfile": {"companyName": "A company"}},
+    )
+    requests_mocker.patch(customer_url, status=200, json={})
+
+    customer = client.get_customer(authorization_uk, customer_id)
+    customer["companyProfile"]["companyName"] = "Modified"
+    assert client.get_customer(authorization_uk, customer_id) == {
+        "companyProfile": {"companyName": "A company"},
+    }
+    assert len(requests_mocker.calls) == 1
+
+    client.create_3yc_request(
+        authorization_uk,
+        customer_id,
+        {"3YCLicenses": "10", "3YCConsumables": ""},
+    )
+    client.get_customer(authorization_uk, customer_id)
+
+    assert [call.request.method for call in requests_mocker.calls] == ["GET", "PATCH", "GET"]
+    assert client.get_cache_stats() == {
+        "hits": 2,
+        "misses": 2,
+        "evictions": 0,
+        "invalidations": 1,
+    }
+
+
 def test_get_customer_not_found(
     requests_mocker,
     settings,
@@ -1917,3 +1948,53 @@ def test_create_3yc_request(
         is_recommitment=is_recommitment,
     )
     assert customer_id == {'customerId': 'a-customer-id'}
+
+
+def test_get_subscriptions_coalesced(
+    mocker,
+    requests_mocker,
+    settings,
+    adobe_client_factory,
+    adobe_authorizations_file,
+):
+    """
+    Tests that concurrent identical GET requests share a single call to Adobe.
+    """
+    authorization_uk = adobe_authorizations_file["authorizations"][0][
+        "authorization_uk"
+    ]
+    client, _, _ = adobe_client_factory()
+    barrier = threading.Barrier(2)
+    original_do = client._single_flight.do
+
+    def _do(key, call):
+        def _call():
+            # wait for the follower to join before performing the request
+            while client._single_flight.stats.calls < 2:
+                pass
+            return call()
+
+        barrier.wait(5)
+        return original_do(key, _call)
+
+    mocker.patch.object(client._single_flight, "do", side_effect=_do)
+    requests_mocker.get(
+        urljoin(
+            settings.EXTENSION_CONFIG["ADOBE_API_BASE_URL"],
+            "/v3/customers/a-customer-id/subscriptions",
+        ),
+        status=200,
+        json={"items": []},
+    )
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(
+            executor.map(
+                lambda _: client.get_subscriptions(authorization_uk, "a-customer-id"),
+                range(2),
+            ),
+        )
+
+    assert results == [{"items": []}, {"items": []}]
+    assert len(requests_mocker.calls) == 1
+    assert client.get_coalescing_stats() == {"calls": 2, "coalesced": 1}
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from adobe_vipm.adobe.coalescing import AsyncSingleFlight, SingleFlight
+
+
+def test_do_coalesces_concurrent_calls():
+    """
+    Test that concurrent calls with the same key share a single call
+    and each caller gets its own copy of the result.
+    """
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"a": {"b": "c"}}
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        leader = executor.submit(single_flight.do, ("auth", "/path"), call)
+        started.wait(5)
+        followers = [
+            executor.submit(single_flight.do, ("auth", "/path"), call) for _ in range(2)
+        ]
+        while single_flight.stats.calls < 3:
+            pass
+        release.set()
+        results = [leader.result()] + [follower.result() for follower in followers]
+
+    results[0]["a"]["b"] = "modified"
+    assert len(calls) == 1
+    assert results[1:] == [{"a": {"b": "c"}}, {"a": {"b": "c"}}]
+    assert single_flight.stats.to_dict() == {"calls": 3, "coalesced": 2}
+
+
+def test_do_different_keys(mocker):
+    """
+    Test that calls with different keys are not coalesced and
+    that a key can be called again once the call completed.
+    """
+    single_flight = SingleFlight()
+    call = mocker.MagicMock(return_value={})
+
+    single_flight.do(("auth", "/path1"), call)
+    single_flight.do(("auth", "/path2"), call)
+    single_flight.do(("auth", "/path1"), call)
+
+    assert call.call_count == 3
+    assert single_flight.stats.to_dict() == {"calls": 3, "coalesced": 0}
+
+
+def test_do_error_is_shared():
+    """
+    Test that the callers waiting for a call in flight get the exception it raised.
+    """
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def call():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight.do, ("auth", "/path"), call)
+        started.wait(5)
+        follower = executor.submit(single_flight.do, ("auth", "/path"), call)
+        while single_flight.stats.calls < 2:
+            pass
+        release.set()
+
+        with pytest.raises(RuntimeError):
+            leader.result()
+        with pytest.raises(RuntimeError):
+            follower.result()
+
+    assert single_flight.stats.coalesced == 1
+
+
+def test_async_do_coalesces_concurrent_calls():
+    """
+    Test that concurrent coroutines with the same key share a single call,
+    each caller gets its own copy of the result and the stats are shared.
+    """
+    single_flight = SingleFlight()
+    async_single_flight = AsyncSingleFlight(stats=single_flight.stats)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"a": {"b": "c"}}
+
+    async def run():
+        return await asyncio.gather(
+            *(async_single_flight.do(("auth", "/path"), call) for _ in range(3)),
+        )
+
+    results = asyncio.run(run())
+
+    results[0]["a"]["b"] = "modified"
+    assert len(calls) == 1
+    assert results[1:] == [{"a": {"b": "c"}}, {"a": {"b": "c"}}]
+    assert single_flight.stats.to_dict() == {"calls": 3, "coalesced": 2}
+
+
+def test_async_do_error_is_shared():
+    """
+    Test that the coroutines waiting for a call in flight get the exception it raised.
+    """
+    single_flight = AsyncSingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        return await asyncio.gather(
+            *(single_flight.do(("auth", "/path"), call) for _ in range(2)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert single_flight._inflight == {}
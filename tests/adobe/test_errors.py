@@ -1,7 +1,15 @@
+import asyncio
+
+import httpx
 import pytest
 from requests import HTTPError, JSONDecodeError
 
-from adobe_vipm.adobe.errors import AdobeAPIError, AdobeError, wrap_http_error
+from adobe_vipm.adobe.errors import (
+    AdobeAPIError,
+    AdobeError,
+    wrap_async_http_error,
+    wrap_http_error,
+)
 
 
 def test_simple_error(adobe_api_error_factory):
@@ -65,3 +73,38 @@ def test_wrap_http_error_json_decode_error(mocker):
         wrapped_func()
 
     assert str(cv.value) == "500 - Internal Server Error"
+
+
+def test_wrap_http_error_unexpected_payload(mocker):
+    def func():
+        response = mocker.MagicMock()
+        response.status_code = 429
+        response.content = b'{"error_code": "429050"}'
+        response.json.return_value = {"error_code": "429050"}
+        raise HTTPError(response=response)
+
+    wrapped_func = wrap_http_error(func)
+
+    with pytest.raises(AdobeError) as cv:
+        wrapped_func()
+
+    assert str(cv.value) == '429 - {"error_code": "429050"}'
+
+
+def test_wrap_async_http_error(adobe_api_error_factory):
+    async def func():
+        request = httpx.Request("GET", "https://adobe.test/v3/customers")
+        response = httpx.Response(
+            400,
+            json=adobe_api_error_factory("5678", "error message"),
+            request=request,
+        )
+        response.raise_for_status()
+
+    wrapped_func = wrap_async_http_error(func)
+
+    with pytest.raises(AdobeAPIError) as cv:
+        asyncio.run(wrapped_func())
+
+    assert cv.value.status_code == 400
+    assert str(cv.value) == "5678 - error message"
@@ -0,0 +1,134 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from adobe_vipm.adobe.constants import (
+    ORDER_TYPE_NEW,
+    ORDER_TYPE_RETURN,
+    STATUS_ORDER_CANCELLED,
+    STATUS_PENDING,
+    STATUS_PROCESSED,
+)
+from adobe_vipm.adobe.orders import CustomerOrdersIndex
+
+
+def test_search_by_sku_line_number(adobe_order_factory, adobe_items_factory):
+    """
+    Test that the NEW orders containing the SKU are returned together with the
+    item for the line number and the RETURN order for such line.
+    """
+    order_1 = adobe_order_factory(
+        ORDER_TYPE_NEW,
+        order_id="order-1",
+        external_id="ORD-1111",
+        status=STATUS_PROCESSED,
+        items=adobe_items_factory(line_number=1, offer_id="65304578CA01A12")
+        + adobe_items_factory(line_number=2, offer_id="77777777CA01A12"),
+    )
+    order_2 = adobe_order_factory(
+        ORDER_TYPE_NEW,
+        order_id="order-2",
+        external_id="ORD-2222",
+        status=STATUS_PROCESSED,
+        items=adobe_items_factory(line_number=2, offer_id="77777777CA01A12"),
+    )
+    order_3 = adobe_order_factory(
+        ORDER_TYPE_NEW,
+        order_id="order-3",
+        external_id="ORD-3333",
+        status=STATUS_PENDING,
+    )
+    return_order = adobe_order_factory(
+        ORDER_TYPE_RETURN,
+        order_id="return-1",
+        reference_order_id="order-1",
+        external_id="ORD-1111-2",
+        status=STATUS_PENDING,
+        items=adobe_items_factory(line_number=2, offer_id="77777777CA01A12"),
+    )
+    index = CustomerOrdersIndex([order_1, order_2, order_3], [return_order])
+
+    assert index.search_new_and_returned_orders_by_sku_line_number(
+        "77777777CA",
+        "ALI-1234-1234-1234-0002",
+    ) == [
+        (order_1, order_1["lineItems"][1], return_order),
+        (order_2, order_2["lineItems"][0], None),
+    ]
+    assert index.search_new_and_returned_orders_by_sku_line_number(
+        "65304578CA",
+        "ALI-1234-1234-1234-0001",
+    ) == [
+        (order_1, order_1["lineItems"][0], None),
+    ]
+    assert index.get_return_orders("order-1") == [return_order]
+    assert index.get_return_orders("order-2") == []
+
+
+def test_add_return_order(adobe_order_factory):
+    """
+    Test that a RETURN order added to the index is found by the following lookups
+    while those neither processed nor pending are ignored.
+    """
+    order = adobe_order_factory(
+        ORDER_TYPE_NEW,
+        order_id="order-1",
+        external_id="ORD-1111",
+        status=STATUS_PROCESSED,
+    )
+    cancelled_return_order = adobe_order_factory(
+        ORDER_TYPE_RETURN,
+        order_id="return-0",
+        reference_order_id="order-1",
+        external_id="ORD-1111-1",
+        status=STATUS_ORDER_CANCELLED,
+    )
+    return_order = adobe_order_factory(
+        ORDER_TYPE_RETURN,
+        order_id="return-1",
+        reference_order_id="order-1",
+        external_id="ORD-1111-1",
+        status=STATUS_PENDING,
+    )
+    index = CustomerOrdersIndex([order], [cancelled_return_order])
+
+    assert index.search_new_and_returned_orders_by_sku_line_number(
+        "65304578CA",
+        "ALI-1234-1234-1234-0001",
+    ) == [(order, order["lineItems"][0], None)]
+
+    index.add_return_order(return_order)
+
+    assert index.search_new_and_returned_orders_by_sku_line_number(
+        "65304578CA",
+        "ALI-1234-1234-1234-0001",
+    ) == [(order, order["lineItems"][0], return_order)]
+
+
+def test_add_return_order_concurrently(adobe_order_factory):
+    """
+    Test that the RETURN orders added by concurrent threads are all indexed.
+    """
+    index = CustomerOrdersIndex([], [])
+    return_orders = [
+        adobe_order_factory(
+            ORDER_TYPE_RETURN,
+            order_id=f"return-{idx}",
+            reference_order_id=f"order-{idx % 2}",
+            external_id=f"ORD-1111-{idx}",
+            status=STATUS_PENDING,
+        )
+        for idx in range(16)
+    ]
+    barrier = threading.Barrier(len(return_orders), timeout=5)
+
+    def add(return_order):
+        barrier.wait()
+        index.add_return_order(return_order)
+
+    with ThreadPoolExecutor(max_workers=len(return_orders)) as executor:
+        list(executor.map(add, return_orders))
+
+    assert sorted(o["orderId"] for o in index.get_return_orders("order-0")) == sorted(
+        f"return-{idx}" for idx in range(0, 16, 2)
+    )
+    assert len(index.get_return_orders("order-1")) == 8
@@ -0,0 +1,265 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from adobe_vipm.adobe.config import Config
+from adobe_vipm.adobe.sessions import (
+    AuthorizationSession,
+    PooledHTTPAdapter,
+    PoolStats,
+    SessionManager,
+    get_adobe_endpoint_family,
+)
+from adobe_vipm.circuit_breaker import CircuitOpenError
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"status": "ok"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture()
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_session_is_bound_to_authorization(
+    mock_adobe_config, adobe_authorizations_file
+):
+    """
+    Test that the same session is returned for the same authorization.
+    """
+    config = Config()
+    authorization = config.get_authorization(
+        adobe_authorizations_file["authorizations"][0]["authorization_uk"],
+    )
+    manager = SessionManager(config)
+
+    session = manager.get_session(authorization)
+
+    assert manager.get_session(authorization) is session
+    adapter = session.get_adapter("https://")
+    assert isinstance(adapter, PooledHTTPAdapter)
+    assert session.get_adapter("http://") is adapter
+    assert isinstance(session, AuthorizationSession)
+    assert session.max_concurrency == 10
+    assert adapter.timeout == (10.0, 60.0)
+    assert adapter._pool_maxsize == 10
+    assert adapter._pool_block is False
+    assert adapter.max_retries.total == 3
+
+
+def test_get_session_pool_settings(
+    mock_adobe_config, adobe_authorizations_file, settings
+):
+    """
+    Test that the pool size, the blocking mode and the transport retries
+    are taken from the extension settings.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "ADOBE_HTTP_POOL_SIZE": "24",
+        "ADOBE_HTTP_POOL_BLOCK": "true",
+        "ADOBE_HTTP_MAX_RETRIES": "5",
+    }
+    config = Config()
+    authorization = config.get_authorization(
+        adobe_authorizations_file["authorizations"][0]["authorization_uk"],
+    )
+
+    adapter = SessionManager(config).get_session(authorization).get_adapter("https://")
+
+    assert adapter._pool_maxsize == 24
+    assert adapter._pool_block is True
+    assert adapter.max_retries.total == 5
+
+
+def test_pool_stats_connection_reused(
+    mock_adobe_config, adobe_authorizations_file, http_server
+):
+    """
+    Test that subsequent calls reuse the same keep-alive connection.
+    """
+    config = Config()
+    authorization = config.get_authorization(
+        adobe_authorizations_file["authorizations"][0]["authorization_uk"],
+    )
+    manager = SessionManager(config)
+    session = manager.get_session(authorization)
+
+    for _ in range(3):
+        response = session.get(f"{http_server}/v3/customers")
+        assert response.json() == {"status": "ok"}
+
+    assert manager.get_stats() == {
+        authorization.authorization_uk: {
+            "created": 1,
+            "reused": 2,
+            "waited": 0,
+        },
+    }
+    manager.close()
+    assert manager.get_stats() == {}
+
+
+def test_pool_stats_waited():
+    """
+    Test the checkout counters of the pool stats.
+    """
+    stats = PoolStats()
+    stats.record_checkout(False)
+    stats.record_created()
+    stats.record_checkout(False)
+    stats.record_checkout(True)
+    stats.record_created()
+
+    assert stats.to_dict() == {"created": 2, "reused": 1, "waited": 1}
+
+
+def test_authorization_session_max_concurrency(mocker):
+    """
+    Test that no more than `max_concurrency` requests are in flight at the same time.
+    """
+    in_flight = []
+    max_in_flight = []
+    lock = threading.Lock()
+
+    def request(*args, **kwargs):
+        with lock:
+            in_flight.append(1)
+            max_in_flight.append(len(in_flight))
+        time.sleep(0.05)
+        with lock:
+            in_flight.pop()
+        return mocker.MagicMock(status_code=200)
+
+    mocker.patch("adobe_vipm.adobe.sessions.Session.request", side_effect=request)
+    session = AuthorizationSession(2)
+
+    threads = [
+        threading.Thread(target=session.get, args=("https://adobe.com",))
+        for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(max_in_flight) == 6
+    assert max(max_in_flight) == 2
+
+
+def test_authorization_session_throttled(
+    mocker, requests_mocker, mock_adobe_config, adobe_authorizations_file
+):
+    """
+    Test that a request throttled by Adobe is retried after the time requested
+    through the Retry-After header and it is accounted in the throttling stats.
+    """
+    mocked_sleep = mocker.patch("adobe_vipm.adobe.throttling.time.sleep")
+    mocker.patch("adobe_vipm.adobe.throttling.random.uniform", return_value=0)
+    config = Config()
+    authorization = config.get_authorization(
+        adobe_authorizations_file["authorizations"][0]["authorization_uk"],
+    )
+    manager = SessionManager(config)
+    requests_mocker.get(
+        "https://adobe.com/v3/customers",
+        status=429,
+        headers={"Retry-After": "2"},
+    )
+    requests_mocker.get("https://adobe.com/v3/customers", status=200, json={})
+
+    response = manager.get_session(authorization).get("https://adobe.com/v3/customers")
+
+    assert response.status_code == 200
+    assert len(requests_mocker.calls) == 2
+    assert mocked_sleep.call_args.args[0] == pytest.approx(2, abs=0.1)
+    stats = manager.get_throttling_stats()[authorization.authorization_uk]
+    assert stats["requests"] == 2
+    assert stats["throttled"] == 1
+
+
+def test_authorization_session_throttled_max_retries(
+    mocker, requests_mocker, settings, mock_adobe_config, adobe_authorizations_file
+):
+    """
+    Test that the 429 response is returned once the retries are exhausted.
+    """
+    mocker.patch("adobe_vipm.adobe.throttling.time.sleep")
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "ADOBE_THROTTLING_MAX_RETRIES": "2",
+    }
+    config = Config()
+    authorization = config.get_authorization(
+        adobe_authorizations_file["authorizations"][0]["authorization_uk"],
+    )
+    requests_mocker.get("https://adobe.com/v3/customers", status=429)
+
+    response = SessionManager(config).get_session(authorization).get(
+        "https://adobe.com/v3/customers",
+    )
+
+    assert response.status_code == 429
+    assert len(requests_mocker.calls) == 3
+
+
+@pytest.mark.parametrize(
+    ("url", "family"),
+    [
+        ("https://api.adobe/v3/customers/a-customer/orders?limit=100", "adobe_orders"),
+        ("https://api.adobe/v3/customers/a-customer/subscriptions/a-sub", "adobe_subscriptions"),
+        ("https://api.adobe/v3/memberships/a-membership/offers", "adobe_transfers"),
+        ("https://api.adobe/v3/resellers", "adobe_resellers"),
+        ("https://api.adobe/v3/customers/a-customer", "adobe_customers"),
+        ("https://api.adobe/v3/other", "adobe"),
+        ("https://authenticate.adobe/ims/token/v3", "adobe_ims"),
+    ],
+)
+def test_get_adobe_endpoint_family(url, family):
+    assert get_adobe_endpoint_family(url) == family
+
+
+def test_authorization_session_circuit_open(
+    requests_mocker, settings, mock_adobe_config, adobe_authorizations_file
+):
+    """
+    Test that the requests to a failing Adobe endpoint family fail fast
+    once its circuit is open while the other families are still available.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "ADOBE_HTTP_MAX_RETRIES": "0",
+        "CIRCUIT_BREAKER_ADOBE_ORDERS_FAILURE_THRESHOLD": "1",
+    }
+    config = Config()
+    authorization = config.get_authorization(
+        adobe_authorizations_file["authorizations"][0]["authorization_uk"],
+    )
+    session = SessionManager(config).get_session(authorization)
+    requests_mocker.get("https://adobe.com/v3/customers/a-customer/orders", status=503)
+    requests_mocker.get("https://adobe.com/v3/customers/a-customer", status=200, json={})
+
+    assert session.get("https://adobe.com/v3/customers/a-customer/orders").status_code == 503
+    with pytest.raises(CircuitOpenError):
+        session.get("https://adobe.com/v3/customers/a-customer/orders")
+    assert session.get("https://adobe.com/v3/customers/a-customer").status_code == 200
+    assert len(requests_mocker.calls) == 2
@@ -0,0 +1,98 @@
+import pytest
+from freezegun import freeze_time
+
+from adobe_vipm.adobe.throttling import RateLimiter, parse_retry_after
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (None, None),
+        ("", None),
+        ("5", 5.0),
+        ("0.5", 0.5),
+        ("-1", 0.0),
+        ("Mon, 01 Jan 2024 12:00:30 GMT", 30.0),
+        ("Mon, 01 Jan 2024 11:00:00 GMT", 0.0),
+        ("not a date", None),
+    ],
+)
+@freeze_time("2024-01-01 12:00:00")
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_acquire_burst(mocker):
+    """
+    Test that up to `burst` requests are let through without waiting and
+    the following ones are paced at `rate` requests per second.
+    """
+    mocker.patch("adobe_vipm.adobe.throttling.time.monotonic", return_value=100.0)
+    mocked_sleep = mocker.patch("adobe_vipm.adobe.throttling.time.sleep")
+    limiter = RateLimiter(rate=2, burst=2)
+
+    waits = [limiter.acquire() for _ in range(4)]
+
+    assert waits == [0.0, 0.0, 0.5, 1.0]
+    assert [call.args[0] for call in mocked_sleep.mock_calls] == [0.5, 1.0]
+    assert limiter.stats.to_dict() == {
+        "requests": 4,
+        "waited": 2,
+        "wait_secs": 1.5,
+        "max_wait_secs": 1.0,
+        "throttled": 0,
+    }
+
+
+def test_acquire_refill(mocker):
+    """
+    Test that the bucket is refilled over time up to `burst` tokens.
+    """
+    mocked_monotonic = mocker.patch(
+        "adobe_vipm.adobe.throttling.time.monotonic", return_value=100.0,
+    )
+    mocker.patch("adobe_vipm.adobe.throttling.time.sleep")
+    limiter = RateLimiter(rate=1, burst=1)
+
+    assert limiter.acquire() == 0.0
+    mocked_monotonic.return_value = 110.0
+    assert limiter.acquire() == 0.0
+    assert limiter.acquire() == 1.0
+
+
+def test_acquire_disabled(mocker):
+    """
+    Test that a rate of zero disables the limiter.
+    """
+    mocker.patch("adobe_vipm.adobe.throttling.time.monotonic", return_value=100.0)
+    limiter = RateLimiter(rate=0, burst=1)
+
+    assert [limiter.acquire() for _ in range(10)] == [0.0] * 10
+
+
+@pytest.mark.parametrize(
+    ("retry_after", "attempt", "expected"),
+    [
+        ("3", 0, 3.0),
+        (None, 0, 1.0),
+        (None, 2, 4.0),
+        (None, 10, 60.0),
+        ("120", 0, 60.0),
+    ],
+)
+def test_backoff(mocker, retry_after, attempt, expected):
+    """
+    Test that after a 429 the bucket is paused for the time requested by Adobe or
+    for an exponential backoff, plus the jitter.
+    """
+    mocker.patch("adobe_vipm.adobe.throttling.time.monotonic", return_value=100.0)
+    mocker.patch("adobe_vipm.adobe.throttling.time.sleep")
+    mocked_uniform = mocker.patch(
+        "adobe_vipm.adobe.throttling.random.uniform", return_value=0.25,
+    )
+    limiter = RateLimiter(rate=0, burst=1, backoff_secs=1, max_backoff_secs=60)
+
+    assert limiter.backoff(retry_after, attempt) == expected + 0.25
+    mocked_uniform.assert_called_once_with(0, expected * 0.2)
+    assert limiter.acquire() == expected + 0.25
+    assert limiter.stats.throttled == 1
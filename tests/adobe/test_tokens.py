@@ -0,0 +1,192 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from freezegun import freeze_time
+
+from adobe_vipm.adobe.dataclasses import APIToken, Authorization
+from adobe_vipm.adobe.tokens import TokenManager
+
+
+@pytest.fixture()
+def authorization():
+    return Authorization(
+        authorization_uk="auth_uk",
+        authorization_id="auth_id",
+        name="test",
+        client_id="client_id",
+        client_secret="client_secret",
+        currency="USD",
+        distributor_id="distributor_id",
+    )
+
+
+def test_get_token_cached(mocker, authorization):
+    """
+    Test that a valid token is returned from the cache without refreshing it.
+    """
+    fetch_token = mocker.MagicMock()
+    token = APIToken("a-token", expires=datetime.now() + timedelta(seconds=3600))
+    manager = TokenManager(fetch_token)
+    manager.tokens[authorization] = token
+
+    assert manager.get_token(authorization) == token
+    fetch_token.assert_not_called()
+
+
+def test_get_token_expired(mocker, authorization):
+    """
+    Test that an expired token is refreshed.
+    """
+    new_token = APIToken("new-token", expires=datetime.now() + timedelta(seconds=3600))
+    fetch_token = mocker.MagicMock(return_value=new_token)
+    manager = TokenManager(fetch_token)
+    manager.tokens[authorization] = APIToken(
+        "old-token", expires=datetime.now() - timedelta(seconds=1),
+    )
+
+    assert manager.get_token(authorization) == new_token
+    assert manager.tokens[authorization] == new_token
+    fetch_token.assert_called_once_with(authorization)
+    manager.stop()
+
+
+def test_get_token_single_flight(authorization):
+    """
+    Test that concurrent callers share the same in flight refresh.
+    """
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch_token(auth):
+        calls.append(auth)
+        started.set()
+        release.wait(5)
+        return APIToken("a-token", expires=datetime.now() + timedelta(seconds=3600))
+
+    manager = TokenManager(fetch_token)
+    results = []
+
+    def get_token():
+        results.append(manager.get_token(authorization))
+
+    leader = threading.Thread(target=get_token)
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=get_token) for _ in range(5)]
+    for follower in followers:
+        follower.start()
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 6
+    assert all(result is results[0] for result in results)
+    manager.stop()
+
+
+def test_get_token_error(mocker, authorization):
+    """
+    Test that an error refreshing the token is propagated and the in flight
+    refresh is released.
+    """
+    manager = TokenManager(mocker.MagicMock(side_effect=RuntimeError("IMS is down")))
+
+    with pytest.raises(RuntimeError):
+        manager.get_token(authorization)
+
+    assert manager._inflight == {}
+    assert authorization not in manager.tokens
+
+
+def test_renew_expiring(mocker, authorization):
+    """
+    Test that only the tokens that will expire within the renewal window are renewed.
+    """
+    another_authorization = Authorization(
+        authorization_uk="another_auth_uk",
+        authorization_id="another_auth_id",
+        name="another",
+        client_id="another_client_id",
+        client_secret="another_client_secret",
+        currency="EUR",
+        distributor_id="another_distributor_id",
+    )
+    with freeze_time("2024-01-01 12:00:00"):
+        renewed_token = APIToken("renewed", expires=datetime.now() + timedelta(seconds=3600))
+        fetch_token = mocker.MagicMock(return_value=renewed_token)
+        manager = TokenManager(fetch_token, renew_ahead_secs=120)
+        valid_token = APIToken("valid", expires=datetime.now() + timedelta(seconds=600))
+        manager.tokens[authorization] = APIToken(
+            "expiring", expires=datetime.now() + timedelta(seconds=60),
+        )
+        manager.tokens[another_authorization] = valid_token
+
+        manager.renew_expiring()
+
+    fetch_token.assert_called_once_with(authorization)
+    assert manager.tokens[authorization] == renewed_token
+    assert manager.tokens[another_authorization] == valid_token
+    manager.stop()
+
+
+def test_renew_expiring_error(mocker, authorization, caplog):
+    """
+    Test that an error renewing a token is logged and the token is left untouched.
+    """
+    expiring_token = APIToken("expiring", expires=datetime.now() + timedelta(seconds=60))
+    manager = TokenManager(mocker.MagicMock(side_effect=RuntimeError("IMS is down")))
+    manager.tokens[authorization] = expiring_token
+
+    manager.renew_expiring()
+
+    assert manager.tokens[authorization] == expiring_token
+    assert "Cannot renew the token for authorization auth_uk" in caplog.text
+
+
+def test_background_renewal(mocker, authorization):
+    """
+    Test that the background thread is started after the first refresh and
+    renews the expiring tokens.
+    """
+    renewed = threading.Event()
+    manager = TokenManager(
+        lambda auth: APIToken("a-token", expires=datetime.now()),
+        renew_interval_secs=0.01,
+    )
+    mocker.patch.object(manager, "renew_expiring", side_effect=lambda: renewed.set())
+
+    manager.get_token(authorization)
+
+    assert renewed.wait(5)
+    manager.stop()
+    assert manager._renewer is None
+
+
+def test_get_token_from_store(mocker, authorization, token_store):
+    """
+    Test that a token already available in the shared store is used
+    instead of requesting a new one.
+    """
+    stored_token = APIToken("stored", expires=datetime.now() + timedelta(seconds=3600))
+    token_store.set("adobe:auth_uk:client_id", stored_token)
+    fetch_token = mocker.MagicMock()
+    manager = TokenManager(fetch_token, store=token_store)
+
+    assert manager.get_token(authorization) == stored_token
+    fetch_token.assert_not_called()
+    manager.stop()
+
+
+def test_refresh_saves_to_store(mocker, authorization, token_store):
+    """
+    Test that a new token is saved to the shared store.
+    """
+    new_token = APIToken("new-token", expires=datetime.now() + timedelta(seconds=3600))
+    manager = TokenManager(mocker.MagicMock(return_value=new_token), store=token_store)
+
+    assert manager.get_token(authorization) == new_token
+    assert token_store.get("adobe:auth_uk:client_id") == new_token
+    manager.stop()
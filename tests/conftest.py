@@ -34,6 +34,35 @@ from adobe_vipm.flows.constants import (
     PARAM_NEXT_SYNC_DATE,
     PARAM_RETRY_COUNT,
 )
+from adobe_vipm.token_store import TokenStore
+
+
+@pytest.fixture(autouse=True)
+def token_store(mocker, tmp_path):
+    """
+    Isolate the shared token store of each test in a temporary directory.
+    """
+    store = TokenStore(str(tmp_path / "tokens" / "tokens.sqlite3"))
+    mocker.patch("adobe_vipm.token_store._TOKEN_STORE", store)
+    return store
+
+
+@pytest.fixture(autouse=True)
+def circuit_breakers(mocker):
+    """
+    Give each test its own circuit breakers so failures recorded
+    by a test do not open the circuits of the others.
+    """
+    return mocker.patch.dict("adobe_vipm.circuit_breaker._CIRCUIT_BREAKERS", clear=True)
+
+
+@pytest.fixture(autouse=True)
+def catalog_cache(mocker):
+    """
+    Give each test an empty catalog cache and no price matrices.
+    """
+    mocker.patch("adobe_vipm.flows.catalog._CATALOG_CACHE", None)
+    mocker.patch.dict("adobe_vipm.flows.pricing._PRICE_MATRICES", clear=True)
 
 
 @pytest.fixture()
@@ -1203,7 +1232,7 @@ def adobe_client_factory(
             expires=datetime.now() + timedelta(seconds=86000),
         )
         client = AdobeClient()
-        client._token_cache[authorization] = api_token
+        client._token_manager.tokens[authorization] = api_token
 
         return client, authorization, api_token
 
@@ -177,6 +177,21 @@ MPT_API_TOKEN = os.getenv("MPT_API_TOKEN", "change-me!")
 # TODO: Should be synced with the initializer.py::initialize function
 MPT_PRODUCTS_IDS = extract_product_ids(os.getenv("MPT_PRODUCTS_IDS", "PRD-1111-1111"))
 MPT_ORDERS_API_POLLING_INTERVAL_SECS = 30
+MPT_ORDERS_API_PAGE_SIZE = 100
+MPT_ORDERS_API_PAGINATION_WORKERS = 4
+MPT_ORDERS_API_RECHECK_INTERVAL_SECS = 0
+MPT_DISPATCHER_MAX_WORKERS = 4
+MPT_DISPATCHER_QUEUE_MAXSIZE = 1000
+MPT_DISPATCHER_SCHEDULING_POLICY = os.getenv(
+    "MPT_DISPATCHER_SCHEDULING_POLICY", "adobe_vipm.utils.get_scheduling_policy"
+)
+MPT_DISPATCHER_BACKOFF_BASE_SECS = 0
+MPT_DISPATCHER_BACKOFF_MAX_SECS = 3600
+MPT_API_POOL_MAXSIZE = 36
+MPT_API_CONNECT_TIMEOUT_SECS = 10.0
+MPT_API_READ_TIMEOUT_SECS = 60.0
+MPT_API_MAX_RETRIES = 0
+MPT_API_ADAPTER = os.getenv("MPT_API_ADAPTER", "adobe_vipm.flows.mpt.MPTCircuitBreakerAdapter")
 MPT_PORTAL_BASE_URL = "https://portal.s1.local"
 
 EXTENSION_CONFIG = {
@@ -184,4 +199,5 @@ EXTENSION_CONFIG = {
     "ADOBE_AUTH_ENDPOINT_URL": "https://authenticate.adobe",
     "WEBHOOKS_SECRETS": {"PRD-1111-1111": "that's my awesome test secret"},
     "AIRTABLE_BASES": {"PRD-1111-1111": "some-bases"},
+    "MPT_API_PAGE_SIZE": "10",
 }
@@ -1,7 +1,9 @@
 import pytest
 
+from adobe_vipm.circuit_breaker import CircuitOpenError
 from adobe_vipm.flows.errors import MPTAPIError
 from adobe_vipm.flows.fulfillment.base import fulfill_order
+from adobe_vipm.flows.mpt import flush_order_updates, update_order
 from adobe_vipm.flows.utils import strip_trace_id
 
 pytestmark = pytest.mark.usefixtures("mock_adobe_config")
@@ -26,3 +28,68 @@ def test_fulfill_order_exception(mocker, mpt_error_factory, order_factory):
     assert process == "fulfillment"
     assert order_id == order["id"]
     assert strip_trace_id(str(error)) in tb
+
+
+def test_fulfill_order_circuit_open(mocker, order_factory):
+    """
+    Tests that an order which depends on a service which circuit is open
+    is left to be processed at the next polling cycle.
+    """
+    mocked_notify = mocker.patch(
+        "adobe_vipm.flows.fulfillment.base.notify_unhandled_exception_in_teams"
+    )
+    mocker.patch(
+        "adobe_vipm.flows.fulfillment.base.populate_order_info",
+        side_effect=CircuitOpenError("mpt_agreements", 30),
+    )
+    mocked_fulfill_purchase_order = mocker.patch(
+        "adobe_vipm.flows.fulfillment.base.fulfill_purchase_order",
+    )
+
+    fulfill_order(mocker.MagicMock(), order_factory())
+
+    mocked_notify.assert_not_called()
+    mocked_fulfill_purchase_order.assert_not_called()
+
+
+def test_fulfill_order_coalesce_updates(mocker, order_factory):
+    """
+    Tests that the updates of the order issued by the fulfillment flow
+    are merged and sent at the checkpoints of the flow.
+    """
+    order = order_factory()
+    mocker.patch(
+        "adobe_vipm.flows.fulfillment.base.populate_order_info",
+        return_value=order,
+    )
+    mocker.patch("adobe_vipm.flows.fulfillment.base.send_processing_notification")
+
+    def fulfill_purchase_order(client, order):
+        update_order(client, order["id"], parameters=order["parameters"])
+        update_order(client, order["id"], externalIds={"vendor": "P0000"})
+        flush_order_updates(order["id"])
+        update_order(client, order["id"], lines=order["lines"])
+        update_order(client, order["id"], parameters=order["parameters"])
+
+    mocker.patch(
+        "adobe_vipm.flows.fulfillment.base.fulfill_purchase_order",
+        side_effect=fulfill_purchase_order,
+    )
+    client = mocker.MagicMock()
+
+    fulfill_order(client, order)
+
+    assert client.put.mock_calls == [
+        mocker.call(
+            f"/commerce/orders/{order['id']}",
+            json={"parameters": order["parameters"], "externalIds": {"vendor": "P0000"}},
+        ),
+        mocker.call().raise_for_status(),
+        mocker.call().json(),
+        mocker.call(
+            f"/commerce/orders/{order['id']}",
+            json={"lines": order["lines"], "parameters": order["parameters"]},
+        ),
+        mocker.call().raise_for_status(),
+        mocker.call().json(),
+    ]
@@ -351,9 +351,11 @@ def test_downsizing(
     )
 
     mocked_adobe_client = mocker.MagicMock()
-    mocked_adobe_client.search_new_and_returned_orders_by_sku_line_number.return_value = [
+    mocked_orders_index = mocker.MagicMock()
+    mocked_orders_index.search_new_and_returned_orders_by_sku_line_number.return_value = [
         (order_to_return, order_to_return["lineItems"][0], None),
     ]
+    mocked_adobe_client.get_customer_orders_index.return_value = mocked_orders_index
     mocked_adobe_client.create_return_order.return_value = adobe_return_order
     mocked_adobe_client.create_preview_order.return_value = adobe_preview_order
     mocked_adobe_client.create_new_order.return_value = adobe_order
@@ -480,12 +482,15 @@ def test_downsizing(
         processing_order["id"],
         {"id": "TPL-1111"},
     )
-    mocked_adobe_client.search_new_and_returned_orders_by_sku_line_number.assert_called_once_with(
+    mocked_adobe_client.get_customer_orders_index.assert_called_once_with(
         authorization_id,
         "a-client-id",
+    )
+    mocked_orders_index.search_new_and_returned_orders_by_sku_line_number.assert_called_once_with(
         processing_order["lines"][0]["item"]["externalIds"]["vendor"],
         processing_order["lines"][0]["id"],
     )
+    mocked_orders_index.add_return_order.assert_called_once_with(adobe_return_order)
 
 
 def test_downsizing_return_order_exists(
@@ -529,9 +534,11 @@ def test_downsizing_return_order_exists(
 
     mocked_adobe_client = mocker.MagicMock()
     mocked_adobe_client.create_preview_order.return_value = adobe_preview_order
-    mocked_adobe_client.search_new_and_returned_orders_by_sku_line_number.return_value = [
+    mocked_orders_index = mocker.MagicMock()
+    mocked_orders_index.search_new_and_returned_orders_by_sku_line_number.return_value = [
         (order_to_return, order_to_return["lineItems"][0], adobe_return_order),
     ]
+    mocked_adobe_client.get_customer_orders_index.return_value = mocked_orders_index
     mocked_adobe_client.create_new_order.return_value = adobe_order
     mocked_adobe_client.get_order.return_value = adobe_order
 
@@ -678,9 +685,11 @@ def test_downsizing_return_order_pending(
 
     mocked_adobe_client = mocker.MagicMock()
     mocked_adobe_client.create_preview_order.return_value = adobe_preview_order
-    mocked_adobe_client.search_new_and_returned_orders_by_sku_line_number.return_value = [
+    mocked_orders_index = mocker.MagicMock()
+    mocked_orders_index.search_new_and_returned_orders_by_sku_line_number.return_value = [
         (order_to_return, order_to_return["lineItems"][0], adobe_return_order),
     ]
+    mocked_adobe_client.get_customer_orders_index.return_value = mocked_orders_index
 
     mocker.patch(
         "adobe_vipm.flows.fulfillment.change.get_adobe_client",
@@ -822,9 +831,11 @@ def test_downsizing_create_new_order_error(
 
     mocked_adobe_client = mocker.MagicMock()
     mocked_adobe_client.create_preview_order.return_value = adobe_preview_order
-    mocked_adobe_client.search_new_and_returned_orders_by_sku_line_number.return_value = [
+    mocked_orders_index = mocker.MagicMock()
+    mocked_orders_index.search_new_and_returned_orders_by_sku_line_number.return_value = [
         (order_to_return, order_to_return["lineItems"][0], None),
     ]
+    mocked_adobe_client.get_customer_orders_index.return_value = mocked_orders_index
     mocked_adobe_client.create_return_order.return_value = adobe_return_order
     mocked_adobe_client.create_new_order.side_effect = adobe_error
 
@@ -975,9 +986,11 @@ def test_mixed(
     )
 
     mocked_adobe_client = mocker.MagicMock()
-    mocked_adobe_client.search_new_and_returned_orders_by_sku_line_number.return_value = [
+    mocked_orders_index = mocker.MagicMock()
+    mocked_orders_index.search_new_and_returned_orders_by_sku_line_number.return_value = [
         (order_to_return, order_to_return["lineItems"][0], None),
     ]
+    mocked_adobe_client.get_customer_orders_index.return_value = mocked_orders_index
     mocked_adobe_client.create_return_order.return_value = adobe_return_order
     mocked_adobe_client.create_preview_order.return_value = adobe_preview_order
     mocked_adobe_client.create_new_order.return_value = adobe_order
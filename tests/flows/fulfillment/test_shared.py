@@ -1,11 +1,24 @@
 import logging
+import threading
 
 import pytest
 
+from adobe_vipm.adobe.constants import (
+    ORDER_TYPE_NEW,
+    ORDER_TYPE_RETURN,
+    STATUS_PENDING,
+    STATUS_PROCESSED,
+)
+from adobe_vipm.adobe.orders import CustomerOrdersIndex
 from adobe_vipm.flows.fulfillment.shared import (
+    handle_return_orders,
+    save_adobe_customer_data,
+    save_adobe_order_id,
+    save_adobe_order_id_and_customer_data,
     send_email_notification,
     send_processing_notification,
 )
+from adobe_vipm.flows.mpt import order_updates
 from adobe_vipm.flows.utils import get_notifications_recipient
 
 
@@ -123,3 +136,174 @@ def test_send_processing_notification_retries(
     send_processing_notification(mocked_client, order)
 
     mocked_send.assert_not_called()
+
+
+def test_handle_return_orders_concurrent(
+    mocker,
+    order_factory,
+    lines_factory,
+    adobe_order_factory,
+    adobe_items_factory,
+):
+    """
+    Test that the return orders of different lines are created concurrently
+    and the completed ones are reported following the order of the lines.
+    """
+    lines = lines_factory(line_id=1, external_vendor_id="65304578CA") + lines_factory(
+        line_id=2, item_id=2, external_vendor_id="77777777CA"
+    )
+    order = order_factory(lines=lines)
+    new_order = adobe_order_factory(
+        ORDER_TYPE_NEW,
+        order_id="order-1",
+        external_id="ORD-1111",
+        status=STATUS_PROCESSED,
+        items=adobe_items_factory(line_number=1, offer_id="65304578CA01A12")
+        + adobe_items_factory(line_number=2, offer_id="77777777CA01A12"),
+    )
+    return_orders = {
+        1: adobe_order_factory(
+            ORDER_TYPE_RETURN,
+            order_id="return-1",
+            reference_order_id="order-1",
+            status=STATUS_PROCESSED,
+        ),
+        2: adobe_order_factory(
+            ORDER_TYPE_RETURN,
+            order_id="return-2",
+            reference_order_id="order-1",
+            status=STATUS_PROCESSED,
+        ),
+    }
+    barrier = threading.Barrier(2, timeout=5)
+
+    def create_return_order(authorization_id, customer_id, order_to_return, item_to_return):
+        barrier.wait()
+        return return_orders[item_to_return["extLineItemNumber"]]
+
+    mocked_adobe_client = mocker.MagicMock()
+    mocked_adobe_client.get_customer_orders_index.return_value = CustomerOrdersIndex(
+        [new_order], [],
+    )
+    mocked_adobe_client.create_return_order.side_effect = create_return_order
+    mocked_reset_retries = mocker.patch(
+        "adobe_vipm.flows.fulfillment.shared.reset_retries",
+        return_value=order,
+    )
+    mocked_handle_retries = mocker.patch(
+        "adobe_vipm.flows.fulfillment.shared.handle_retries",
+    )
+
+    completed_order_ids, updated_order = handle_return_orders(
+        mocker.MagicMock(), mocked_adobe_client, "a-customer", order, lines,
+    )
+
+    assert completed_order_ids == ["return-1", "return-2"]
+    assert updated_order == order
+    assert mocked_adobe_client.create_return_order.call_count == 2
+    mocked_reset_retries.assert_called_once()
+    mocked_handle_retries.assert_not_called()
+
+
+def test_handle_return_orders_pending(
+    mocker,
+    settings,
+    order_factory,
+    lines_factory,
+    adobe_order_factory,
+):
+    """
+    Test that if a return order is pending the retry count is incremented,
+    the following orders of the line are not returned and no completed orders
+    are reported.
+    """
+    settings.EXTENSION_CONFIG = {**settings.EXTENSION_CONFIG, "RETURN_ORDERS_MAX_WORKERS": "1"}
+    lines = lines_factory()
+    order = order_factory(lines=lines)
+    new_orders = [
+        adobe_order_factory(
+            ORDER_TYPE_NEW,
+            order_id=f"order-{i}",
+            external_id=f"ORD-{i}",
+            status=STATUS_PROCESSED,
+        )
+        for i in range(2)
+    ]
+    pending_return_order = adobe_order_factory(
+        ORDER_TYPE_RETURN,
+        order_id="return-0",
+        reference_order_id="order-0",
+        status=STATUS_PENDING,
+    )
+
+    mocked_adobe_client = mocker.MagicMock()
+    mocked_adobe_client.get_customer_orders_index.return_value = CustomerOrdersIndex(
+        new_orders, [],
+    )
+    mocked_adobe_client.create_return_order.return_value = pending_return_order
+    mocked_reset_retries = mocker.patch(
+        "adobe_vipm.flows.fulfillment.shared.reset_retries",
+    )
+    mocked_handle_retries = mocker.patch(
+        "adobe_vipm.flows.fulfillment.shared.handle_retries",
+    )
+    mocked_mpt_client = mocker.MagicMock()
+
+    assert handle_return_orders(
+        mocked_mpt_client, mocked_adobe_client, "a-customer", order, lines,
+    ) == (None, order)
+
+    mocked_adobe_client.create_return_order.assert_called_once()
+    mocked_reset_retries.assert_not_called()
+    mocked_handle_retries.assert_called_once_with(
+        mocked_mpt_client, order, "return-0", adobe_order_type="RETURN",
+    )
+
+
+@pytest.mark.parametrize(
+    ("save", "expected_fields"),
+    [
+        (
+            lambda client, order, customer: save_adobe_customer_data(
+                client, order, customer["customerId"]
+            ),
+            {"parameters"},
+        ),
+        (
+            lambda client, order, customer: save_adobe_order_id(client, order, "P0123456789"),
+            {"externalIds"},
+        ),
+        (
+            lambda client, order, customer: save_adobe_order_id_and_customer_data(
+                client, order, "P0123456789", customer
+            ),
+            {"parameters", "externalIds"},
+        ),
+    ],
+)
+def test_save_adobe_ids_written_through(
+    mocker, order_factory, adobe_customer_factory, save, expected_fields
+):
+    """
+    Tests that the ids of the objects created on Adobe side are sent to MPT
+    right away, so they are not lost if the process dies before the end of
+    the fulfillment pass.
+    """
+    mocker.patch("adobe_vipm.flows.fulfillment.shared.update_agreement")
+    client = mocker.MagicMock()
+    order = order_factory()
+    sent_before_failure = []
+
+    def fulfill_and_die():
+        with order_updates(client, order["id"]):
+            save(client, order, adobe_customer_factory())
+            sent_before_failure.extend(client.put.call_args_list)
+            raise RuntimeError("killed")
+
+    with pytest.raises(RuntimeError):
+        fulfill_and_die()
+
+    assert len(sent_before_failure) == 1
+    (url,) = sent_before_failure[0].args
+    assert url == f"/commerce/orders/{order['id']}"
+    assert set(sent_before_failure[0].kwargs["json"]) == expected_fields
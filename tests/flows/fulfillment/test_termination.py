@@ -48,9 +48,11 @@ def test_termination(
     )
 
     mocked_adobe_client = mocker.MagicMock()
-    mocked_adobe_client.search_new_and_returned_orders_by_sku_line_number.return_value = [
+    mocked_orders_index = mocker.MagicMock()
+    mocked_orders_index.search_new_and_returned_orders_by_sku_line_number.return_value = [
         (order_to_return, order_to_return["lineItems"][0], None),
     ]
+    mocked_adobe_client.get_customer_orders_index.return_value = mocked_orders_index
     mocked_adobe_client.create_return_order.return_value = adobe_return_order
     mocker.patch(
         "adobe_vipm.flows.fulfillment.termination.get_adobe_client",
@@ -103,9 +105,11 @@ def test_termination(
         processing_order["id"],
         {"id": "TPL-1111"},
     )
-    mocked_adobe_client.search_new_and_returned_orders_by_sku_line_number.assert_called_once_with(
+    mocked_adobe_client.get_customer_orders_index.assert_called_once_with(
         authorization_id,
         "a-client-id",
+    )
+    mocked_orders_index.search_new_and_returned_orders_by_sku_line_number.assert_called_once_with(
         processing_order["lines"][0]["item"]["externalIds"]["vendor"],
         processing_order["lines"][0]["id"],
     )
@@ -152,9 +156,11 @@ def test_termination_return_order_pending(
     )
 
     mocked_adobe_client = mocker.MagicMock()
-    mocked_adobe_client.search_new_and_returned_orders_by_sku_line_number.return_value = [
+    mocked_orders_index = mocker.MagicMock()
+    mocked_orders_index.search_new_and_returned_orders_by_sku_line_number.return_value = [
         (order_to_return, order_to_return["lineItems"][0], None),
     ]
+    mocked_adobe_client.get_customer_orders_index.return_value = mocked_orders_index
     mocked_adobe_client.create_return_order.return_value = adobe_return_order
     mocker.patch(
         "adobe_vipm.flows.fulfillment.termination.get_adobe_client",
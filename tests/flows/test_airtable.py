@@ -2,6 +2,7 @@ from datetime import date
 
 from requests import HTTPError
 
+from adobe_vipm.circuit_breaker import CircuitBreakerAdapter
 from adobe_vipm.flows.airtable import (
     AirTableBaseInfo,
     create_offers,
@@ -34,6 +35,9 @@ def test_get_transfer_model():
     Transfer = get_transfer_model(base_info)
     assert Transfer.get_api().api_key == base_info.api_key
     assert Transfer.get_base().id == base_info.base_id
+    adapter = Transfer.get_api().session.get_adapter("https://api.airtable.com")
+    assert isinstance(adapter, CircuitBreakerAdapter)
+    assert adapter.family == "airtable"
 
 
 def test_get_offer_model():
@@ -0,0 +1,220 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from freezegun import freeze_time
+
+from adobe_vipm.flows.async_mpt import (
+    get_agreement,
+    get_agreements_by_next_sync,
+    get_agreements_by_query,
+    iter_objects,
+    setup_async_mpt_client,
+    update_agreement_subscription,
+)
+from adobe_vipm.flows.errors import MPTAPIError, MPTHttpError
+from adobe_vipm.flows.mpt import get_next_sync_query
+
+
+def _page(data, offset, limit, total):
+    return {
+        "$meta": {
+            "pagination": {
+                "offset": offset,
+                "limit": limit,
+                "total": total,
+            },
+        },
+        "data": data,
+    }
+
+
+@pytest.fixture()
+def async_mpt_client_factory(settings):
+    """
+    Returns a factory that creates an AsyncMPTClient which requests are served
+    by the given handler.
+    """
+    settings.MPT_API_BASE_URL = "https://localhost"
+
+    def _factory(handler):
+        return setup_async_mpt_client(transport=httpx.MockTransport(handler))
+
+    return _factory
+
+
+def test_get_agreement(async_mpt_client_factory):
+    """
+    Tests the retrieval of an agreement through the async client.
+    """
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"id": "AGR-0001"})
+
+    async def run():
+        async with async_mpt_client_factory(handler) as client:
+            return await get_agreement(client, "AGR-0001")
+
+    assert asyncio.run(run()) == {"id": "AGR-0001"}
+    assert str(requests[0].url) == (
+        "https://localhost/v1/commerce/agreements/AGR-0001"
+        "?select=seller,buyer,listing,product,subscriptions"
+    )
+    assert requests[0].headers["Authorization"] == "Bearer change-me!"
+
+
+def test_update_agreement_subscription(async_mpt_client_factory):
+    """
+    Tests the update of an agreement subscription through the async client.
+    """
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"id": "SUB-1234"})
+
+    async def run():
+        async with async_mpt_client_factory(handler) as client:
+            return await update_agreement_subscription(
+                client,
+                "SUB-1234",
+                parameters={"fulfillment": []},
+            )
+
+    assert asyncio.run(run()) == {"id": "SUB-1234"}
+    assert requests[0].method == "PUT"
+    assert requests[0].url.path == "/v1/commerce/subscriptions/SUB-1234"
+    assert json.loads(requests[0].content) == {"parameters": {"fulfillment": []}}
+
+
+def test_iter_objects(settings, async_mpt_client_factory):
+    """
+    Tests the pages following the first one are requested concurrently
+    and the objects are returned in order.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "MPT_API_PAGE_SIZE": "2",
+        "MPT_API_PAGINATION_WORKERS": "3",
+    }
+    data = [{"id": f"AGR-{idx}"} for idx in range(7)]
+    in_flight = []
+    max_in_flight = []
+
+    async def handler(request):
+        offset = int(request.url.params["offset"])
+        assert request.url.params["limit"] == "2"
+        in_flight.append(offset)
+        max_in_flight.append(len(in_flight))
+        await asyncio.sleep(0.01 * (7 - offset))
+        in_flight.remove(offset)
+        return httpx.Response(200, json=_page(data[offset:offset + 2], offset, 2, 7))
+
+    async def run():
+        async with async_mpt_client_factory(handler) as client:
+            return [
+                obj async for obj in iter_objects(client, "/commerce/agreements?eq(status,Active)")
+            ]
+
+    assert asyncio.run(run()) == data
+    assert max(max_in_flight) == 3
+
+
+def test_get_agreements_by_next_sync(async_mpt_client_factory):
+    """
+    Tests the agreements to synchronize are retrieved with the query
+    of the synchronous helper.
+    """
+    urls = []
+
+    def handler(request):
+        urls.append(request.url)
+        return httpx.Response(200, json=_page([{"id": "AGR-0001"}], 0, 10, 1))
+
+    async def run():
+        async with async_mpt_client_factory(handler) as client:
+            return await get_agreements_by_next_sync(client)
+
+    with freeze_time("2024-01-04"):
+        assert asyncio.run(run()) == [{"id": "AGR-0001"}]
+        assert urls[0] == httpx.URL(
+            f"https://localhost/v1/commerce/agreements?{get_next_sync_query()}&limit=10&offset=0",
+        )
+
+
+def test_http_errors_are_wrapped(async_mpt_client_factory, mpt_error_factory):
+    """
+    Tests the errors returned by MPT are raised as MPTAPIError
+    or MPTHttpError, both for single objects and while iterating.
+    """
+
+    def handler(request):
+        if "AGR-0001" in request.url.path:
+            return httpx.Response(404, json=mpt_error_factory(404, "Not Found", "Not found"))
+        return httpx.Response(502, content=b"Bad gateway")
+
+    async def run():
+        async with async_mpt_client_factory(handler) as client:
+            with pytest.raises(MPTAPIError) as cv:
+                await get_agreement(client, "AGR-0001")
+            assert cv.value.status == 404
+
+            with pytest.raises(MPTHttpError) as cv:
+                await get_agreements_by_query(client, "eq(status,Active)")
+            assert cv.value.status_code == 502
+
+    asyncio.run(run())
+
+
+def test_server_errors_are_retried(mocker, settings, async_mpt_client_factory):
+    """
+    Tests the async client retries the requests failed with a server error.
+    """
+    settings.MPT_API_MAX_RETRIES = 2
+    mocked_sleep = mocker.patch(
+        "swo.mpt.client.async_client.asyncio.sleep",
+        new=mocker.AsyncMock(),
+    )
+    responses = [
+        httpx.Response(503),
+        httpx.Response(500),
+        httpx.Response(200, json={"id": "AGR-0001"}),
+    ]
+
+    def handler(request):
+        return responses.pop(0)
+
+    async def run():
+        async with async_mpt_client_factory(handler) as client:
+            return await get_agreement(client, "AGR-0001")
+
+    assert asyncio.run(run()) == {"id": "AGR-0001"}
+    assert [call.args[0] for call in mocked_sleep.await_args_list] == [0.1, 0.2]
+
+
+def test_post_is_not_retried(mocker, settings, async_mpt_client_factory):
+    """
+    Tests the async client doesn't retry the non idempotent requests failed with
+    a server error, since the server could have already applied them.
+    """
+    settings.MPT_API_MAX_RETRIES = 2
+    mocked_sleep = mocker.patch(
+        "swo.mpt.client.async_client.asyncio.sleep",
+        new=mocker.AsyncMock(),
+    )
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(502)
+
+    async def run():
+        async with async_mpt_client_factory(handler) as client:
+            return await client.post("/commerce/orders", json={})
+
+    assert asyncio.run(run()).status_code == 502
+    assert len(requests) == 1
+    mocked_sleep.assert_not_awaited()
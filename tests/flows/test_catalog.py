@@ -0,0 +1,77 @@
+import pytest
+
+from adobe_vipm.flows.catalog import CatalogCache, get_catalog_cache
+
+
+@pytest.fixture()
+def mocked_monotonic(mocker):
+    return mocker.patch("adobe_vipm.adobe.cache.time.monotonic", return_value=100.0)
+
+
+def test_get_product_items(mocked_monotonic):
+    """
+    Test the product items are looked up by SKU and the missing SKUs are returned.
+    """
+    catalog = CatalogCache(ttl=10, maxsize=100)
+    items = [
+        {"id": "ITM-1", "externalIds": {"vendor": "sku1"}},
+        {"id": "ITM-2", "externalIds": {"vendor": "sku2"}},
+    ]
+    catalog.set_product_items("PRD-1", items)
+
+    assert catalog.get_product_items("PRD-1", ["sku2", "sku3", "sku3"]) == (
+        [items[1]],
+        ["sku3"],
+    )
+    assert catalog.get_product_items("PRD-2", ["sku1"]) == ([], ["sku1"])
+
+    mocked_monotonic.return_value = 110.0
+    assert catalog.get_product_items("PRD-1", ["sku1"]) == ([], ["sku1"])
+
+
+def test_get_pricelist_items(mocked_monotonic):
+    """
+    Test the price list items are looked up by product item id.
+    """
+    catalog = CatalogCache(ttl=10, maxsize=100)
+    items = [
+        {"id": "PRI-1", "item": {"id": "ITM-1"}},
+        {"id": "PRI-2", "item": {"id": "ITM-2"}},
+    ]
+    catalog.set_pricelist_items("PRC-1", items)
+
+    assert catalog.get_pricelist_items("PRC-1", ["ITM-1", "ITM-3"]) == (
+        [items[0]],
+        ["ITM-3"],
+    )
+
+
+def test_invalidate(mocked_monotonic):
+    """
+    Test the items of a product are removed while the other owners are kept.
+    """
+    catalog = CatalogCache(ttl=10, maxsize=100)
+    catalog.set_product_items("PRD-1", [{"id": "ITM-1", "externalIds": {"vendor": "sku1"}}])
+    catalog.set_pricelist_items("PRC-1", [{"id": "PRI-1", "item": {"id": "ITM-1"}}])
+
+    catalog.invalidate("PRD-1")
+
+    assert catalog.get_product_items("PRD-1", ["sku1"]) == ([], ["sku1"])
+    assert catalog.get_pricelist_items("PRC-1", ["ITM-1"])[1] == []
+
+
+def test_get_catalog_cache(settings):
+    """
+    Test the catalog cache is created once per process from the extension settings.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "MPT_CATALOG_CACHE_TTL_SECS": "60",
+        "MPT_CATALOG_CACHE_MAX_SIZE": "50",
+    }
+
+    catalog = get_catalog_cache()
+
+    assert get_catalog_cache() is catalog
+    assert catalog._cache.ttl == 60
+    assert catalog._cache.maxsize == 50
@@ -1,5 +1,7 @@
 from adobe_vipm.adobe.constants import ORDER_TYPE_PREVIEW
 from adobe_vipm.flows.helpers import (
+    populate_order_info,
+    prefetch_orders_agreements,
     update_purchase_prices,
     update_purchase_prices_for_transfer,
 )
@@ -96,3 +98,73 @@ def test_update_purchase_price_for_transfer(
         order["agreement"]["listing"]["priceList"]["id"],
         [not_for_sale_items[0]["id"]],
     )
+
+
+def test_prefetch_orders_agreements(mocker, order_factory, agreement):
+    licensee = agreement["licensee"]
+    other_agreement = {**agreement, "id": "AGR-9999", "licensee": {"id": "LC-9999"}}
+    mocked_get_agreements = mocker.patch(
+        "adobe_vipm.flows.helpers.get_agreements_with_details_by_ids",
+        return_value={
+            agreement["id"]: {**agreement, "licensee": {"id": licensee["id"]}},
+            other_agreement["id"]: other_agreement,
+        },
+    )
+    mocked_get_licensees = mocker.patch(
+        "adobe_vipm.flows.helpers.get_licensees_by_ids",
+        return_value={licensee["id"]: licensee},
+    )
+    mocked_client = mocker.MagicMock()
+    order = order_factory()
+
+    assert prefetch_orders_agreements(mocked_client, [order, order]) == {
+        agreement["id"]: agreement,
+    }
+    mocked_get_agreements.assert_called_once_with(
+        mocked_client,
+        [order["agreement"]["id"], order["agreement"]["id"]],
+    )
+    mocked_get_licensees.assert_called_once_with(
+        mocked_client,
+        [licensee["id"], "LC-9999"],
+    )
+
+
+def test_prefetch_orders_agreements_missing_licensee(mocker, order_factory, agreement):
+    """
+    Tests that the agreements returned without their licensee are left out
+    of the prefetched ones.
+    """
+    licensee = agreement["licensee"]
+    other_agreement = {**agreement, "id": "AGR-9999"}
+    del other_agreement["licensee"]
+    mocker.patch(
+        "adobe_vipm.flows.helpers.get_agreements_with_details_by_ids",
+        return_value={
+            agreement["id"]: {**agreement, "licensee": {"id": licensee["id"]}},
+            other_agreement["id"]: other_agreement,
+        },
+    )
+    mocked_get_licensees = mocker.patch(
+        "adobe_vipm.flows.helpers.get_licensees_by_ids",
+        return_value={licensee["id"]: licensee},
+    )
+    mocked_client = mocker.MagicMock()
+
+    assert prefetch_orders_agreements(mocked_client, [order_factory()]) == {
+        agreement["id"]: agreement,
+    }
+    mocked_get_licensees.assert_called_once_with(mocked_client, [licensee["id"]])
+
+
+def test_populate_order_info_prefetched(mocker, order_factory, agreement):
+    mocked_get_agreement = mocker.patch("adobe_vipm.flows.helpers.get_agreement")
+    mocked_get_licensee = mocker.patch("adobe_vipm.flows.helpers.get_licensee")
+    order = order_factory()
+
+    order = populate_order_info(mocker.MagicMock(), order, agreement)
+
+    assert order["agreement"] == agreement
+    assert order["agreement"] is not agreement
+    mocked_get_agreement.assert_not_called()
+    mocked_get_licensee.assert_not_called()
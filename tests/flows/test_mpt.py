@@ -1,4 +1,8 @@
-from urllib.parse import urljoin
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urljoin, urlparse
 
 import pytest
 from freezegun import freeze_time
@@ -12,6 +16,7 @@ from adobe_vipm.adobe.constants import (
     STATUS_3YC_NONCOMPLIANT,
     STATUS_3YC_REQUESTED,
 )
+from adobe_vipm.circuit_breaker import get_circuit_breaker
 from adobe_vipm.flows.constants import (
     PARAM_3YC,
     PARAM_3YC_COMMITMENT_REQUEST_STATUS,
@@ -23,9 +28,11 @@ from adobe_vipm.flows.constants import (
 )
 from adobe_vipm.flows.errors import MPTAPIError
 from adobe_vipm.flows.mpt import (
+    MPTCircuitBreakerAdapter,
     complete_order,
     create_subscription,
     fail_order,
+    flush_order_updates,
     get_agreement_subscription,
     get_agreements_by_3yc_commitment_request_status,
     get_agreements_by_ids,
@@ -33,7 +40,11 @@ from adobe_vipm.flows.mpt import (
     get_agreements_by_query,
     get_agreements_for_3yc_recommitment,
     get_agreements_for_3yc_resubmit,
+    get_agreements_with_details_by_ids,
     get_all_agreements,
+    get_licensees_by_ids,
+    get_mpt_endpoint_family,
+    get_objects_by_keys,
     get_pricelist_items_by_product_items,
     get_product_items_by_skus,
     get_product_onetime_items_by_ids,
@@ -41,7 +52,11 @@ from adobe_vipm.flows.mpt import (
     get_rendered_template,
     get_subscription_by_external_id,
     get_webhook,
+    iter_objects,
+    order_updates,
     query_order,
+    set_processing_template,
+    split_rql_values,
     update_agreement,
     update_agreement_subscription,
     update_order,
@@ -201,6 +216,113 @@ def test_update_order_error(mpt_client, requests_mocker, mpt_error_factory):
     assert cv.value.payload["status"] == 404
 
 
+def test_order_updates(mpt_client, requests_mocker, order_factory):
+    """
+    Test that within a unit of work the updates of the order are merged
+    and sent once before the status transition of the order.
+    """
+    order = order_factory()
+    put = requests_mocker.put(
+        urljoin(mpt_client.base_url, "commerce/orders/ORD-0000"),
+        json=order,
+        match=[
+            matchers.json_params_matcher(
+                {
+                    "template": {"id": "TPL-0000"},
+                    "parameters": {"fulfillment": [{"externalId": "b"}]},
+                    "lines": [{"id": "ALI-0000-0001"}],
+                },
+            ),
+        ],
+    )
+    fail = requests_mocker.post(
+        urljoin(mpt_client.base_url, "commerce/orders/ORD-0000/fail"),
+        json=order,
+    )
+    other = requests_mocker.put(
+        urljoin(mpt_client.base_url, "commerce/orders/ORD-0001"),
+        json=order,
+    )
+
+    with order_updates(mpt_client, "ORD-0000") as updates:
+        set_processing_template(mpt_client, "ORD-0000", {"id": "TPL-0000"})
+        update_order(mpt_client, "ORD-0000", parameters={"fulfillment": [{"externalId": "a"}]})
+        update_order(mpt_client, "ORD-0000", parameters={"fulfillment": [{"externalId": "b"}]})
+        update_order(mpt_client, "ORD-0000", lines=[{"id": "ALI-0000-0001"}])
+        update_order(mpt_client, "ORD-0001", parameters={})
+        assert put.call_count == 0
+        assert other.call_count == 1
+
+        fail_order(mpt_client, "ORD-0000", "a-reason")
+
+    assert updates.updates == 4
+    assert updates.flushes == 1
+    assert put.call_count == 1
+    assert fail.call_count == 1
+    assert requests_mocker.calls[1].request.url.endswith("/ORD-0000")
+    assert requests_mocker.calls[2].request.url.endswith("/fail")
+
+
+def test_order_updates_flush(mpt_client, requests_mocker, order_factory):
+    """
+    Test that the pending updates are sent at the checkpoints and
+    at the end of the unit of work.
+    """
+    order = order_factory()
+    put = requests_mocker.put(
+        urljoin(mpt_client.base_url, "commerce/orders/ORD-0000"),
+        json=order,
+    )
+
+    with order_updates(mpt_client, "ORD-0000") as updates:
+        flush_order_updates("ORD-0000")
+        assert put.call_count == 0
+
+        update_order(mpt_client, "ORD-0000", parameters={})
+        flush_order_updates("ORD-0001")
+        assert put.call_count == 0
+
+        flush_order_updates("ORD-0000")
+        assert put.call_count == 1
+
+        update_order(mpt_client, "ORD-0000", externalIds={"vendor": "P0000"})
+
+    assert updates.flushes == 2
+    assert put.call_count == 2
+    assert json.loads(put.calls[1].request.body) == {"externalIds": {"vendor": "P0000"}}
+
+
+def test_order_updates_exception(mocker, mpt_client, requests_mocker, order_factory):
+    """
+    Test that the pending updates are sent when the unit of work fails
+    and that an error sending them does not hide the original one.
+    """
+
+    def fulfill():
+        with order_updates(mpt_client, "ORD-0000"):
+            update_order(mpt_client, "ORD-0000", parameters={})
+            raise ValueError("boom")
+
+    put = requests_mocker.put(
+        urljoin(mpt_client.base_url, "commerce/orders/ORD-0000"),
+        json=order_factory(),
+    )
+
+    with pytest.raises(ValueError):
+        fulfill()
+
+    assert put.call_count == 1
+
+    mocked_put = mocker.patch(
+        "adobe_vipm.flows.mpt._put_order",
+        side_effect=MPTAPIError(500, {"status": 500}),
+    )
+    with pytest.raises(ValueError):
+        fulfill()
+
+    mocked_put.assert_called_once_with(mpt_client, "ORD-0000", {"parameters": {}})
+
+
 def test_complete_order(mpt_client, requests_mocker, order_factory):
     """Test the call to switch an order to Completed."""
     order = order_factory()
@@ -343,14 +465,14 @@ def test_get_product_items_by_skus(mpt_client, requests_mocker):
     that matches a list of vendor SKUs.
     """
     product_id = "PRD-1234-5678"
-    skus = ["sku1", "sku2"]
+    skus = [f"sku{idx}" for idx in range(13)]
     rql_query = (
         f"and(eq(product.id,{product_id}),in(externalIds.vendor,({','.join(skus)})))"
     )
     url = f"items?{rql_query}"
     page1_url = f"{url}&limit=10&offset=0"
     page2_url = f"{url}&limit=10&offset=10"
-    data = [{"id": f"ITM-{idx}"} for idx in range(13)]
+    data = [{"id": f"ITM-{idx}", "externalIds": {"vendor": f"sku{idx}"}} for idx in range(13)]
     requests_mocker.get(
         urljoin(mpt_client.base_url, page1_url),
         json={
@@ -413,10 +535,11 @@ def test_get_pricelist_items_by_product_items(mpt_client, requests_mocker):
     the product item ids.
     """
 
-    url = "price-lists/PRC-1234/items?in(item.id,(ITM-5678,ITM-9012))"
+    item_ids = [f"ITM-{idx}" for idx in range(13)]
+    url = f"price-lists/PRC-1234/items?in(item.id,({','.join(item_ids)}))"
     page1_url = f"{url}&limit=10&offset=0"
     page2_url = f"{url}&limit=10&offset=10"
-    data = [{"id": f"PRI-{idx}"} for idx in range(13)]
+    data = [{"id": f"PRI-{idx}", "item": {"id": f"ITM-{idx}"}} for idx in range(13)]
     requests_mocker.get(
         urljoin(mpt_client.base_url, page1_url),
         json={
@@ -448,7 +571,7 @@ def test_get_pricelist_items_by_product_items(mpt_client, requests_mocker):
         get_pricelist_items_by_product_items(
             mpt_client,
             "PRC-1234",
-            ["ITM-5678", "ITM-9012"],
+            item_ids,
         )
         == data
     )
@@ -982,31 +1105,333 @@ def test_get_product_onetime_items_by_ids_error(
 
 
 def test_get_agreements_by_ids(mocker):
-    rql_query = (
-        "and(in(id,(AGR-0001)),eq(status,Active))"
+    url = (
+        "/commerce/agreements?and(in(id,(AGR-0001)),eq(status,Active))"
         "&select=lines,parameters,subscriptions,product,listing"
     )
 
-    mocked_get_by_query = mocker.patch(
-        "adobe_vipm.flows.mpt.get_agreements_by_query",
-        return_value=[{"id": "AGR-0001"}],
+    mocked_iter_objects = mocker.patch(
+        "adobe_vipm.flows.mpt.iter_objects",
+        return_value=iter([{"id": "AGR-0001"}]),
     )
 
     mocked_client = mocker.MagicMock()
 
-    assert get_agreements_by_ids(mocked_client, ["AGR-0001"]) == [{"id": "AGR-0001"}]
-    mocked_get_by_query.assert_called_once_with(mocked_client, rql_query)
+    assert get_agreements_by_ids(mocked_client, ["AGR-0001", "AGR-0001"]) == [
+        {"id": "AGR-0001"},
+    ]
+    mocked_iter_objects.assert_called_once_with(mocked_client, url)
+
+
+def test_get_agreements_with_details_by_ids(mocker):
+    mocked_iter_objects = mocker.patch(
+        "adobe_vipm.flows.mpt.iter_objects",
+        return_value=iter([{"id": "AGR-0001"}, {"id": "AGR-0002"}]),
+    )
+    mocked_client = mocker.MagicMock()
+
+    assert get_agreements_with_details_by_ids(
+        mocked_client,
+        ["AGR-0001", "AGR-0002", "AGR-0001"],
+    ) == {"AGR-0001": {"id": "AGR-0001"}, "AGR-0002": {"id": "AGR-0002"}}
+    mocked_iter_objects.assert_called_once_with(
+        mocked_client,
+        "/commerce/agreements?in(id,(AGR-0001,AGR-0002))"
+        "&select=seller,buyer,listing,product,subscriptions,licensee",
+    )
+
+
+def test_get_licensees_by_ids(mocker):
+    mocked_iter_objects = mocker.patch(
+        "adobe_vipm.flows.mpt.iter_objects",
+        return_value=iter([{"id": "LC-0001"}]),
+    )
+    mocked_client = mocker.MagicMock()
+
+    assert get_licensees_by_ids(mocked_client, ["LC-0001"]) == {"LC-0001": {"id": "LC-0001"}}
+    mocked_iter_objects.assert_called_once_with(
+        mocked_client,
+        "/accounts/licensees?in(id,(LC-0001))",
+    )
 
 
 def test_get_all_agreements(mocker):
     rql_query = "eq(status,Active))&select=lines,parameters,subscriptions,product,listing"
 
-    mocked_get_by_query = mocker.patch(
-        "adobe_vipm.flows.mpt.get_agreements_by_query",
-        return_value=[{"id": "AGR-0001"}],
+    mocked_iter_by_query = mocker.patch(
+        "adobe_vipm.flows.mpt.iter_agreements_by_query",
+        return_value=iter([{"id": "AGR-0001"}]),
     )
 
     mocked_client = mocker.MagicMock()
 
-    assert get_all_agreements(mocked_client) == [{"id": "AGR-0001"}]
-    mocked_get_by_query.assert_called_once_with(mocked_client, rql_query)
+    assert list(get_all_agreements(mocked_client)) == [{"id": "AGR-0001"}]
+    mocked_iter_by_query.assert_called_once_with(mocked_client, rql_query)
+
+
+@pytest.mark.parametrize(
+    ("url", "family"),
+    [
+        ("https://localhost/v1/commerce/orders/ORD-1/subscriptions", "mpt_orders"),
+        ("https://localhost/v1/commerce/agreements/AGR-1", "mpt_agreements"),
+        ("https://localhost/v1/commerce/subscriptions/SUB-1", "mpt_subscriptions"),
+        ("https://localhost/v1/catalog/products/PRD-1/items", "mpt_catalog"),
+        ("https://localhost/v1/accounts/licensees/LC-1", "mpt"),
+    ],
+)
+def test_get_mpt_endpoint_family(url, family):
+    assert get_mpt_endpoint_family(url) == family
+
+
+def test_mpt_client_circuit_breaker(mpt_client):
+    """
+    Tests the circuit breaker adapter is mounted once, when the MPT client is built.
+    """
+    adapter = mpt_client.get_adapter("https://localhost/v1/commerce/orders")
+    assert isinstance(adapter, MPTCircuitBreakerAdapter)
+    assert adapter.timeout == (10.0, 60.0)
+    assert mpt_client.get_adapter("http://localhost/v1/commerce/orders") is adapter
+
+
+def test_mpt_circuit_breaker_adapter(mocker):
+    """
+    Tests the MPT circuit breaker adapter applies its default timeout and
+    keeps track of both the calls of the endpoint family and the pool usage.
+    """
+    mocked_send = mocker.patch(
+        "swo.mpt.client.base.HTTPAdapter.send",
+        return_value=mocker.MagicMock(status_code=200),
+    )
+    adapter = MPTCircuitBreakerAdapter(timeout=(5.0, 30.0))
+    request = mocker.MagicMock(url="https://localhost/v1/commerce/orders/ORD-1")
+
+    adapter.send(request)
+    adapter.send(request, timeout=1)
+
+    assert mocked_send.call_args_list[0].kwargs["timeout"] == (5.0, 30.0)
+    assert mocked_send.call_args_list[1].kwargs["timeout"] == 1
+    assert get_circuit_breaker("mpt_orders").stats.calls == 2
+    assert adapter.get_pools_stats()["https://localhost:443"]["requests"] == 2
+
+
+def test_mpt_client_concurrent_requests(mpt_client, requests_mocker):
+    """
+    Tests the MPT client can be shared by many threads and keeps track of the
+    utilization of its connection pool through the circuit breaker adapter.
+    """
+    barrier = threading.Barrier(8, timeout=5)
+
+    def get_order(request):
+        barrier.wait()
+        return 200, {}, json.dumps({"id": request.url.rsplit("/", 1)[1]})
+
+    requests_mocker.add_callback(
+        "GET",
+        re.compile(r"https://localhost/v1/commerce/orders/ORD-\d+"),
+        callback=get_order,
+    )
+
+    def get(idx):
+        response = mpt_client.get(f"/commerce/orders/ORD-{idx}")
+        response.raise_for_status()
+        return response.json()["id"]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(get, range(64))) == [f"ORD-{idx}" for idx in range(64)]
+
+    assert mpt_client.get_pools_stats() == {
+        "https://localhost:443": {
+            "maxsize": 36,
+            "requests": 64,
+            "active": 0,
+            "peak": 8,
+            "utilization": 8 / 36,
+        },
+    }
+
+
+def _page(data, offset, limit, total):
+    return {
+        "$meta": {
+            "pagination": {
+                "offset": offset,
+                "limit": limit,
+                "total": total,
+            },
+        },
+        "data": data,
+    }
+
+
+def test_iter_objects(mocker, settings, mpt_client, requests_mocker):
+    """
+    Tests the objects are lazily requested using the configured page size
+    and the next page is prefetched while the current one is consumed.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "MPT_API_PAGE_SIZE": "2",
+    }
+    url = urljoin(mpt_client.base_url, "commerce/agreements?eq(status,Active)")
+    data = [{"id": f"AGR-{idx}"} for idx in range(5)]
+    for offset in range(0, 5, 2):
+        requests_mocker.get(
+            f"{url}&limit=2&offset={offset}",
+            json=_page(data[offset:offset + 2], offset, 2, 5),
+        )
+
+    objects = iter_objects(mpt_client, "/commerce/agreements?eq(status,Active)")
+    assert len(requests_mocker.calls) == 0
+
+    assert next(objects) == data[0]
+    requests_mocker.assert_call_count(f"{url}&limit=2&offset=0", 1)
+    assert [data[0]] + list(objects) == data
+    assert len(requests_mocker.calls) == 3
+
+
+def test_iter_objects_max_page_size(settings, mpt_client, requests_mocker):
+    """
+    Tests the page size is capped to the maximum allowed by the MPT API.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "MPT_API_PAGE_SIZE": "5000",
+    }
+    requests_mocker.get(
+        urljoin(mpt_client.base_url, "commerce/orders?limit=1000&offset=0"),
+        json=_page([{"id": "ORD-1"}], 0, 1000, 1),
+    )
+
+    assert list(iter_objects(mpt_client, "/commerce/orders")) == [{"id": "ORD-1"}]
+
+
+def test_iter_objects_error(mpt_client, requests_mocker, mpt_error_factory):
+    """
+    Tests the errors returned while iterating are raised as MPTAPIError.
+    """
+    url = urljoin(mpt_client.base_url, "commerce/agreements?eq(status,Active)")
+    requests_mocker.get(
+        f"{url}&limit=10&offset=0",
+        json=_page([{"id": "AGR-1"}], 0, 10, 11),
+    )
+    requests_mocker.get(
+        f"{url}&limit=10&offset=10",
+        status=500,
+        json=mpt_error_factory(500, "Internal server error", "Whatever"),
+    )
+
+    objects = iter_objects(mpt_client, "/commerce/agreements?eq(status,Active)")
+    assert next(objects) == {"id": "AGR-1"}
+    with pytest.raises(MPTAPIError):
+        next(objects)
+
+
+def test_iter_objects_parallel(settings, mpt_client, requests_mocker):
+    """
+    Tests the pages following the first one are requested concurrently
+    by the configured number of workers and the objects are returned in order.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "MPT_API_PAGE_SIZE": "2",
+        "MPT_API_PAGINATION_WORKERS": "3",
+    }
+    url = urljoin(mpt_client.base_url, "commerce/agreements?eq(status,Active)")
+    data = [{"id": f"AGR-{idx}"} for idx in range(7)]
+    barrier = threading.Barrier(3, timeout=5)
+
+    def get_page(request):
+        offset = int(parse_qs(urlparse(request.url).query)["offset"][0])
+        if offset:
+            barrier.wait()
+        return 200, {}, json.dumps(_page(data[offset:offset + 2], offset, 2, 7))
+
+    for offset in range(0, 7, 2):
+        requests_mocker.add_callback(
+            "GET",
+            f"{url}&limit=2&offset={offset}",
+            callback=get_page,
+        )
+
+    assert list(iter_objects(mpt_client, "/commerce/agreements?eq(status,Active)")) == data
+    assert len(requests_mocker.calls) == 4
+
+
+def test_iter_objects_served_page_size(settings, mpt_client, requests_mocker):
+    """
+    Tests the offsets of the following pages are computed from the page size
+    served by the MPT API when it is smaller than the requested one.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "MPT_API_PAGE_SIZE": "4",
+    }
+    url = urljoin(mpt_client.base_url, "commerce/orders")
+    data = [{"id": f"ORD-{idx}"} for idx in range(4)]
+    for offset in range(0, 4, 2):
+        requests_mocker.get(
+            f"{url}?limit=4&offset={offset}",
+            json=_page(data[offset:offset + 2], offset, 2, 4),
+        )
+
+    assert list(iter_objects(mpt_client, "/commerce/orders")) == data
+
+
+def test_get_product_items_by_skus_cached(mpt_client, requests_mocker):
+    """
+    Tests only the SKUs which are not in the catalog cache are requested,
+    and the items are returned in the order of the SKUs anyway.
+    """
+    url = urljoin(mpt_client.base_url, "items?and(eq(product.id,PRD-1),in(externalIds.vendor,")
+    items = [{"id": f"ITM-{idx}", "externalIds": {"vendor": f"sku{idx}"}} for idx in range(2)]
+    requests_mocker.get(f"{url}(sku0)))&limit=10&offset=0", json=_page(items[:1], 0, 10, 1))
+    requests_mocker.get(f"{url}(sku1)))&limit=10&offset=0", json=_page(items[1:], 0, 10, 1))
+
+    assert get_product_items_by_skus(mpt_client, "PRD-1", ["sku0"]) == items[:1]
+    assert get_product_items_by_skus(mpt_client, "PRD-1", ["sku1", "sku0"]) == items[::-1]
+    assert get_product_items_by_skus(mpt_client, "PRD-1", ["sku0", "sku1"]) == items
+    assert len(requests_mocker.calls) == 2
+
+
+def test_split_rql_values():
+    assert split_rql_values(["a", "bb", "c", "dddd", "e"], 4) == [
+        ["a", "bb"],
+        ["c"],
+        ["dddd"],
+        ["e"],
+    ]
+    assert split_rql_values([], 4) == []
+
+
+def test_get_objects_by_keys(settings, mocker, mpt_client):
+    """
+    Tests the keys are de-duplicated and split into chunks that fit the maximum
+    length of the absolute url, which are requested concurrently, and the objects
+    are indexed by key.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "MPT_API_MAX_URL_LENGTH": "121",
+    }
+    keys = [f"AGR-{idx:04d}" for idx in range(16)]
+    barrier = threading.Barrier(4, timeout=5)
+    urls = []
+
+    def iter_objects(client, url):
+        urls.append(url)
+        barrier.wait()
+        ids = url.split("(", 2)[2].split(")")[0].split(",")
+        return iter([{"id": obj_id} for obj_id in ids] + [{"id": "AGR-0000", "dup": True}])
+
+    mocker.patch("adobe_vipm.flows.mpt.iter_objects", side_effect=iter_objects)
+
+    objects = get_objects_by_keys(
+        mpt_client,
+        lambda chunk: f"/commerce/agreements?in(id,({chunk}))",
+        keys + keys[:5],
+    )
+
+    assert list(objects) == keys
+    assert objects["AGR-0000"] == {"id": "AGR-0000"}
+    assert len(urls) == 4
+    assert all(len(mpt_client.join_url(url)) + 32 <= 121 for url in urls)
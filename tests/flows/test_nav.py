@@ -1,20 +1,15 @@
 import json
+from datetime import datetime
 
 from freezegun import freeze_time
 from responses import matchers
 
+from adobe_vipm.adobe.dataclasses import APIToken
 from adobe_vipm.flows.nav import get_token, terminate_contract
 
 
 @freeze_time("2024-04-04 12:30:00")
-def test_get_token(mocker, requests_mocker, settings):
-    mocker.patch(
-        "adobe_vipm.flows.nav.os.path.exists",
-        return_value=False,
-    )
-
-    mocked_open = mocker.patch("adobe_vipm.flows.nav.open", mocker.mock_open())
-
+def test_get_token(requests_mocker, settings, token_store):
     settings.EXTENSION_CONFIG = {
         "NAV_AUTH_ENDPOINT_URL": "https://authenticate.nav",
         "NAV_AUTH_CLIENT_ID": "client-id",
@@ -42,41 +37,31 @@ def test_get_token(mocker, requests_mocker, settings):
     )
 
     assert get_token() == (True, "a-token")
-    mocked_open().write.assert_called_once_with(
-        '{"access_token": "a-token", "expires_in": 86400, '
-        '"expires_at": "2024-04-05T12:25:00+00:00"}',
+    assert token_store.get("nav:client-id") == APIToken(
+        "a-token",
+        expires=datetime(2024, 4, 5, 12, 25, 0),
     )
 
 
 @freeze_time("2024-04-04 12:30:00")
-def test_get_token_from_cache(mocker):
-    mocker.patch("adobe_vipm.flows.nav.os.path.exists", return_value=True)
-    mocker.patch(
-        "adobe_vipm.flows.nav.open",
-        mocker.mock_open(
-            read_data=(
-                '{"access_token": "a-token", "expires_in": 86400, '
-                '"expires_at": "2024-04-05T12:25:00+00:00"}'
-            )
-        ),
+def test_get_token_from_cache(settings, token_store):
+    settings.EXTENSION_CONFIG = {
+        "NAV_AUTH_CLIENT_ID": "client-id",
+    }
+    token_store.set(
+        "nav:client-id",
+        APIToken("a-token", expires=datetime(2024, 4, 5, 12, 25, 0)),
     )
 
     assert get_token() == (True, "a-token")
 
 
 @freeze_time("2024-04-04 12:30:00")
-def test_get_token_from_cache_expired(mocker, requests_mocker, settings):
-    mocker.patch("adobe_vipm.flows.nav.os.path.exists", return_value=True)
-    mocker.patch(
-        "adobe_vipm.flows.nav.open",
-        mocker.mock_open(
-            read_data=(
-                '{"access_token": "a-token", "expires_in": 86400, '
-                '"expires_at": "2024-03-05T12:25:00+00:00"}'
-            )
-        ),
+def test_get_token_from_cache_expired(requests_mocker, settings, token_store):
+    token_store.set(
+        "nav:client-id",
+        APIToken("an-expired-token", expires=datetime(2024, 3, 5, 12, 25, 0)),
     )
-    mocked_save_token = mocker.patch("adobe_vipm.flows.nav.save_token_to_disk")
 
     settings.EXTENSION_CONFIG = {
         "NAV_AUTH_ENDPOINT_URL": "https://authenticate.nav",
@@ -105,19 +90,10 @@ def test_get_token_from_cache_expired(mocker, requests_mocker, settings):
     )
 
     assert get_token() == (True, "a-token")
-    mocked_save_token.assert_called_once_with(
-        {
-            "access_token": "a-token",
-            "expires_in": 86400,
-        }
-    )
+    assert token_store.get("nav:client-id").token == "a-token"
 
 
-def test_get_token_error(mocker, requests_mocker, settings):
-    mocker.patch(
-        "adobe_vipm.flows.nav.get_token_from_disk",
-        return_value=None,
-    )
+def test_get_token_error(requests_mocker, settings, token_store):
     settings.EXTENSION_CONFIG = {
         "NAV_AUTH_ENDPOINT_URL": "https://authenticate.nav",
         "NAV_AUTH_CLIENT_ID": "client-id",
@@ -127,6 +103,7 @@ def test_get_token_error(mocker, requests_mocker, settings):
 
     requests_mocker.post("https://authenticate.nav", status=400, body="bad request")
     assert get_token() == (False, "400 - bad request")
+    assert token_store.get("nav:client-id") is None
 
 
 def test_terminate_contract(mocker, requests_mocker, settings):
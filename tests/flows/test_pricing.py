@@ -0,0 +1,143 @@
+from urllib.parse import urljoin
+
+import pytest
+
+from adobe_vipm.flows.catalog import get_catalog_cache
+from adobe_vipm.flows.pricing import (
+    CatalogPrices,
+    PriceMatrix,
+    get_price_matrix,
+    get_sku_with_discount_level,
+    split_sku,
+)
+
+
+def _items(skus):
+    return [
+        {"id": f"ITM-{idx}", "externalIds": {"vendor": sku}}
+        for idx, sku in enumerate(skus)
+    ]
+
+
+def _pricelist_items(prices):
+    return [
+        {"id": f"PRI-{idx}", "item": {"id": f"ITM-{idx}"}, "unitPP": price}
+        for idx, price in enumerate(prices)
+    ]
+
+
+def _page(data):
+    return {
+        "$meta": {"pagination": {"offset": 0, "limit": 10, "total": len(data)}},
+        "data": data,
+    }
+
+
+@pytest.fixture()
+def price_matrix():
+    return PriceMatrix(
+        _items(["65304578CA01A12", "65304578CA02A12", "77777777CA01A12", "88888888CA01A12"]),
+        _pricelist_items([10.5, 9.5, 20.0])
+        + [{"id": "PRI-3", "item": {"id": "ITM-3"}}],
+    )
+
+
+def test_sku_discount_level():
+    assert get_sku_with_discount_level("65304578CA01A12", "03") == "65304578CA03A12"
+    assert split_sku("65304578CA03A12") == ("65304578CAA12", "03")
+
+
+def test_get_price(price_matrix):
+    """
+    Test the prices are looked up by SKU, optionally with another discount level.
+    """
+    assert price_matrix.discount_levels == ["01", "02"]
+    assert len(price_matrix) == 3
+    assert price_matrix.get_price("65304578CA01A12") == 10.5
+    assert price_matrix.get_price("65304578CA01A12", "02") == 9.5
+    assert price_matrix.get_item_ids("65304578CA01A12", "02") == ("ITM-1", "PRI-1")
+    assert price_matrix.get_price("77777777CA01A12", "02") is None
+    assert price_matrix.get_price("88888888CA01A12") is None
+    assert price_matrix.get_item_ids("99999999CA01A12") is None
+    assert price_matrix.get_price("65304578CA03A12") is None
+
+
+def test_reprice(price_matrix):
+    """
+    Test many items are repriced at once preserving their order.
+    """
+    assert price_matrix.reprice(
+        ["77777777CA01A12", "65304578CA01A12", "65304578CA01A12"],
+        ["01", "02", None],
+    ) == [20.0, 9.5, 10.5]
+
+
+def test_empty_matrix():
+    price_matrix = PriceMatrix([], [])
+
+    assert len(price_matrix) == 0
+    assert price_matrix.get_price("65304578CA01A12") is None
+
+
+def test_get_price_matrix(mocker, mpt_client, requests_mocker):
+    """
+    Test the matrix is built once from all the items of the product and of the
+    price list, which are stored into the catalog cache too, and rebuilt once expired.
+    """
+    mocked_monotonic = mocker.patch(
+        "adobe_vipm.flows.pricing.time.monotonic",
+        return_value=100.0,
+    )
+    requests_mocker.get(
+        urljoin(mpt_client.base_url, "items?eq(product.id,PRD-1)&limit=10&offset=0"),
+        json=_page(_items(["65304578CA01A12"])),
+    )
+    requests_mocker.get(
+        urljoin(mpt_client.base_url, "price-lists/PRC-1/items?limit=10&offset=0"),
+        json=_page(_pricelist_items([10.5])),
+    )
+
+    price_matrix = get_price_matrix(mpt_client, "PRD-1", "PRC-1")
+
+    assert price_matrix.get_price("65304578CA01A12") == 10.5
+    assert get_price_matrix(mpt_client, "PRD-1", "PRC-1") is price_matrix
+    assert len(requests_mocker.calls) == 2
+    assert get_catalog_cache().get_pricelist_items("PRC-1", ["ITM-0"])[1] == []
+
+    mocked_monotonic.return_value = 500.0
+    assert get_price_matrix(mpt_client, "PRD-1", "PRC-1") is not price_matrix
+    assert len(requests_mocker.calls) == 4
+
+
+def test_get_price_matrix_cache_disabled(mocker, settings, mpt_client):
+    """
+    Test that if the catalog cache is disabled the prices are looked up item by
+    item instead of loading the whole product and price list.
+    """
+    settings.EXTENSION_CONFIG = {"MPT_CATALOG_CACHE_TTL_SECS": "0"}
+    mocked_get_product_items = mocker.patch(
+        "adobe_vipm.flows.pricing.get_product_items_by_skus",
+        side_effect=lambda client, product_id, skus: [
+            item for item in _items(["65304578CA01A12", "65304578CA02A12"])
+            if item["externalIds"]["vendor"] in skus
+        ],
+    )
+    mocked_get_pricelist_items = mocker.patch(
+        "adobe_vipm.flows.pricing.get_pricelist_items_by_product_items",
+        side_effect=lambda client, pricelist_id, item_ids: [
+            item for item in _pricelist_items([10.5, 9.5]) if item["item"]["id"] in item_ids
+        ],
+    )
+    mocked_iter_objects = mocker.patch("adobe_vipm.flows.pricing.iter_objects")
+
+    prices = get_price_matrix(mpt_client, "PRD-1", "PRC-1")
+
+    assert isinstance(prices, CatalogPrices)
+    assert prices.get_price("65304578CA01A12", "02") == 9.5
+    assert prices.get_item_ids("65304578CA02A12") == ("ITM-1", "PRI-1")
+    assert prices.reprice(["65304578CA01A12", "65304578CA01A12"], [None, "03"]) == [10.5, None]
+    assert mocked_get_product_items.call_count == 3
+    assert mocked_get_pricelist_items.call_count == 2
+    mocked_get_product_items.assert_any_call(mpt_client, "PRD-1", ["65304578CA02A12"])
+    mocked_get_pricelist_items.assert_any_call(mpt_client, "PRC-1", ["ITM-1"])
+    mocked_iter_objects.assert_not_called()
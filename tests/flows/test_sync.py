@@ -3,6 +3,7 @@ import logging
 import pytest
 
 from adobe_vipm.adobe.errors import AdobeAPIError
+from adobe_vipm.flows.pricing import PriceMatrix
 from adobe_vipm.flows.sync import (
     sync_agreement_prices,
     sync_agreements_by_agreement_ids,
@@ -53,20 +54,14 @@ def test_sync_agreement_prices(
         return_value=mpt_subscription,
     )
 
-    mocker.patch(
-        "adobe_vipm.flows.sync.get_product_items_by_skus",
-        side_effect=[items_factory(), items_factory(item_id=2, external_vendor_id="77777777CA")],
-    )
-    mocker.patch(
-        "adobe_vipm.flows.sync.get_pricelist_items_by_product_items",
-        side_effect=[
-            pricelist_items_factory(),
-            pricelist_items_factory(
-                item_id=2,
-                external_vendor_id="77777777CA",
-                unit_purchase_price=20.22,
-            ),
-        ]
+    mocked_get_price_matrix = mocker.patch(
+        "adobe_vipm.flows.sync.get_price_matrix",
+        return_value=PriceMatrix(
+            items_factory(external_vendor_id="65304578CA01A12")
+            + items_factory(item_id=2, external_vendor_id="77777777CA01A12"),
+            pricelist_items_factory()
+            + pricelist_items_factory(item_id=2, unit_purchase_price=20.22),
+        ),
     )
 
     mocked_update_agreement_subscription = mocker.patch(
@@ -79,6 +74,12 @@ def test_sync_agreement_prices(
 
     sync_agreement_prices(mocked_mpt_client, agreement, False, False)
 
+    mocked_get_price_matrix.assert_called_once_with(
+        mocked_mpt_client,
+        agreement["product"]["id"],
+        agreement["listing"]["priceList"]["id"],
+    )
+
     mocked_get_agreement_subscription.assert_called_once_with(
         mocked_mpt_client,
         mpt_subscription["id"],
@@ -151,19 +152,13 @@ def test_sync_agreement_prices_dry_run(
     )
 
     mocker.patch(
-        "adobe_vipm.flows.sync.get_product_items_by_skus",
-        side_effect=[items_factory(), items_factory(item_id=2, external_vendor_id="77777777CA")],
-    )
-    mocker.patch(
-        "adobe_vipm.flows.sync.get_pricelist_items_by_product_items",
-        side_effect=[
-            pricelist_items_factory(),
-            pricelist_items_factory(
-                item_id=2,
-                external_vendor_id="77777777CA",
-                unit_purchase_price=20.22,
-            ),
-        ]
+        "adobe_vipm.flows.sync.get_price_matrix",
+        return_value=PriceMatrix(
+            items_factory(external_vendor_id="65304578CA01A12")
+            + items_factory(item_id=2, external_vendor_id="77777777CA01A12"),
+            pricelist_items_factory()
+            + pricelist_items_factory(item_id=2, unit_purchase_price=20.22),
+        ),
     )
 
     mocked_update_agreement_subscription = mocker.patch(
@@ -242,6 +237,67 @@ def test_sync_agreement_prices_exception(
     mocked_update_agreement.assert_not_called()
 
 
+def test_sync_agreement_prices_missing_price(
+    mocker,
+    agreement_factory,
+    subscriptions_factory,
+    lines_factory,
+    adobe_subscription_factory,
+    items_factory,
+    pricelist_items_factory,
+    adobe_customer_factory,
+    caplog,
+):
+    """
+    Tests that an agreement is skipped, without updating any of its subscriptions,
+    when the price list has no price for one of its lines.
+    """
+    agreement = agreement_factory(
+        lines=lines_factory(
+            external_vendor_id="77777777CA",
+            unit_purchase_price=10.11,
+        )
+    )
+    mpt_subscription = subscriptions_factory()[0]
+
+    mocked_adobe_client = mocker.MagicMock()
+    mocked_adobe_client.get_subscription.return_value = adobe_subscription_factory()
+    mocked_adobe_client.get_customer.return_value = adobe_customer_factory()
+    mocker.patch(
+        "adobe_vipm.flows.sync.get_adobe_client",
+        return_value=mocked_adobe_client,
+    )
+    mocker.patch(
+        "adobe_vipm.flows.sync.get_agreement_subscription",
+        return_value=mpt_subscription,
+    )
+    mocker.patch(
+        "adobe_vipm.flows.sync.get_price_matrix",
+        return_value=PriceMatrix(
+            items_factory(external_vendor_id="65304578CA01A12")
+            + items_factory(item_id=2, external_vendor_id="77777777CA01A12"),
+            pricelist_items_factory(),
+        ),
+    )
+    mocked_update_agreement_subscription = mocker.patch(
+        "adobe_vipm.flows.sync.update_agreement_subscription",
+    )
+    mocked_update_agreement = mocker.patch(
+        "adobe_vipm.flows.sync.update_agreement",
+    )
+
+    with caplog.at_level(logging.ERROR):
+        sync_agreement_prices(mocker.MagicMock(), agreement, False, False)
+
+    assert caplog.records[0].message == (
+        f"Price list {agreement['listing']['priceList']['id']} has no price for "
+        f"77777777CA01A12, skip agreement {agreement['id']}"
+    )
+    assert caplog.records[0].exc_info is None
+    mocked_update_agreement_subscription.assert_not_called()
+    mocked_update_agreement.assert_not_called()
+
+
 def test_sync_agreement_prices_skip_processing(
     mocker,
     agreement_factory,
@@ -0,0 +1,309 @@
+import threading
+import time
+
+import pytest
+from swo.mpt.extensions.core.events import Event
+from swo.mpt.extensions.core.events.registry import EventsRegistry
+from swo.mpt.extensions.runtime.events.dispatcher import Dispatcher
+from swo.mpt.extensions.runtime.events.scheduler import BackoffScheduler
+
+
+@pytest.fixture()
+def listener_calls():
+    return []
+
+
+@pytest.fixture()
+def release_listener():
+    release = threading.Event()
+    yield release
+    release.set()
+
+
+@pytest.fixture()
+def dispatcher(mocker, settings, listener_calls, release_listener):
+    """
+    A running Dispatcher with a single worker and room for a single event,
+    which listener blocks until `release_listener` is set.
+    """
+    settings.MPT_DISPATCHER_MAX_WORKERS = 1
+    settings.MPT_DISPATCHER_QUEUE_MAXSIZE = 1
+    settings.MPT_DISPATCHER_SCHEDULING_POLICY = (
+        "swo.mpt.extensions.runtime.events.policies.FifoPolicy"
+    )
+    registry = EventsRegistry()
+
+    @registry.listener("orders")
+    def process_order(client, event):
+        listener_calls.append(event)
+        release_listener.wait(5)
+
+    mocker.patch(
+        "swo.mpt.extensions.runtime.events.dispatcher.get_events_registry",
+        return_value=registry,
+    )
+    mocker.patch("swo.mpt.extensions.runtime.events.dispatcher.setup_client")
+    dispatcher = Dispatcher()
+    dispatcher.start()
+    yield dispatcher
+    release_listener.set()
+    if dispatcher.running:
+        dispatcher.stop()
+    dispatcher.executor.shutdown()
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def _fill(dispatcher, listener_calls):
+    """
+    Keeps the worker busy with ORD-1 and queues ORD-2 so the queue is full.
+    """
+    assert dispatcher.dispatch_event(Event("ORD-1", "orders", {}))
+    _wait_for(lambda: listener_calls)
+    assert dispatcher.dispatch_event(Event("ORD-2", "orders", {}))
+    assert dispatcher.full
+
+
+def _dispatch_in_background(dispatcher, event):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(dispatcher.dispatch_event(event)))
+    thread.start()
+    return thread, results
+
+
+def test_dispatch_event(dispatcher, listener_calls, release_listener):
+    """
+    Test the dispatched events are processed in the order they have been
+    dispatched as soon as the worker is free.
+    """
+    release_listener.set()
+
+    dispatcher.dispatch_event(Event("ORD-1", "orders", {}))
+    dispatcher.dispatch_event(Event("ORD-2", "orders", {}))
+
+    _wait_for(lambda: len(listener_calls) == 2)
+    assert [event.id for event in listener_calls] == ["ORD-1", "ORD-2"]
+
+
+def test_dispatch_event_not_supported(dispatcher, listener_calls):
+    """
+    Test the events without listener are not queued.
+    """
+    dispatcher.dispatch_event(Event("AGR-1", "agreements", {}))
+
+    assert len(dispatcher.queue) == 0
+    assert listener_calls == []
+
+
+def test_stop_idle(dispatcher):
+    """
+    Test an idle dispatcher is woken up and stops right away.
+    """
+    started_at = time.monotonic()
+    dispatcher.stop()
+
+    assert not dispatcher.processor.is_alive()
+    assert time.monotonic() - started_at < 1
+
+
+def test_dispatch_event_timeout(dispatcher, listener_calls):
+    """
+    Test an event is not queued if the queue is still full once the timeout expired.
+    """
+    _fill(dispatcher, listener_calls)
+
+    started_at = time.monotonic()
+    assert dispatcher.dispatch_event(Event("ORD-3", "orders", {}), timeout=0.1) is False
+    assert time.monotonic() - started_at >= 0.1
+    assert len(dispatcher.queue) == 1
+
+
+def test_dispatch_event_blocks_while_full(dispatcher, listener_calls, release_listener):
+    """
+    Test the producers are blocked while the queue is full and resumed once
+    the processing of the queued events makes room.
+    """
+    _fill(dispatcher, listener_calls)
+
+    thread, results = _dispatch_in_background(dispatcher, Event("ORD-3", "orders", {}))
+    thread.join(0.2)
+    assert thread.is_alive()
+
+    release_listener.set()
+    thread.join(5)
+
+    assert results == [True]
+    _wait_for(lambda: len(listener_calls) == 3)
+    assert [event.id for event in listener_calls] == ["ORD-1", "ORD-2", "ORD-3"]
+
+
+def test_stop_releases_waiting_producers(dispatcher, listener_calls):
+    """
+    Test the producers waiting for room in the queue are released when the
+    dispatcher is stopped.
+    """
+    _fill(dispatcher, listener_calls)
+    thread, results = _dispatch_in_background(dispatcher, Event("ORD-3", "orders", {}))
+    thread.join(0.2)
+
+    dispatcher.stop()
+    thread.join(5)
+
+    assert results == [False]
+
+
+def test_queued_event_is_replaced(dispatcher, listener_calls, release_listener):
+    """
+    Test a newer event replaces the queued one with the same id, without
+    waiting for room in the queue.
+    """
+    _fill(dispatcher, listener_calls)
+
+    assert dispatcher.dispatch_event(Event("ORD-2", "orders", {"version": 2}), timeout=0)
+    assert len(dispatcher.queue) == 1
+
+    release_listener.set()
+    _wait_for(lambda: len(listener_calls) == 2)
+    assert listener_calls[1].data == {"version": 2}
+
+
+def test_processing_event_is_parked(dispatcher, listener_calls, release_listener):
+    """
+    Test the events of an object that is processing are parked, the newest one
+    replacing the others, and processed once the processing event has completed.
+    """
+    dispatcher.dispatch_event(Event("ORD-1", "orders", {"version": 1}))
+    _wait_for(lambda: listener_calls)
+
+    assert dispatcher.dispatch_event(Event("ORD-1", "orders", {"version": 2}), timeout=0)
+    assert dispatcher.dispatch_event(Event("ORD-1", "orders", {"version": 3}), timeout=0)
+    assert len(dispatcher.queue) == 0
+    assert dispatcher.parked[("orders", "ORD-1")].data == {"version": 3}
+
+    release_listener.set()
+    _wait_for(lambda: len(listener_calls) == 2)
+    assert listener_calls[1].data == {"version": 3}
+
+
+def test_queued_event_held_once_popped(mocker, dispatcher, listener_calls, release_listener):
+    """
+    Test a queued event is held when it is popped if its object has been
+    processed since the event has been queued.
+    """
+    mocker.patch(
+        "swo.mpt.extensions.runtime.events.scheduler.get_attempt",
+        return_value=1,
+    )
+    dispatcher.scheduler = BackoffScheduler(60, 3600, max_age=120, jitter=0)
+    _fill(dispatcher, listener_calls)
+    dispatcher.scheduler.completed(("orders", "ORD-2"), time.monotonic())
+
+    release_listener.set()
+    _wait_for(lambda: not dispatcher.futures)
+
+    assert [event.id for event in listener_calls] == ["ORD-1"]
+    assert ("orders", "ORD-2") in dispatcher.scheduler.delayed
+
+
+def test_get_progressed_at_idle(mocker, dispatcher):
+    """
+    Test an idle dispatcher is always making progress.
+    """
+    mocker.patch(
+        "swo.mpt.extensions.runtime.events.dispatcher.time.time",
+        return_value=1000.0,
+    )
+    dispatcher.progressed_at = 10.0
+
+    assert dispatcher.get_progressed_at() == 1000.0
+
+
+def test_get_progressed_at_busy(dispatcher, listener_calls, release_listener):
+    """
+    Test the progress of a busy dispatcher is the last time an event has
+    been submitted or has completed.
+    """
+    _fill(dispatcher, listener_calls)
+    submitted_at = dispatcher.progressed_at
+    time.sleep(0.05)
+
+    assert dispatcher.get_progressed_at() == submitted_at
+
+    release_listener.set()
+    _wait_for(lambda: len(listener_calls) == 2)
+    assert dispatcher.get_progressed_at() > submitted_at
+
+
+def test_dispatch_event_when_idle_is_progress(mocker, dispatcher, listener_calls):
+    """
+    Test the progress is reset when an idle dispatcher gets an event, so a
+    long idle time is not taken for a lack of progress.
+    """
+    dispatcher.progressed_at = 10.0
+
+    assert dispatcher.dispatch_event(Event("ORD-1", "orders", {}))
+
+    assert dispatcher.progressed_at > 10.0
+
+
+def test_admitted_events_are_enriched(dispatcher, listener_calls, release_listener):
+    """
+    Test the events are enriched right before being processed, so the parked
+    ones are enriched only once they are taken from the queue.
+    """
+    enriched = []
+
+    @dispatcher.registry.enricher("orders")
+    def enrich_orders(client, events):
+        enriched.append([event.data["version"] for event in events])
+        for event in events:
+            event.context["enriched"] = True
+
+    dispatcher.dispatch_event(Event("ORD-1", "orders", {"version": 1}))
+    _wait_for(lambda: listener_calls)
+    assert dispatcher.dispatch_event(Event("ORD-1", "orders", {"version": 2}), timeout=0)
+
+    assert enriched == [[1]]
+
+    release_listener.set()
+    _wait_for(lambda: len(listener_calls) == 2)
+    assert enriched == [[1], [2]]
+    assert all(event.context == {"enriched": True} for event in listener_calls)
+
+
+def test_held_events_are_not_enriched(mocker, dispatcher, listener_calls, release_listener):
+    """
+    Test the events held once popped are not enriched.
+    """
+    enrich_orders = mocker.MagicMock()
+    dispatcher.registry.enricher("orders")(enrich_orders)
+    mocker.patch(
+        "swo.mpt.extensions.runtime.events.scheduler.get_attempt",
+        return_value=1,
+    )
+    dispatcher.scheduler = BackoffScheduler(60, 3600, max_age=120, jitter=0)
+    _fill(dispatcher, listener_calls)
+    dispatcher.scheduler.completed(("orders", "ORD-2"), time.monotonic())
+
+    release_listener.set()
+    _wait_for(lambda: not dispatcher.futures)
+
+    enrich_orders.assert_called_once_with(dispatcher.client, [listener_calls[0]])
+
+
+def test_enrich_error(mocker, dispatcher, listener_calls, release_listener):
+    """
+    Test the events are processed even if they cannot be enriched.
+    """
+    dispatcher.registry.enricher("orders")(mocker.MagicMock(side_effect=RuntimeError()))
+    release_listener.set()
+
+    dispatcher.dispatch_event(Event("ORD-1", "orders", {}))
+
+    _wait_for(lambda: listener_calls)
+    assert listener_calls[0].context == {}
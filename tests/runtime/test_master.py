@@ -0,0 +1,97 @@
+import multiprocessing
+
+import pytest
+from swo.mpt.extensions.runtime.master import Master
+from swo.mpt.extensions.runtime.workers import start_event_consumer, start_gunicorn
+
+
+@pytest.fixture()
+def master_factory():
+    def _master(**options):
+        # bypass __init__, which watches the files and handles the signals
+        master = Master.__new__(Master)
+        master.options = options
+        master.heartbeats = {}
+        master.liveness_timeout = 600
+        master.drain_timeout = 60
+        return master
+
+    return _master
+
+
+def test_get_targets(master_factory):
+    """
+    Test a single event consumer process is started by default.
+    """
+    master = master_factory(color=True)
+
+    assert master.get_targets() == {
+        "event-consumer": (start_event_consumer, {"color": True}),
+        "gunicorn": (start_gunicorn, {"color": True}),
+    }
+
+
+def test_get_targets_sharded(master_factory):
+    """
+    Test an event consumer process is started for every shard.
+    """
+    master = master_factory(consumers=3)
+
+    targets = master.get_targets()
+
+    assert list(targets) == [
+        "event-consumer-0",
+        "event-consumer-1",
+        "event-consumer-2",
+        "gunicorn",
+    ]
+    assert targets["event-consumer-1"] == (
+        start_event_consumer,
+        {"consumers": 3, "shard": 1, "shards": 3},
+    )
+    assert targets["gunicorn"] == (start_gunicorn, {"consumers": 3})
+
+
+@pytest.mark.parametrize(
+    ("heartbeat", "expected"),
+    [
+        (9500.0, False),
+        (9400.0, False),
+        (9399.0, True),
+    ],
+)
+def test_is_stuck(mocker, master_factory, heartbeat, expected):
+    """
+    Test a process is stuck once its heartbeat is older than the liveness timeout.
+    """
+    mocker.patch("swo.mpt.extensions.runtime.master.time.time", return_value=10000.0)
+    master = master_factory()
+    master.heartbeats["event-consumer"] = multiprocessing.Value("d", heartbeat)
+
+    assert master.is_stuck("event-consumer") is expected
+
+
+def test_is_stuck_without_heartbeat(mocker, master_factory):
+    """
+    Test the processes without heartbeat are never stuck.
+    """
+    mocker.patch("swo.mpt.extensions.runtime.master.time.time", return_value=10000.0)
+
+    assert master_factory().is_stuck("gunicorn") is False
+
+
+def test_stop_worker_process(mocker, master_factory):
+    """
+    Test the event consumer processes are given the drain timeout to complete
+    their events before being killed, the other processes are not.
+    """
+    master = master_factory()
+    master.heartbeats["event-consumer"] = multiprocessing.Value("d", 0.0)
+    consumer = mocker.MagicMock()
+    web = mocker.MagicMock()
+
+    master.stop_worker_process("event-consumer", consumer)
+    master.stop_worker_process("gunicorn", web)
+
+    consumer.stop.assert_called_once_with(sigint_timeout=60, sigkill_timeout=1)
+    web.stop.assert_called_once_with(sigint_timeout=5, sigkill_timeout=1)
@@ -0,0 +1,97 @@
+from swo.mpt.extensions.core.events import Event
+from swo.mpt.extensions.runtime.events.policies import (
+    FairPriorityPolicy,
+    FifoPolicy,
+    get_scheduling_policy,
+)
+
+
+def _event(event_id, **data):
+    return Event(event_id, "orders", data)
+
+
+def test_fifo_policy_replaces_queued_event():
+    """
+    Test a newer event replaces the queued one with the same id keeping its position.
+    """
+    policy = FifoPolicy()
+    policy.push(_event("ORD-1", version=1))
+    policy.push(_event("ORD-2"))
+    policy.push(_event("ORD-1", version=2))
+    policy.push(_event("ORD-3"), first=True)
+
+    assert len(policy) == 3
+    assert ("orders", "ORD-1") in policy
+    assert [(event.id, event.data) for event in iter(policy.pop, None)] == [
+        ("ORD-3", {}),
+        ("ORD-1", {"version": 2}),
+        ("ORD-2", {}),
+    ]
+    assert len(policy) == 0
+
+
+def test_fair_priority_policy_replaces_queued_event():
+    """
+    Test a newer event replaces the queued one with the same id keeping its position.
+    """
+    policy = FairPriorityPolicy(
+        priority=lambda event: event.data.get("priority", 0),
+        fairness_key=lambda event: event.data.get("customer", "a-customer"),
+    )
+    policy.push(_event("ORD-1", version=1))
+    policy.push(_event("ORD-2", customer="another-customer"))
+    policy.push(_event("ORD-1", version=2))
+
+    assert len(policy) == 2
+    assert [(event.id, event.data.get("version")) for event in iter(policy.pop, None)] == [
+        ("ORD-1", 2),
+        ("ORD-2", None),
+    ]
+    assert ("orders", "ORD-1") not in policy
+
+
+def test_fair_priority_policy_refiles_replaced_event():
+    """
+    Test a newer event with another priority or fairness key than the queued one
+    is filed under its own priority and key.
+    """
+    policy = FairPriorityPolicy(
+        priority=lambda event: event.data.get("priority", 1),
+        fairness_key=lambda event: event.data.get("customer", "a-customer"),
+    )
+    policy.push(_event("ORD-1", priority=2))
+    policy.push(_event("ORD-2", priority=1))
+    policy.push(_event("ORD-3", priority=1, customer="another-customer"))
+    policy.push(_event("ORD-1", priority=0, customer="another-customer"))
+
+    assert len(policy) == 3
+    assert 2 not in policy.classes
+    assert [event.id for event in iter(policy.pop, None)] == ["ORD-1", "ORD-2", "ORD-3"]
+    assert policy.classes == {}
+
+
+def test_get_scheduling_policy(settings):
+    """
+    Test the policy is built by the configured factory.
+    """
+    settings.MPT_DISPATCHER_SCHEDULING_POLICY = (
+        "swo.mpt.extensions.runtime.events.policies.FifoPolicy"
+    )
+
+    assert isinstance(get_scheduling_policy(), FifoPolicy)
+
+
+def test_get_scheduling_policy_import_error(mocker, settings):
+    """
+    Test a policy that cannot be imported falls back to FIFO with a warning.
+    """
+    mocked_logger = mocker.patch("swo.mpt.extensions.runtime.events.policies.logger")
+    settings.MPT_DISPATCHER_SCHEDULING_POLICY = "not.a.module.get_policy"
+
+    policy = get_scheduling_policy()
+
+    assert isinstance(policy, FifoPolicy)
+    mocked_logger.warning.assert_called_once_with(
+        "Cannot import the scheduling policy not.a.module.get_policy, fall back to FIFO",
+        exc_info=True,
+    )
@@ -0,0 +1,187 @@
+import pytest
+from swo.mpt.extensions.core.events import Event
+from swo.mpt.extensions.runtime.events.producers import (
+    OrderEventProducer,
+    OrdersTracker,
+    get_shard_suffixes,
+)
+
+
+@pytest.fixture()
+def mocked_monotonic(mocker):
+    return mocker.patch(
+        "swo.mpt.extensions.runtime.events.producers.time.monotonic",
+        return_value=100.0,
+    )
+
+
+@pytest.fixture(autouse=True)
+def mocked_get_attempt(mocker):
+    return mocker.patch(
+        "swo.mpt.extensions.runtime.events.producers.get_attempt",
+        side_effect=lambda event: event.data.get("attempt", 0),
+    )
+
+
+def _order_event(order_id, updated_at="2024-01-01T10:00:00Z", attempt=0):
+    audit = {"created": {"at": "2024-01-01T09:00:00Z"}}
+    if updated_at is not None:
+        audit["updated"] = {"at": updated_at}
+    return Event(order_id, "orders", {"id": order_id, "audit": audit, "attempt": attempt})
+
+
+def _ids(events):
+    return [event.id for event in events]
+
+
+def test_orders_tracker_select_new_and_changed(mocked_monotonic):
+    """
+    Test new orders and orders changed since they were dispatched are selected,
+    while unchanged orders and orders which only got a new attempt are not.
+    """
+    tracker = OrdersTracker(recheck_interval=300)
+
+    assert _ids(
+        tracker.select([_order_event("ORD-1"), _order_event("ORD-2"), _order_event("ORD-3")]),
+    ) == ["ORD-1", "ORD-2", "ORD-3"]
+
+    mocked_monotonic.return_value = 130.0
+    assert _ids(
+        tracker.select(
+            [
+                _order_event("ORD-1"),
+                _order_event("ORD-2", updated_at="2024-01-01T10:05:00Z"),
+                _order_event("ORD-3", updated_at="2024-01-01T10:05:00Z", attempt=1),
+                _order_event("ORD-4"),
+            ],
+        ),
+    ) == ["ORD-2", "ORD-4"]
+
+
+def test_orders_tracker_select_recheck_interval(mocked_monotonic):
+    """
+    Test unchanged orders are selected again once every recheck interval.
+    """
+    tracker = OrdersTracker(recheck_interval=300)
+    tracker.select([_order_event("ORD-1")])
+
+    mocked_monotonic.return_value = 399.0
+    assert tracker.select([_order_event("ORD-1", attempt=1)]) == []
+
+    mocked_monotonic.return_value = 400.0
+    assert _ids(tracker.select([_order_event("ORD-1", attempt=1)])) == ["ORD-1"]
+
+    mocked_monotonic.return_value = 600.0
+    assert tracker.select([_order_event("ORD-1", attempt=1)]) == []
+
+
+def test_orders_tracker_forgets_orders_not_processing(mocked_monotonic):
+    """
+    Test the orders that are not processing anymore are forgotten.
+    """
+    tracker = OrdersTracker(recheck_interval=300)
+    tracker.select([_order_event("ORD-1"), _order_event("ORD-2")])
+
+    tracker.select([_order_event("ORD-2")])
+
+    assert list(tracker.orders) == ["ORD-2"]
+    assert _ids(tracker.select([_order_event("ORD-1"), _order_event("ORD-2")])) == ["ORD-1"]
+
+
+def test_orders_tracker_forget_postponed(mocked_monotonic):
+    """
+    Test the orders postponed by the dispatcher are selected again at the next cycle.
+    """
+    tracker = OrdersTracker(recheck_interval=300)
+    events = tracker.select([_order_event("ORD-1"), _order_event("ORD-2")])
+
+    tracker.forget(events[1:])
+
+    assert _ids(tracker.select([_order_event("ORD-1"), _order_event("ORD-2")])) == ["ORD-2"]
+
+
+def test_orders_tracker_never_updated(mocked_monotonic):
+    """
+    Test the orders that have never been updated (audit.updated is null)
+    are tracked and selected once they are updated.
+    """
+    tracker = OrdersTracker(recheck_interval=300)
+    never_updated = _order_event("ORD-1", updated_at=None)
+    never_updated.data["audit"]["updated"] = None
+
+    assert _ids(tracker.select([never_updated, Event("ORD-2", "orders", {})])) == [
+        "ORD-1",
+        "ORD-2",
+    ]
+    assert tracker.select([never_updated, Event("ORD-2", "orders", {})]) == []
+    assert _ids(tracker.select([_order_event("ORD-1")])) == ["ORD-1"]
+
+
+@pytest.mark.parametrize(
+    ("shards", "digits"),
+    [(1, 1), (2, 1), (3, 2), (5, 1), (7, 2), (10, 1), (100, 2)],
+)
+def test_get_shard_suffixes(shards, digits):
+    """
+    Test every key belongs to exactly one shard, and the keys are spread
+    evenly across the shards.
+    """
+    suffixes = [get_shard_suffixes(shard, shards) for shard in range(shards)]
+
+    flattened = [suffix for shard_suffixes in suffixes for suffix in shard_suffixes]
+    assert sorted(flattened) == [f"{suffix:0{digits}d}" for suffix in range(10**digits)]
+    sizes = [len(shard_suffixes) for shard_suffixes in suffixes]
+    assert max(sizes) - min(sizes) <= 1
+
+
+def test_get_processing_orders_sharded(mocker, settings):
+    """
+    Test a consumer process retrieves only the orders of its shard.
+    """
+    settings.MPT_PRODUCTS_IDS = ["PRD-1111-1111"]
+    mocker.patch("swo.mpt.extensions.runtime.events.producers.setup_client")
+    mocked_paginate = mocker.patch(
+        "swo.mpt.extensions.runtime.events.producers.paginate",
+        return_value=iter([{"id": "ORD-1"}]),
+    )
+    producer = OrderEventProducer(mocker.MagicMock(), shard=1, shards=5)
+
+    assert producer.get_processing_orders() == [{"id": "ORD-1"}]
+    assert mocked_paginate.call_args.args[1] == (
+        "/commerce/orders?and(in(agreement.product.id,(PRD-1111-1111)),eq(status,processing),"
+        "or(like(agreement.id,*1),like(agreement.id,*6)))"
+        "&select=audit,parameters,lines,subscriptions,subscriptions.lines&order=audit.created.at"
+    )
+
+
+def test_get_processing_orders_single_shard(mocker, settings):
+    """
+    Test a single consumer process retrieves all the orders.
+    """
+    settings.MPT_PRODUCTS_IDS = ["PRD-1111-1111"]
+    mocker.patch("swo.mpt.extensions.runtime.events.producers.setup_client")
+    mocked_paginate = mocker.patch(
+        "swo.mpt.extensions.runtime.events.producers.paginate",
+        return_value=iter([]),
+    )
+
+    OrderEventProducer(mocker.MagicMock()).get_processing_orders()
+
+    assert mocked_paginate.call_args.args[1].startswith(
+        "/commerce/orders?and(in(agreement.product.id,(PRD-1111-1111)),eq(status,processing))&",
+    )
+
+
+def test_beat(mocker):
+    """
+    Test the heartbeat is updated with the last progress of the dispatcher.
+    """
+    mocker.patch("swo.mpt.extensions.runtime.events.producers.setup_client")
+    dispatcher = mocker.MagicMock()
+    dispatcher.get_progressed_at.return_value = 1234.0
+    heartbeat = mocker.MagicMock(value=0.0)
+    producer = OrderEventProducer(dispatcher, heartbeat=heartbeat)
+
+    producer.beat()
+
+    assert heartbeat.value == 1234.0
@@ -0,0 +1,177 @@
+import pytest
+from swo.mpt.extensions.core.events import Event
+from swo.mpt.extensions.runtime.events.scheduler import BackoffScheduler
+
+
+@pytest.fixture()
+def attempts(mocker):
+    """
+    The processing attempts of the events, by event id.
+    """
+    attempts = {}
+    mocker.patch(
+        "swo.mpt.extensions.runtime.events.scheduler.get_attempt",
+        side_effect=lambda event: attempts.get(event.id, 0),
+    )
+    return attempts
+
+
+@pytest.fixture()
+def scheduler():
+    return BackoffScheduler(10, 100, max_age=60, jitter=0)
+
+
+@pytest.mark.parametrize(
+    ("attempt", "expected_delay"),
+    [
+        (0, 0),
+        (1, 10),
+        (2, 20),
+        (4, 80),
+        (5, 100),
+        (10, 100),
+    ],
+)
+def test_get_delay(scheduler, attempt, expected_delay):
+    """
+    Test the delay doubles at every attempt up to the maximum delay.
+    """
+    assert scheduler.get_delay(attempt) == expected_delay
+
+
+def test_hold_never_processed(scheduler, attempts):
+    """
+    Test the events of an object that has never been processed are not held.
+    """
+    attempts["ORD-1"] = 3
+
+    assert scheduler.hold(Event("ORD-1", "orders", {}), now=1000) is False
+    assert scheduler.get_next_due() is None
+
+
+def test_hold_first_attempt(scheduler, attempts):
+    """
+    Test the events which have not been processed yet are not held.
+    """
+    scheduler.completed(("orders", "ORD-1"), now=1000)
+
+    assert scheduler.hold(Event("ORD-1", "orders", {}), now=1001) is False
+
+
+def test_hold_not_due(scheduler, attempts):
+    """
+    Test an event is held until the delay of its attempt has elapsed since the
+    last processing of its object.
+    """
+    attempts["ORD-1"] = 2
+    scheduler.completed(("orders", "ORD-1"), now=1000)
+
+    assert scheduler.hold(Event("ORD-1", "orders", {}), now=1010) is True
+    assert scheduler.get_next_due() == 1020
+    assert scheduler.pop_due(now=1019) == []
+
+
+def test_hold_due(scheduler, attempts):
+    """
+    Test an event is not held once the delay of its attempt has elapsed.
+    """
+    attempts["ORD-1"] = 2
+    scheduler.completed(("orders", "ORD-1"), now=1000)
+
+    assert scheduler.hold(Event("ORD-1", "orders", {}), now=1020) is False
+
+
+def test_hold_replaces_held_event(scheduler, attempts):
+    """
+    Test a newer event replaces the held one, its due time being computed
+    from its own attempt.
+    """
+    attempts["ORD-1"] = 1
+    scheduler.completed(("orders", "ORD-1"), now=1000)
+    scheduler.hold(Event("ORD-1", "orders", {"version": 1}), now=1001)
+
+    attempts["ORD-1"] = 3
+    assert scheduler.hold(Event("ORD-1", "orders", {"version": 2}), now=1005) is True
+
+    assert scheduler.get_next_due() == 1040
+    assert scheduler.pop_due(now=1010) == []
+    assert [event.data for event in scheduler.pop_due(now=1040)] == [{"version": 2}]
+    assert scheduler.get_next_due() is None
+
+
+def test_hold_releases_held_event(scheduler, attempts):
+    """
+    Test a held event is released if it is replaced by an event which attempt
+    has been reset.
+    """
+    attempts["ORD-1"] = 2
+    scheduler.completed(("orders", "ORD-1"), now=1000)
+    scheduler.hold(Event("ORD-1", "orders", {"version": 1}), now=1001)
+
+    attempts["ORD-1"] = 0
+    assert scheduler.hold(Event("ORD-1", "orders", {"version": 2}), now=1005) is False
+
+    assert scheduler.delayed == {}
+    assert scheduler.get_next_due() is None
+    assert scheduler.pop_due(now=1020) == []
+
+
+def test_pop_due(scheduler, attempts):
+    """
+    Test the due events are returned in order of due time, the others are
+    still held.
+    """
+    attempts.update({"ORD-1": 2, "ORD-2": 1, "ORD-3": 4})
+    for order_id in ("ORD-1", "ORD-2", "ORD-3"):
+        scheduler.completed(("orders", order_id), now=1000)
+        scheduler.hold(Event(order_id, "orders", {}), now=1001)
+
+    assert [event.id for event in scheduler.pop_due(now=1030)] == ["ORD-2", "ORD-1"]
+    assert scheduler.get_next_due() == 1080
+
+
+def test_pop_due_drops_stale_events(scheduler, attempts):
+    """
+    Test the held events which have not been replaced for more than the
+    maximum age are dropped once due.
+    """
+    attempts["ORD-1"] = 5
+    scheduler.completed(("orders", "ORD-1"), now=1000)
+    scheduler.hold(Event("ORD-1", "orders", {}), now=1001)
+
+    assert scheduler.pop_due(now=1100) == []
+    assert scheduler.get_next_due() is None
+
+
+def test_completed_forgets_old_objects(scheduler, attempts):
+    """
+    Test the objects which last processing is older than the maximum delay
+    are forgotten, the last processing of the others being updated.
+    """
+    scheduler.completed(("orders", "ORD-1"), now=1000)
+    scheduler.completed(("orders", "ORD-2"), now=1050)
+    scheduler.completed(("orders", "ORD-1"), now=1060)
+    scheduler.completed(("orders", "ORD-3"), now=1151)
+
+    assert list(scheduler.last_runs) == [("orders", "ORD-1"), ("orders", "ORD-3")]
+    assert scheduler.last_runs[("orders", "ORD-1")] == (1060, 1)
+
+
+def test_completed_draws_jitter(mocker, attempts):
+    """
+    Test the jitter is drawn once the processing has completed, so an event
+    that has been held is still due when it is checked again.
+    """
+    mocker.patch(
+        "swo.mpt.extensions.runtime.events.scheduler.random.uniform",
+        side_effect=[1.1, 0.9],
+    )
+    scheduler = BackoffScheduler(10, 100, max_age=60)
+    attempts["ORD-1"] = 1
+    scheduler.completed(("orders", "ORD-1"), now=1000)
+
+    assert scheduler.hold(Event("ORD-1", "orders", {}), now=1010) is True
+    assert scheduler.get_next_due() == 1011
+    assert scheduler.hold(Event("ORD-1", "orders", {}), now=1010.5) is True
+    [event] = scheduler.pop_due(now=1011)
+    assert scheduler.hold(event, now=1011) is False
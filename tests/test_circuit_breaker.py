@@ -0,0 +1,286 @@
+import asyncio
+
+import httpx
+import pytest
+import requests
+
+from adobe_vipm.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    AsyncCircuitBreakerTransport,
+    CircuitBreaker,
+    CircuitBreakerAdapter,
+    CircuitOpenError,
+    get_circuit_breaker,
+    get_circuit_breakers_stats,
+    get_timeout,
+)
+
+
+@pytest.fixture()
+def mocked_monotonic(mocker):
+    return mocker.patch(
+        "adobe_vipm.circuit_breaker.time.monotonic",
+        return_value=100.0,
+    )
+
+
+def test_circuit_breaker_opens(mocked_monotonic):
+    """
+    Test that the circuit opens after the consecutive failures threshold
+    and rejects the calls until the recovery time elapses.
+    """
+    circuit_breaker = CircuitBreaker("adobe_orders", failure_threshold=2, recovery_secs=30)
+
+    circuit_breaker.before_call()
+    circuit_breaker.record_failure()
+    circuit_breaker.before_call()
+    circuit_breaker.record_success()
+    circuit_breaker.before_call()
+    circuit_breaker.record_failure()
+    assert circuit_breaker.state == STATE_CLOSED
+
+    circuit_breaker.before_call()
+    circuit_breaker.record_failure()
+    assert circuit_breaker.state == STATE_OPEN
+
+    mocked_monotonic.return_value = 110.0
+    with pytest.raises(CircuitOpenError) as cv:
+        circuit_breaker.before_call()
+
+    assert cv.value.name == "adobe_orders"
+    assert cv.value.retry_after == 20
+    assert str(cv.value) == "Circuit adobe_orders is open, retry in 20 seconds"
+    assert circuit_breaker.stats.to_dict() == {
+        "calls": 4,
+        "failures": 3,
+        "rejected": 1,
+        "opened": 1,
+    }
+
+
+def test_circuit_breaker_half_open_success(mocked_monotonic):
+    """
+    Test that once the recovery time elapsed a single probe call is let
+    through and the circuit closes if it succeeds.
+    """
+    circuit_breaker = CircuitBreaker("nav_auth", failure_threshold=1, recovery_secs=30)
+    circuit_breaker.record_failure()
+
+    mocked_monotonic.return_value = 130.0
+    assert circuit_breaker.state == STATE_HALF_OPEN
+    circuit_breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        circuit_breaker.before_call()
+
+    circuit_breaker.record_status(404)
+
+    assert circuit_breaker.state == STATE_CLOSED
+    circuit_breaker.before_call()
+
+
+def test_circuit_breaker_half_open_failure(mocked_monotonic):
+    """
+    Test that the circuit opens again if the probe call fails.
+    """
+    circuit_breaker = CircuitBreaker("nav_auth", failure_threshold=3, recovery_secs=30)
+    for _ in range(3):
+        circuit_breaker.record_failure()
+
+    mocked_monotonic.return_value = 130.0
+    circuit_breaker.before_call()
+    circuit_breaker.record_status(503)
+
+    assert circuit_breaker.state == STATE_OPEN
+    assert circuit_breaker.stats.opened == 2
+    with pytest.raises(CircuitOpenError):
+        circuit_breaker.before_call()
+
+
+def test_circuit_breaker_release_probe(mocked_monotonic):
+    """
+    Test that a probe abandoned without an outcome gives its slot back
+    so the half-open circuit can probe the service again.
+    """
+    circuit_breaker = CircuitBreaker("nav_auth", failure_threshold=1, recovery_secs=30)
+    circuit_breaker.record_failure()
+
+    mocked_monotonic.return_value = 130.0
+    circuit_breaker.before_call()
+    circuit_breaker.release_probe()
+
+    assert circuit_breaker.state == STATE_HALF_OPEN
+    circuit_breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        circuit_breaker.before_call()
+
+
+def test_get_circuit_breaker(settings):
+    """
+    Test that circuit breakers are created once per family with the thresholds
+    of the family or the default ones.
+    """
+    settings.EXTENSION_CONFIG = {
+        "CIRCUIT_BREAKER_FAILURE_THRESHOLD": "3",
+        "CIRCUIT_BREAKER_ADOBE_ORDERS_FAILURE_THRESHOLD": "10",
+        "CIRCUIT_BREAKER_ADOBE_ORDERS_RECOVERY_SECS": "5",
+    }
+
+    orders = get_circuit_breaker("adobe_orders")
+    customers = get_circuit_breaker("adobe_customers")
+
+    assert get_circuit_breaker("adobe_orders") is orders
+    assert (orders.failure_threshold, orders.recovery_secs) == (10, 5)
+    assert (customers.failure_threshold, customers.recovery_secs) == (3, 30)
+    assert get_circuit_breakers_stats() == {
+        "adobe_orders": {
+            "state": STATE_CLOSED,
+            "calls": 0,
+            "failures": 0,
+            "rejected": 0,
+            "opened": 0,
+        },
+        "adobe_customers": {
+            "state": STATE_CLOSED,
+            "calls": 0,
+            "failures": 0,
+            "rejected": 0,
+            "opened": 0,
+        },
+    }
+
+
+def test_get_timeout(settings):
+    """
+    Test that the timeouts of a service default to 10 seconds to connect
+    and 60 seconds to read.
+    """
+    settings.EXTENSION_CONFIG = {
+        "NAV_HTTP_CONNECT_TIMEOUT_SECS": "3",
+    }
+
+    assert get_timeout("NAV") == (3.0, 60.0)
+
+
+def test_circuit_breaker_adapter(settings, requests_mocker):
+    """
+    Test that the adapter fails fast once the circuit of the family
+    of the requests is open.
+    """
+    settings.EXTENSION_CONFIG = {
+        "CIRCUIT_BREAKER_FAILURE_THRESHOLD": "2",
+    }
+    session = requests.Session()
+    session.mount("https://", CircuitBreakerAdapter(family=lambda url: "airtable"))
+    requests_mocker.get("https://airtable.test/records", status=500)
+    requests_mocker.get(
+        "https://airtable.test/records",
+        body=requests.ConnectionError("Connection refused"),
+    )
+
+    assert session.get("https://airtable.test/records").status_code == 500
+    with pytest.raises(requests.ConnectionError):
+        session.get("https://airtable.test/records")
+    with pytest.raises(CircuitOpenError):
+        session.get("https://airtable.test/records")
+
+    assert len(requests_mocker.calls) == 2
+    assert get_circuit_breaker("airtable").state == STATE_OPEN
+
+
+def test_circuit_breaker_adapter_timeout(mocker):
+    """
+    Test that the timeout of the adapter is applied to the requests sent without one.
+    """
+    mocked_send = mocker.patch(
+        "adobe_vipm.circuit_breaker.HTTPAdapter.send",
+        return_value=mocker.MagicMock(status_code=200),
+    )
+    adapter = CircuitBreakerAdapter(family="nav_contracts", timeout=(5.0, 30.0))
+    request = mocker.MagicMock(url="https://nav.test/v1.0/contracts")
+
+    adapter.send(request)
+    adapter.send(request, timeout=1)
+
+    assert mocked_send.call_args_list[0].kwargs["timeout"] == (5.0, 30.0)
+    assert mocked_send.call_args_list[1].kwargs["timeout"] == 1
+
+
+def test_async_circuit_breaker_transport(settings):
+    """
+    Test that the async transport fails fast once the circuit of the family
+    of the requests is open.
+    """
+    settings.EXTENSION_CONFIG = {
+        "CIRCUIT_BREAKER_FAILURE_THRESHOLD": "2",
+    }
+    responses = [
+        httpx.Response(500),
+        httpx.ConnectError("Connection refused"),
+    ]
+
+    def handler(request):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def run():
+        async with httpx.AsyncClient(
+            transport=AsyncCircuitBreakerTransport(
+                httpx.MockTransport(handler),
+                family=lambda url: "mpt_agreements",
+            ),
+        ) as client:
+            assert (await client.get("https://mpt.test/agreements")).status_code == 500
+            with pytest.raises(httpx.ConnectError):
+                await client.get("https://mpt.test/agreements")
+            with pytest.raises(CircuitOpenError):
+                await client.get("https://mpt.test/agreements")
+
+    asyncio.run(run())
+
+    assert responses == []
+    assert get_circuit_breaker("mpt_agreements").state == STATE_OPEN
+
+
+def test_async_circuit_breaker_transport_cancelled_probe(mocker, settings):
+    """
+    Test that a half-open probe cancelled while in flight doesn't keep
+    the circuit rejecting the calls.
+    """
+    settings.EXTENSION_CONFIG = {
+        "CIRCUIT_BREAKER_FAILURE_THRESHOLD": "1",
+        "CIRCUIT_BREAKER_RECOVERY_SECS": "30",
+    }
+    mocked_monotonic = mocker.patch(
+        "adobe_vipm.circuit_breaker.time.monotonic",
+        return_value=100.0,
+    )
+    get_circuit_breaker("mpt_orders").record_failure()
+    mocked_monotonic.return_value = 130.0
+    started = asyncio.Event()
+
+    async def handler(request):
+        if request.url.path == "/slow":
+            started.set()
+            await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    async def run():
+        async with httpx.AsyncClient(
+            transport=AsyncCircuitBreakerTransport(
+                httpx.MockTransport(handler),
+                family="mpt_orders",
+            ),
+        ) as client:
+            probe = asyncio.ensure_future(client.get("https://mpt.test/slow"))
+            await started.wait()
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+            return await client.get("https://mpt.test/fast")
+
+    assert asyncio.run(run()).status_code == 200
+    assert get_circuit_breaker("mpt_orders").state == STATE_CLOSED
@@ -3,7 +3,14 @@ import json
 from swo.mpt.extensions.core.events import Event
 from swo.mpt.extensions.runtime.djapp.conf import get_for_product
 
-from adobe_vipm.extension import ext, jwt_secret_callback, process_order_fulfillment
+from adobe_vipm.circuit_breaker import CircuitOpenError
+from adobe_vipm.extension import (
+    ext,
+    get_prefetched_agreement,
+    jwt_secret_callback,
+    prefetch_orders_info,
+    process_order_fulfillment,
+)
 from adobe_vipm.flows.constants import PARAM_COMPANY_NAME
 from adobe_vipm.flows.utils import set_ordering_parameter_error
 
@@ -22,7 +29,74 @@ def test_process_order_fulfillment(mocker):
 
     process_order_fulfillment(client, event)
 
-    mocked_fulfill_order.assert_called_once_with(client, event.data)
+    mocked_fulfill_order.assert_called_once_with(client, event.data, agreement=None)
+
+
+def test_enricher_registered():
+    assert ext.events.get_enricher("orders") == prefetch_orders_info
+
+
+def test_prefetch_orders_info(mocker, order_factory, agreement):
+    order = order_factory()
+    mocked_prefetch = mocker.patch(
+        "adobe_vipm.extension.prefetch_orders_agreements",
+        return_value={order["agreement"]["id"]: agreement},
+    )
+    other_order = order_factory(order_id="ORD-1111")
+    other_order["agreement"] = {"id": "AGR-9999"}
+    client = mocker.MagicMock()
+    events = [
+        Event(order["id"], "orders", order),
+        Event(other_order["id"], "orders", other_order),
+    ]
+
+    prefetch_orders_info(client, events)
+
+    mocked_prefetch.assert_called_once_with(client, [order, other_order])
+    assert events[0].context["agreement"] == agreement
+    assert get_prefetched_agreement(events[0]) == agreement
+    assert events[1].context == {}
+    assert get_prefetched_agreement(events[1]) is None
+
+
+def test_prefetch_orders_info_circuit_open(mocker, order_factory):
+    """
+    Tests the orders are left to the listener when the circuit of the MPT
+    agreements is open.
+    """
+    mocker.patch(
+        "adobe_vipm.extension.prefetch_orders_agreements",
+        side_effect=CircuitOpenError("mpt_agreements", 30),
+    )
+    order = order_factory()
+    events = [Event(order["id"], "orders", order)]
+
+    prefetch_orders_info(mocker.MagicMock(), events)
+
+    assert events[0].context == {}
+    assert get_prefetched_agreement(events[0]) is None
+
+
+def test_process_order_fulfillment_prefetched(mocker, settings, agreement):
+    settings.EXTENSION_CONFIG = {**settings.EXTENSION_CONFIG, "ORDERS_PREFETCH_MAX_AGE_SECS": "60"}
+    mocked_fulfill_order = mocker.patch("adobe_vipm.extension.fulfill_order")
+    mocker.patch("adobe_vipm.extension.time.monotonic", side_effect=[100.0, 150.0, 170.0])
+    client = mocker.MagicMock()
+    event = Event("evt-id", "orders", {"id": "ORD-0792-5000-2253-4210"})
+    mocker.patch(
+        "adobe_vipm.extension.prefetch_orders_agreements",
+        return_value={"AGR-0000": agreement},
+    )
+    event.data["agreement"] = {"id": "AGR-0000"}
+    prefetch_orders_info(client, [event])
+
+    process_order_fulfillment(client, event)
+    process_order_fulfillment(client, event)
+
+    assert mocked_fulfill_order.mock_calls == [
+        mocker.call(client, event.data, agreement=agreement),
+        mocker.call(client, event.data, agreement=None),
+    ]
 
 
 def test_jwt_secret_callback(mocker, settings, mpt_client, webhook):
@@ -87,3 +161,58 @@ def test_process_order_validation_error(client, mocker, jwt_token, webhook):
         "id": "VIPMG001",
         "message": "Unexpected error during validation: A super duper error.",
     }
+
+
+def test_process_order_validation_circuit_open(client, mocker, jwt_token, webhook):
+    """
+    Tests the validation responds with a 503 when the circuit of an MPT
+    endpoint family is open.
+    """
+    mocker.patch(
+        "adobe_vipm.extension.get_webhook",
+        return_value=webhook,
+    )
+    mocker.patch(
+        "adobe_vipm.extension.validate_order",
+        side_effect=CircuitOpenError("mpt_catalog", 29.2),
+    )
+    resp = client.post(
+        "/api/v1/orders/validate",
+        content_type="application/json",
+        headers={
+            "Authorization": f"Bearer {jwt_token}",
+            "X-Forwarded-Host": "adobe.ext.s1.com",
+        },
+        data={"whatever": "order"},
+    )
+    assert resp.status_code == 503
+    assert resp["Retry-After"] == "30"
+    assert resp.json() == {
+        "id": "VIPMG002",
+        "message": "Service temporarily unavailable: "
+        "Circuit mpt_catalog is open, retry in 29 seconds.",
+    }
+
+
+def test_process_order_validation_auth_circuit_open(client, mocker, jwt_token):
+    """
+    Tests the validation responds with a 503 when the webhook cannot be
+    retrieved to authenticate the call because its circuit is open.
+    """
+    mocker.patch(
+        "adobe_vipm.extension.get_webhook",
+        side_effect=CircuitOpenError("mpt", 10),
+    )
+    mocked_validate = mocker.patch("adobe_vipm.extension.validate_order")
+    resp = client.post(
+        "/api/v1/orders/validate",
+        content_type="application/json",
+        headers={
+            "Authorization": f"Bearer {jwt_token}",
+            "X-Forwarded-Host": "adobe.ext.s1.com",
+        },
+        data={"whatever": "order"},
+    )
+    assert resp.status_code == 503
+    assert resp.json()["id"] == "VIPMG002"
+    mocked_validate.assert_not_called()
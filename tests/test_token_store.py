@@ -0,0 +1,214 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from freezegun import freeze_time
+
+from adobe_vipm.adobe.dataclasses import APIToken
+from adobe_vipm.token_store import TOKEN_STORE_FILENAME, TokenStore, get_token_store
+
+
+@pytest.fixture()
+def store_path(tmp_path):
+    return str(tmp_path / "cache" / "tokens.sqlite3")
+
+
+@freeze_time("2024-01-01 12:00:00")
+def test_set_get(store_path):
+    """
+    Test that a stored token is returned while it is valid.
+    """
+    store = TokenStore(store_path)
+    token = APIToken("a-token", expires=datetime(2024, 1, 1, 13, 0, 0))
+    store.set("a-key", token)
+
+    assert store.get("a-key") == token
+    assert store.get("a-key", min_validity=timedelta(minutes=59)) == token
+    assert store.get("a-key", min_validity=timedelta(hours=1)) is None
+    assert store.get("another-key") is None
+    assert oct(os.stat(store_path).st_mode & 0o777) == oct(0o600)
+
+
+@freeze_time("2024-01-01 12:00:00")
+def test_get_expired(store_path):
+    """
+    Test that an expired token is not returned.
+    """
+    store = TokenStore(store_path)
+    store.set("a-key", APIToken("a-token", expires=datetime(2024, 1, 1, 11, 0, 0)))
+
+    assert store.get("a-key") is None
+
+
+def test_get_or_refresh(mocker, store_path):
+    """
+    Test that the token is refreshed only when it is not available in the store,
+    also by another instance of the store on the same file.
+    """
+    token = APIToken("a-token", expires=datetime.now() + timedelta(hours=1))
+    refresh = mocker.MagicMock(return_value=token)
+
+    assert TokenStore(store_path).get_or_refresh("a-key", refresh) == token
+    assert TokenStore(store_path).get_or_refresh("a-key", refresh) == token
+    refresh.assert_called_once()
+
+
+def test_get_or_refresh_min_validity(mocker, store_path):
+    """
+    Test that a token that will expire within `min_validity` is refreshed.
+    """
+    store = TokenStore(store_path)
+    store.set("a-key", APIToken("old", expires=datetime.now() + timedelta(seconds=60)))
+    new_token = APIToken("new", expires=datetime.now() + timedelta(hours=1))
+
+    token = store.get_or_refresh(
+        "a-key",
+        mocker.MagicMock(return_value=new_token),
+        min_validity=timedelta(seconds=120),
+    )
+
+    assert token == new_token
+    assert store.get("a-key") == new_token
+
+
+def test_get_or_refresh_error(mocker, store_path):
+    """
+    Test that an error refreshing the token is propagated and nothing is stored.
+    """
+    store = TokenStore(store_path)
+
+    with pytest.raises(RuntimeError):
+        store.get_or_refresh("a-key", mocker.MagicMock(side_effect=RuntimeError("error")))
+
+    assert store.get("a-key") is None
+
+
+def test_get_or_refresh_serialized(store_path):
+    """
+    Test that concurrent refreshes of the same token through different instances
+    of the store are serialized so only one of them obtains a new token.
+    """
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        time.sleep(0.1)
+        return APIToken("a-token", expires=datetime.now() + timedelta(hours=1))
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(TokenStore(store_path).get_or_refresh("a-key", refresh)),
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert len(calls) == 1
+    assert [result.token for result in results] == ["a-token"] * 4
+
+
+def test_get_or_refresh_store_not_available(mocker, tmp_path):
+    """
+    Test that if the store cannot be used the token is refreshed anyway.
+    """
+    token = APIToken("a-token", expires=datetime.now() + timedelta(hours=1))
+    mocker.patch(
+        "adobe_vipm.token_store.sqlite3.connect",
+        side_effect=sqlite3.OperationalError("unable to open database file"),
+    )
+    store = TokenStore(str(tmp_path / "tokens.sqlite3"))
+
+    assert store.get_or_refresh("a-key", lambda: token) == token
+
+
+def test_get_or_refresh_directory_not_writable(mocker, tmp_path):
+    """
+    Test that if the directory of the store cannot be created the token is refreshed anyway.
+    """
+    token = APIToken("a-token", expires=datetime.now() + timedelta(hours=1))
+    mocker.patch(
+        "adobe_vipm.token_store.os.makedirs",
+        side_effect=PermissionError("permission denied"),
+    )
+    store = TokenStore(str(tmp_path / "cache" / "tokens.sqlite3"))
+
+    assert store.get_or_refresh("a-key", lambda: token) == token
+
+
+def test_get_or_refresh_save_error(mocker, store_path):
+    """
+    Test that a refreshed token is returned even if it cannot be saved to the store.
+    """
+    token = APIToken("a-token", expires=datetime.now() + timedelta(hours=1))
+    store = TokenStore(store_path)
+    mocker.patch.object(
+        store,
+        "_upsert",
+        side_effect=sqlite3.OperationalError("database is locked"),
+    )
+
+    assert store.get_or_refresh("a-key", lambda: token) == token
+    assert store._acquire("a-key", "another-owner") is True
+
+
+def test_get_or_refresh_error_releases_lock(mocker, store_path):
+    """
+    Test that the refresh lock is released if the token cannot be refreshed.
+    """
+    store = TokenStore(store_path)
+
+    with pytest.raises(RuntimeError):
+        store.get_or_refresh("a-key", mocker.MagicMock(side_effect=RuntimeError("error")))
+
+    assert store._acquire("a-key", "another-owner") is True
+
+
+def test_get_or_refresh_waits_for_lock_owner(mocker, store_path):
+    """
+    Test that while another owner refreshes the token, the token it saves is returned.
+    """
+    token = APIToken("a-token", expires=datetime.now() + timedelta(hours=1))
+    store = TokenStore(store_path)
+    assert store._acquire("a-key", "another-owner") is True
+    mocker.patch(
+        "adobe_vipm.token_store.time.sleep",
+        side_effect=lambda _: store.set("a-key", token),
+    )
+    refresh = mocker.MagicMock()
+
+    assert store.get_or_refresh("a-key", refresh) == token
+    refresh.assert_not_called()
+
+
+def test_get_or_refresh_lock_expired(mocker, store_path):
+    """
+    Test that the refresh lock of an owner that didn't release it is taken once expired.
+    """
+    token = APIToken("a-token", expires=datetime.now() + timedelta(hours=1))
+    store = TokenStore(store_path)
+    mocker.patch("adobe_vipm.token_store.REFRESH_LOCK_TIMEOUT_SECS", 0)
+    assert store._acquire("a-key", "another-owner") is True
+    sleep = mocker.patch("adobe_vipm.token_store.time.sleep")
+
+    assert store.get_or_refresh("a-key", lambda: token) == token
+    sleep.assert_not_called()
+
+
+def test_get_token_store(mocker, settings, tmp_path):
+    """
+    Test that the token store is created in the configured directory once per process.
+    """
+    mocker.patch("adobe_vipm.token_store._TOKEN_STORE", None)
+    settings.EXTENSION_CONFIG = {"TOKEN_CACHE_DIR": str(tmp_path)}
+
+    store = get_token_store()
+
+    assert store.path == os.path.join(str(tmp_path), TOKEN_STORE_FILENAME)
+    assert get_token_store() is store
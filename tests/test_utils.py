@@ -0,0 +1,98 @@
+from swo.mpt.extensions.core.events import Event
+from swo.mpt.extensions.runtime.events.policies import FairPriorityPolicy
+
+from adobe_vipm.utils import (
+    get_order_customer_key,
+    get_order_priority,
+    get_scheduling_policy,
+)
+
+
+def test_get_order_priority(order_factory, fulfillment_parameters_factory):
+    purchase = order_factory()
+    change = order_factory(order_type="Change")
+    retry = order_factory(
+        fulfillment_parameters=fulfillment_parameters_factory(retry_count="3"),
+    )
+
+    assert get_order_priority(Event(purchase["id"], "orders", purchase)) == 0
+    assert get_order_priority(Event(change["id"], "orders", change)) == 1
+    assert get_order_priority(Event(retry["id"], "orders", retry)) == 2
+
+
+def test_get_order_customer_key(order_factory, fulfillment_parameters_factory):
+    order = order_factory()
+    customer_order = order_factory(
+        fulfillment_parameters=fulfillment_parameters_factory(customer_id="a-client-id"),
+    )
+
+    assert get_order_customer_key(Event(order["id"], "orders", order)) == (
+        order["agreement"]["id"]
+    )
+    assert get_order_customer_key(
+        Event(customer_order["id"], "orders", customer_order),
+    ) == "a-client-id"
+
+
+def test_get_scheduling_policy(settings):
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "ORDERS_MAX_IN_FLIGHT_PER_CUSTOMER": "1",
+    }
+
+    policy = get_scheduling_policy()
+
+    assert isinstance(policy, FairPriorityPolicy)
+    assert policy.max_in_flight_per_key == 1
+
+
+def test_scheduling_policy_order(settings, order_factory, fulfillment_parameters_factory):
+    """
+    Tests that new purchase orders are processed first, that the customers
+    are served round-robin and that no more than the maximum number of orders
+    of the same customer are processed at once.
+    """
+    settings.EXTENSION_CONFIG = {
+        **settings.EXTENSION_CONFIG,
+        "ORDERS_MAX_IN_FLIGHT_PER_CUSTOMER": "1",
+    }
+
+    def event(order_id, customer_id, order_type="Change", retry_count="0"):
+        order = order_factory(
+            order_id=order_id,
+            order_type=order_type,
+            fulfillment_parameters=fulfillment_parameters_factory(
+                customer_id=customer_id,
+                retry_count=retry_count,
+            ),
+        )
+        return Event(order_id, "orders", order)
+
+    events = [
+        event("ORD-1", "big-customer", retry_count="1"),
+        event("ORD-2", "big-customer"),
+        event("ORD-3", "big-customer"),
+        event("ORD-4", "small-customer"),
+        event("ORD-5", "new-customer", order_type="Purchase"),
+    ]
+    policy = get_scheduling_policy()
+    for evt in events:
+        policy.push(evt)
+
+    served = [policy.pop() for _ in range(3)]
+    assert [evt.id for evt in served] == ["ORD-5", "ORD-2", "ORD-4"]
+    for evt in served:
+        policy.started(evt)
+
+    assert policy.pop() is None
+    assert len(policy) == 2
+
+    policy.completed(served[1])
+    third = policy.pop()
+    assert third.id == "ORD-3"
+    policy.started(third)
+    assert policy.pop() is None
+
+    policy.completed(third)
+    assert policy.pop().id == "ORD-1"
+    assert len(policy) == 0